@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: stored size and read speed of the features.payload column with
+the legacy text encoding (plain JSON, GZIP_B64 over 100 KB) and with each
+BLOB codec of utils/codec.py, including a dictionary trained on the data.
+
+Every variant is written to its own SQLite table so the reported size is
+what the database actually stores, and reads are timed as a dashboard does
+them: SELECT the rows, decode and parse every value.
+
+USAGE:
+    python3 benchmarks/codec_bench.py [--rows 20000] [--large-ratio 0.002] [--repeat 3]
+"""
+
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import codec
+
+TOOLS = ['Read', 'Write', 'Edit', 'Bash', 'Grep', 'Glob', 'LS']
+EVENT_TYPES = ['PreToolUse', 'PostToolUse', 'UserPromptSubmit', 'Notification', 'Stop']
+
+
+def synthetic_payloads(rows, large_ratio, seed=42):
+    """Hook payloads shaped like the ones Claude Code sends, plus a few large tool outputs."""
+    rng = random.Random(seed)
+    payloads = []
+    for i in range(rows):
+        session = f"{rng.randrange(200):08x}-4c1f-4b8e-9a55-{rng.randrange(10**6):012d}"
+        tool = rng.choice(TOOLS)
+        payload = {
+            'session_id': session,
+            'transcript_path': f'/home/user/.claude/projects/-home-user-studyguide/{session}.jsonl',
+            'cwd': '/home/user/studyguide',
+            'hook_event_name': rng.choice(EVENT_TYPES),
+            'tool_name': tool,
+            'tool_input': {'file_path': f'/home/user/studyguide/src/module{rng.randrange(300)}.py'},
+        }
+        if tool == 'Bash':
+            payload['tool_input'] = {'command': f'pytest -q tests/test_{rng.randrange(50)}.py',
+                                     'description': 'Run the test suite'}
+        if rng.random() < large_ratio:
+            lines = [f"line {n}: {' '.join(rng.choice(TOOLS) for _ in range(12))}" for n in range(4000)]
+            payload['tool_response'] = {'stdout': '\n'.join(lines), 'stderr': '', 'interrupted': False}
+        payloads.append(json.dumps(payload))
+    return payloads
+
+
+def legacy_encode(text):
+    """The encoding used before utils/codec.py."""
+    if len(text.encode('utf-8')) > 100000:
+        return "GZIP_B64:" + base64.b64encode(gzip.compress(text.encode('utf-8'))).decode('utf-8')
+    return text
+
+
+def run_variant(conn, name, encoder, payloads, repeat):
+    table = f"payload_{name.replace('+', '_')}"
+    conn.execute(f"CREATE TABLE {table} (id INTEGER PRIMARY KEY, payload BLOB)")
+    start = time.perf_counter()
+    values = [(encoder(text),) for text in payloads]
+    encode_s = time.perf_counter() - start
+    conn.executemany(f"INSERT INTO {table} (payload) VALUES (?)", values)
+    conn.commit()
+
+    stored = conn.execute(f"SELECT SUM(LENGTH(CAST(payload AS BLOB))) FROM {table}").fetchone()[0]
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for (value,) in conn.execute(f"SELECT payload FROM {table}"):
+            codec.decode_json(value, conn)
+        timings.append(time.perf_counter() - start)
+    return stored, encode_s, min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the payload codecs')
+    parser.add_argument('--rows', type=int, default=20_000, help='Synthetic payloads')
+    parser.add_argument('--large-ratio', type=float, default=0.002, help='Share of payloads with a large tool output')
+    parser.add_argument('--repeat', type=int, default=3, help='Read passes per variant (best is reported)')
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.rows, args.large_ratio)
+    raw_bytes = sum(len(text.encode('utf-8')) for text in payloads)
+    print(f"{args.rows:,} payloads, {raw_bytes / 1e6:.1f} MB of JSON")
+
+    start = time.perf_counter()
+    body = codec.train_dictionary(payloads[:2000])
+    dictionary = (codec.dictionary_id(body), body)
+    print(f"Trained a {len(body):,} byte dictionary in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    variants = [
+        ('legacy', legacy_encode),
+        ('raw', lambda text: codec.encode(text, codec='raw')),
+        ('zlib', lambda text: codec.encode(text, codec='zlib')),
+        ('lzma', lambda text: codec.encode(text, codec='lzma')),
+        ('zlib+dict', lambda text: codec.encode(text, dictionary=dictionary)),
+    ]
+    if codec.zstandard is not None:
+        variants.append(('zstd', lambda text: codec.encode(text, codec='zstd')))
+
+    path = os.path.join(tempfile.mkdtemp(prefix='codec_bench_'), 'bench.sqlite')
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE codec_dictionaries (id BLOB PRIMARY KEY, created_at INTEGER NOT NULL, "
+                 "samples INTEGER, body BLOB NOT NULL)")
+    codec.store_dictionary(conn, body, 2000)
+
+    print(f"\n  {'codec':<10} {'stored MB':>10} {'ratio':>7} {'encode s':>9} {'read s':>8} {'read µs/row':>12}")
+    for name, encoder in variants:
+        stored, encode_s, read_s = run_variant(conn, name, encoder, payloads, args.repeat)
+        print(f"  {name:<10} {stored / 1e6:>10.2f} {raw_bytes / stored:>6.1f}x {encode_s:>9.2f} "
+              f"{read_s:>8.2f} {read_s / args.rows * 1e6:>12.1f}")
+
+    conn.close()
+    os.remove(path)
+    os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark: pre_tool_use Bash checks, the old per-call regex lists against
+utils/command_scanner.py, on typical and multi-kilobyte commands.
+
+The old checks ran up to 21 patterns per call, compiled from the regex cache
+each time; several start with `\\brm\\s+.*` and backtrack over the whole rest
+of the command for every `rm` they find.
+
+USAGE:
+    python3 benchmarks/command_scanner_bench.py [--repeat 20]
+"""
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import command_scanner
+
+
+def legacy_is_dangerous_rm_command(command):
+    """pre_tool_use.is_dangerous_rm_command before the scanner."""
+    normalized = ' '.join(command.lower().split())
+    patterns = [
+        r'\brm\s+.*-[a-z]*r[a-z]*f', r'\brm\s+.*-[a-z]*f[a-z]*r', r'\brm\s+--recursive\s+--force',
+        r'\brm\s+--force\s+--recursive', r'\brm\s+-r\s+.*-f', r'\brm\s+-f\s+.*-r',
+    ]
+    for pattern in patterns:
+        if re.search(pattern, normalized):
+            return True
+    dangerous_paths = [r'/', r'/\*', r'~', r'~/', r'\$HOME', r'\.\.', r'\*', r'\.', r'\.\s*$']
+    if re.search(r'\brm\s+.*-[a-z]*r', normalized):
+        for path in dangerous_paths:
+            if re.search(path, normalized):
+                return True
+    return False
+
+
+def legacy_is_env_file_access(command):
+    """The Bash part of pre_tool_use.is_env_file_access before the scanner."""
+    env_patterns = [
+        r'\b\.env\b(?!\.sample)', r'cat\s+.*\.env\b(?!\.sample)', r'echo\s+.*>\s*\.env\b(?!\.sample)',
+        r'touch\s+.*\.env\b(?!\.sample)', r'cp\s+.*\.env\b(?!\.sample)', r'mv\s+.*\.env\b(?!\.sample)',
+    ]
+    for pattern in env_patterns:
+        if re.search(pattern, command):
+            return True
+    return False
+
+
+def legacy(command):
+    return legacy_is_env_file_access(command) or legacy_is_dangerous_rm_command(command)
+
+
+def scanner(command):
+    command_scanner.scan_command.cache_clear()  # measure the scan, not the cache
+    return bool(command_scanner.scan_command(command))
+
+
+def heredoc(size):
+    line = "cat input.txt | grep -v 'skip' | sort -u > out.txt  # echo the rm of tmp files\n"
+    return "cat > script.sh <<'EOF'\n" + line * (size // len(line)) + "EOF\nbash script.sh"
+
+
+COMMANDS = [
+    ("short", "npm test -- --watch=false"),
+    ("pipeline", "git log --oneline | head -20 && git status --short; ls -la src/"),
+    ("heredoc 4 KiB", heredoc(4 * 1024)),
+    ("heredoc 32 KiB", heredoc(32 * 1024)),
+    ("many rm 8 KiB", "rm tmp_a.txt; " * (8 * 1024 // 14)),
+    ("many rm 32 KiB", "rm tmp_a.txt; " * (32 * 1024 // 14)),
+]
+
+
+def time_per_call(func, command, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(command)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the pre_tool_use Bash checks')
+    parser.add_argument('--repeat', type=int, default=20, help='Calls per command')
+    args = parser.parse_args()
+
+    print(f"  {'command':<16} {'bytes':>7} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}")
+    for name, command in COMMANDS:
+        old = time_per_call(legacy, command, args.repeat)
+        new = time_per_call(scanner, command, args.repeat)
+        print(f"  {name:<16} {len(command):>7} {old:>10.3f} {new:>11.3f} {old / new:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: reading .git/HEAD directly vs. forking `git rev-parse`.
+
+Resolves the repository root and branch of the current working directory
+(or --repo) with both methods and prints per-call latency.
+
+USAGE:
+    python3 benchmarks/git_context_bench.py [--repo PATH] [--iterations N]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.data_manager import find_git_dir, read_head_branch
+
+
+def via_subprocess():
+    root = subprocess.check_output(["git", "rev-parse", "--show-toplevel"], text=True).strip()
+    branch = subprocess.check_output(["git", "rev-parse", "--abbrev-ref", "HEAD"], text=True).strip()
+    return Path(root), branch
+
+
+def via_head_file():
+    root, git_dir = find_git_dir()
+    return root, read_head_branch(git_dir)
+
+
+def measure(func, iterations):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def report(name, timings):
+    timings = sorted(timings)
+    p95 = timings[int(len(timings) * 0.95) - 1]
+    print(f"  {name:<12} mean {statistics.mean(timings):8.3f} ms   "
+          f"p50 {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark git context resolution')
+    parser.add_argument('--repo', default='.', help='Repository (or subdirectory) to resolve')
+    parser.add_argument('--iterations', type=int, default=200, help='Calls per method')
+    args = parser.parse_args()
+
+    os.chdir(args.repo)
+    if find_git_dir() is None:
+        print("No .git found by the fast path (or GIT_DIR-style variables are set)")
+        sys.exit(1)
+
+    fast, slow = via_head_file(), via_subprocess()
+    print(f"Repository: {fast[0]}  branch: {fast[1]}")
+    if fast != slow:
+        print(f"  WARNING: results differ: fast={fast} git={slow}")
+
+    fast_timings = measure(via_head_file, args.iterations)
+    slow_timings = measure(via_subprocess, args.iterations)
+    report("HEAD file", fast_timings)
+    report("git fork", slow_timings)
+    print(f"  speedup      {statistics.mean(slow_timings) / statistics.mean(fast_timings):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+Benchmark: latency and peak memory of every hook script, as the session they
+run in grows.
+
+Events are the mock events of tests/log_feature_test.py (plus Notification,
+SubagentStop and Stop payloads in the same shape), or payloads replayed from
+a feature log.jsonl with --replay. For each session size a scratch git
+repository with a feature folder is seeded with that many prior events: the
+per-session hook logs, the feature's log.jsonl and log.sqlite, and the chat
+transcript. Then every hook is measured in stages:
+  - cold: the hook script started as Claude Code starts it (new interpreter,
+          payload on stdin); wall time and the peak RSS of that process
+  - hook: the hook's handle() with the modules already imported
+  - log:  log_feature.process_event() with the modules already imported
+Warm stages run in a forked child per sample, so each sample starts from the
+same state and its peak RSS is what the stage added. The first sample of
+every stage is a discarded warm-up. TTS announcements are muted. Linux only
+(fork, /proc).
+
+Results are written as JSON; --compare reports the p95 changes against an
+earlier result file and exits 1 if a stage got slower by more than
+--threshold.
+
+USAGE:
+    python3 benchmarks/hook_bench.py [--runs 20] [--sizes 10,1000,100000] [--output FILE]
+    python3 benchmarks/hook_bench.py --replay planning/features/0001_x/log.jsonl
+    python3 benchmarks/hook_bench.py --compare hook_bench-abc1234.json
+    python3 benchmarks/hook_bench.py --compare old.json new.json
+"""
+
+import argparse
+import atexit
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parent.parent
+
+# Keep caches, session logs and the daemon socket of this run away from the user's
+_SCRATCH = tempfile.mkdtemp(prefix="hook_bench_")
+atexit.register(shutil.rmtree, _SCRATCH, True)
+os.environ.update(
+    CLAUDE_HOOKS_CACHE_DIR=os.path.join(_SCRATCH, "cache"),
+    CLAUDE_HOOKS_LOG_DIR=os.path.join(_SCRATCH, "logs"),
+    CLAUDE_HOOKS_SOCKET=os.path.join(_SCRATCH, "hookd.sock"),
+    CLAUDE_HOOKS_DAEMON_AUTOSTART="false",
+)
+
+# Add the hooks directory (and tests, for the mock events) to the path
+sys.path.append(str(HOOKS_DIR))
+sys.path.append(str(HOOKS_DIR / "tests"))
+
+from log_feature_test import create_mock_event_data
+from utils.db import get_connection, close_connection
+from utils.jsonl_store import rebuild_index
+from utils.logger import insert_events
+
+BRANCH = "bench"
+
+# name, script, command-line arguments, event type, stages
+HOOKS = [
+    ("pre_tool_use", "pre_tool_use.py", [], "PreToolUse", ("cold", "hook")),
+    ("post_tool_use", "post_tool_use.py", [], "PostToolUse", ("cold", "hook")),
+    ("notification", "notification.py", [], "Notification", ("cold", "hook")),
+    ("user_prompt_submit", "user_prompt_submit.py", ["--validate"], "UserPromptSubmit", ("cold", "hook")),
+    ("subagent_stop", "subagent_stop.py", ["--chat"], "SubagentStop", ("cold", "hook")),
+    ("log_feature", "log_feature.py", ["--event-type", "Stop", "--add-chat"], "Stop", ("cold", "log")),
+    ("dispatch", "dispatch.py", ["PreToolUse"], "PreToolUse", ("cold", "hook", "log")),
+]
+
+# Runs the main() of a hook script like `python <script>`, with its TTS muted,
+# and writes its peak RSS to stdout on exit. ru_maxrss from wait4() would also
+# count the benchmark's own memory: the high-water mark survives fork and exec
+_COLD_RUNNER = """
+import atexit, importlib, sys
+def report_peak_rss():
+    with open('/proc/self/status') as f:
+        print(next(line.split()[1] for line in f if line.startswith('VmHWM:')), file=sys.__stdout__)
+atexit.register(report_peak_rss)
+sys.path.insert(0, {hooks_dir!r})
+sys.argv = [{script!r}] + sys.argv[1:]
+hook = importlib.import_module({module!r})
+for name in ('announce_notification', 'announce_subagent_completion'):
+    if hasattr(hook, name):
+        setattr(hook, name, lambda: None)
+hook.main()
+"""
+
+
+def synthetic_payloads(session_id, transcript_path):
+    """Hook payloads by event type, from the log_feature_test mock events."""
+    payloads = {}
+    for _, event in create_mock_event_data():
+        payloads.setdefault(event['hook_event_type'], []).append(event['payload'])
+    payloads['Notification'] = [{'message': 'Claude needs your permission to use Bash'}]
+    payloads['SubagentStop'] = [{'stop_hook_active': False}]
+    payloads['Stop'] = [{'stop_hook_active': False}]
+    for event_payloads in payloads.values():
+        for payload in event_payloads:
+            payload.update(session_id=session_id, transcript_path=str(transcript_path))
+    return payloads
+
+
+def replayed_payloads(log_path, session_id, transcript_path):
+    """Hook payloads by event type, from a feature log.jsonl; synthetic ones fill the gaps."""
+    payloads = {}
+    with open(log_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(record.get('payload'), dict) and record.get('hook_event_type'):
+                payload = dict(record['payload'], session_id=session_id, transcript_path=str(transcript_path))
+                payloads.setdefault(record['hook_event_type'], []).append(payload)
+    for event_type, event_payloads in synthetic_payloads(session_id, transcript_path).items():
+        payloads.setdefault(event_type, event_payloads)
+    return payloads
+
+
+def transcript_line(i):
+    role = "user" if i % 2 == 0 else "assistant"
+    return json.dumps({'type': role, 'message': {'role': role, 'content': f'message {i} of the session'}}) + "\n"
+
+
+def seed_session(root, size, payloads):
+    """Create a repository whose session already has `size` prior events; returns (repo, transcript)."""
+    repo = root / "repo"
+    subprocess.run(["git", "init", "-q", "-b", BRANCH, str(repo)], check=True)
+    feature_dir = repo / "planning" / "features" / f"0001_{BRANCH}"
+    feature_dir.mkdir(parents=True)
+    transcript = root / "transcript.jsonl"
+    session_id = next(iter(payloads.values()))[0]['session_id']
+
+    event_types = sorted(payloads)
+    events = []
+    for i in range(size):
+        event_type = event_types[i % len(event_types)]
+        events.append({
+            'source_app': 'bench', 'type': 'feature', 'feature_name': BRANCH, 'feature_number': '0001',
+            'user': 'bench', 'session_id': session_id, 'hook_event_type': event_type,
+            'payload': payloads[event_type][i % len(payloads[event_type])], 'timestamp': 1_700_000_000_000 + i,
+        })
+
+    # The session logs, written in one go rather than through the locked appender
+    log_dir = Path(os.environ["CLAUDE_HOOKS_LOG_DIR"]) / session_id
+    log_dir.mkdir(parents=True, exist_ok=True)
+    for hook_name in ("pre_tool_use", "post_tool_use", "notification", "user_prompt_submit", "subagent_stop"):
+        with open(log_dir / f"{hook_name}.jsonl", "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(event['payload']) + "\n" for event in events)
+
+    log_path = feature_dir / "log.jsonl"
+    with open(log_path, "w", encoding="utf-8") as f:
+        f.writelines(json.dumps(event) + "\n" for event in events)
+    rebuild_index(log_path)
+
+    db_dir = repo / "planning" / "dashboard"
+    db_dir.mkdir(parents=True)
+    conn = get_connection(str(db_dir / "log.sqlite"))
+    insert_events(conn, events)
+    conn.commit()
+    close_connection(str(db_dir / "log.sqlite"))
+
+    with open(transcript, "w", encoding="utf-8") as f:
+        f.writelines(transcript_line(i) for i in range(size))
+    return repo, transcript
+
+
+def run_cold(script, args, stdin_text, cwd):
+    """Run a hook script in a new interpreter (Linux); returns (wall ms, peak RSS KiB)."""
+    runner = _COLD_RUNNER.format(hooks_dir=str(HOOKS_DIR), script=str(HOOKS_DIR / script),
+                                 module=Path(script).stem)
+    with tempfile.TemporaryFile() as stdout, tempfile.TemporaryFile() as stderr:
+        start = time.perf_counter()
+        proc = subprocess.Popen([sys.executable, "-c", runner, *args], cwd=cwd,
+                                stdin=subprocess.PIPE, stdout=stdout, stderr=stderr)
+        proc.stdin.write(stdin_text.encode("utf-8"))
+        proc.stdin.close()
+        returncode = proc.wait()
+        elapsed = (time.perf_counter() - start) * 1000
+        if returncode not in (0, 2):
+            stderr.seek(0)
+            raise RuntimeError(f"{script} exited {returncode}: {stderr.read().decode()[-2000:]}")
+        stdout.seek(0)
+        peak_rss = int(stdout.read().split()[-1])
+    return elapsed, peak_rss
+
+
+def run_forked(func):
+    """Run func in a forked child; returns (wall ms, KiB the child's peak RSS grew by)."""
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        try:
+            before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            start = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - start) * 1000
+            grown = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - before
+            os.write(write_fd, json.dumps([elapsed, grown]).encode())
+        except BaseException as e:
+            os.write(write_fd, json.dumps({'error': repr(e)}).encode())
+        finally:
+            os._exit(0)
+    os.close(write_fd)
+    with os.fdopen(read_fd, "rb") as f:
+        result = json.loads(f.read())
+    os.waitpid(pid, 0)
+    if isinstance(result, dict):
+        raise RuntimeError(result['error'])
+    return tuple(result)
+
+
+def warm_stage(stage, name, script_args, event_type):
+    """Build the callable of a warm stage; takes the payload."""
+    import dispatch
+    import log_feature
+
+    if stage == "log":
+        log_argv = dispatch.parse_args(script_args)[1] if name == "dispatch" else script_args
+        return lambda payload: log_feature.process_event(log_argv, json.dumps(payload), payload)
+
+    module = dispatch if name == "dispatch" else __import__(name)
+    if name == "dispatch":
+        options = dispatch.parse_args(script_args)[0]
+        return lambda payload: dispatch.run_hook(event_type, payload, options)
+    parser = argparse.ArgumentParser()
+    for flag in ("--chat", "--validate", "--log-only", "--notify"):
+        parser.add_argument(flag, action="store_true")
+    options = parser.parse_args(script_args)
+    return lambda payload: module.handle(payload, options)
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def measure_size(size, runs, replay):
+    """Measure every hook and stage for one session size; returns result rows."""
+    import notification
+    import subagent_stop
+    # Muted here too; forked children inherit it
+    subagent_stop.announce_subagent_completion = notification.announce_notification = lambda: None
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix=f"hook_bench_{size}_") as tmp:
+        root = Path(tmp)
+        session_id = f"bench-session-{size}"
+        transcript = root / "transcript.jsonl"
+        payloads = (replayed_payloads(replay, session_id, transcript) if replay
+                    else synthetic_payloads(session_id, transcript))
+        repo, transcript = seed_session(root, size, payloads)
+
+        cwd = os.getcwd()
+        os.chdir(repo)
+        try:
+            for name, script, script_args, event_type, stages in HOOKS:
+                event_payloads = payloads[event_type]
+                for stage in stages:
+                    func = None if stage == "cold" else warm_stage(stage, name, script_args, event_type)
+                    if func:
+                        func(dict(event_payloads[0]))  # import what the stage imports lazily
+                    timings, peak_rss = [], 0
+                    for i in range(runs + 1):
+                        payload = dict(event_payloads[i % len(event_payloads)])
+                        with open(transcript, "a", encoding="utf-8") as f:
+                            f.write(transcript_line(size + i))  # a new message for --chat/--add-chat
+                        if stage == "cold":
+                            elapsed, rss = run_cold(script, script_args, json.dumps(payload), repo)
+                        else:
+                            elapsed, rss = run_forked(lambda: func(payload))
+                        if i:  # the first run is a warm-up
+                            timings.append(elapsed)
+                            peak_rss = max(peak_rss, rss)
+                    rows.append({
+                        'hook': name, 'event': event_type, 'size': size, 'stage': stage,
+                        'p50_ms': round(percentile(timings, 50), 3),
+                        'p95_ms': round(percentile(timings, 95), 3),
+                        'p99_ms': round(percentile(timings, 99), 3),
+                        'peak_rss_kib': peak_rss,
+                        'samples': len(timings),
+                    })
+                    print_row(rows[-1])
+        finally:
+            os.chdir(cwd)
+    return rows
+
+
+def print_row(row):
+    print(f"  {row['hook']:<19} {row['size']:>7} {row['stage']:<5} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} "
+          f"{row['p99_ms']:>9.2f} {row['peak_rss_kib'] / 1024:>9.1f}", flush=True)
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=HOOKS_DIR,
+                                       text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(baseline, current, threshold):
+    """Print p95 changes per hook, size and stage; returns the number of regressions."""
+    old_rows = {(r['hook'], r['size'], r['stage']): r for r in baseline['results']}
+    regressions = 0
+    print(f"\nCompared with {baseline['commit']} (regression: p95 more than {threshold:.0%} and 1 ms slower)\n")
+    print(f"  {'hook':<19} {'size':>7} {'stage':<5} {'old p95':>9} {'new p95':>9} {'change':>8}")
+    for row in current['results']:
+        old = old_rows.get((row['hook'], row['size'], row['stage']))
+        if not old:
+            continue
+        change = row['p95_ms'] / old['p95_ms'] - 1 if old['p95_ms'] else 0.0
+        regressed = change > threshold and row['p95_ms'] - old['p95_ms'] > 1
+        regressions += regressed
+        print(f"  {row['hook']:<19} {row['size']:>7} {row['stage']:<5} {old['p95_ms']:>9.2f} "
+              f"{row['p95_ms']:>9.2f} {change:>+7.0%}{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the hook scripts against growing sessions')
+    parser.add_argument('--runs', type=int, default=20, help='Measured runs per hook, size and stage')
+    parser.add_argument('--sizes', default='10,100,1000,10000,100000', help='Prior events per session')
+    parser.add_argument('--replay', help='Feature log.jsonl whose payloads to replay')
+    parser.add_argument('--output', help='Result file (default: hook_bench-<commit>.json)')
+    parser.add_argument('--compare', nargs='+', metavar='RESULTS',
+                        help='Baseline result file, and optionally a result file to compare instead of running')
+    parser.add_argument('--threshold', type=float, default=0.2, help='p95 slowdown counted as a regression')
+    args = parser.parse_args()
+
+    if args.compare and len(args.compare) > 2:
+        parser.error('--compare takes one or two result files')
+    baseline = json.loads(Path(args.compare[0]).read_text()) if args.compare else None
+
+    if args.compare and len(args.compare) == 2:
+        current = json.loads(Path(args.compare[1]).read_text())
+    else:
+        current = {
+            'commit': git_commit(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runs': args.runs,
+            'replay': args.replay,
+            'results': [],
+        }
+        print(f"{args.runs} runs per stage, commit {current['commit']}\n")
+        print(f"  {'hook':<19} {'size':>7} {'stage':<5} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'RSS MiB':>9}")
+        for size in (int(s) for s in args.sizes.split(',')):
+            current['results'].extend(measure_size(size, args.runs, args.replay))
+
+        output = Path(args.output or f"hook_bench-{current['commit']}.json")
+        output.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"\nResults written to {output}")
+
+    if baseline and compare(baseline, current, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
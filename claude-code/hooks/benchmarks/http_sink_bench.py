@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sending hook events to the observability server, against the
+stand-in server in stubs/event_server.py.
+
+Compares
+  - urllib:  the old send_event_to_server, one new connection and one
+             uncompressed JSON POST per event
+  - sink:    http_sink.send_event per event, as a hook calls it (outbox
+             write, then a flush over a kept-alive connection)
+  - outbox:  events queued while the server was down, flushed at once
+             (one POST per event, or NDJSON batches with --format ndjson)
+
+USAGE:
+    python3 benchmarks/http_sink_bench.py [--events 500] [--latency-ms 2] [--format json|ndjson]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+# Keep the outbox and breaker state of this run away from the user's
+os.environ["CLAUDE_HOOKS_CACHE_DIR"] = tempfile.mkdtemp(prefix="http_sink_bench_cache_")
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stubs.event_server import EventServerStub
+from utils import http_sink
+from utils.spool import spool_event
+
+
+def make_event(i):
+    return {
+        'source_app': 'bench', 'type': 'feature', 'feature_name': 'bench', 'user': 'bench',
+        'session_id': 'bench-session', 'hook_event_type': 'PostToolUse', 'timestamp': i,
+        'payload': {'tool_name': 'Bash', 'tool_input': {'command': f'pytest tests/test_{i}.py -q'},
+                    'tool_response': {'stdout': '.' * 200 + f'\n{i} passed', 'stderr': ''}},
+    }
+
+
+def urllib_send(event_data, server_url):
+    """The old send_event_to_server."""
+    req = urllib.request.Request(
+        server_url,
+        data=json.dumps(event_data).encode('utf-8'),
+        headers={'Content-Type': 'application/json', 'User-Agent': 'Claude-Code-Hook/1.0'},
+    )
+    with urllib.request.urlopen(req, timeout=5) as response:
+        return response.status == 200
+
+
+def report(name, timings, stub, before):
+    requests = stub.stats['requests'] - before['requests']
+    connections = stub.stats['connections'] - before['connections']
+    kib = (stub.stats['bytes'] - before['bytes']) / 1024
+    print(f"  {name:<8} {statistics.median(timings):>9.3f} {sorted(timings)[int(len(timings) * 0.99) - 1]:>9.3f} "
+          f"{sum(timings) / 1000:>8.3f} {requests:>9} {connections:>12} {kib:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark sending events to the observability server')
+    parser.add_argument('--events', type=int, default=500, help='Events per mode')
+    parser.add_argument('--latency-ms', type=float, default=2, help='Server response delay')
+    parser.add_argument('--format', choices=['json', 'ndjson'], default='json', help='HTTP_SINK_FORMAT')
+    args = parser.parse_args()
+    os.environ["HTTP_SINK_FORMAT"] = args.format
+
+    stub = EventServerStub(port=0, latency_ms=args.latency_ms).start()
+    print(f"{args.events} events, server latency {args.latency_ms} ms, {args.format} format\n")
+    print(f"  {'mode':<8} {'p50 ms':>9} {'p99 ms':>9} {'total s':>8} {'requests':>9} "
+          f"{'connections':>12} {'sent KiB':>10}")
+
+    before, timings = dict(stub.stats), []
+    for i in range(args.events):
+        start = time.perf_counter()
+        urllib_send(make_event(i), stub.url)
+        timings.append((time.perf_counter() - start) * 1000)
+    report('urllib', timings, stub, before)
+
+    before, timings = dict(stub.stats), []
+    for i in range(args.events):
+        start = time.perf_counter()
+        http_sink.send_event(make_event(i), stub.url)
+        timings.append((time.perf_counter() - start) * 1000)
+    report('sink', timings, stub, before)
+
+    before = dict(stub.stats)
+    outbox = http_sink.outbox_dir_for(stub.url)
+    for i in range(args.events):
+        spool_event(make_event(i), outbox)
+    start = time.perf_counter()
+    http_sink.flush_outbox(stub.url, blocking=True)
+    report('outbox', [(time.perf_counter() - start) * 1000], stub, before)
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
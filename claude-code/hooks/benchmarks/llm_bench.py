@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark: summarization latency under slow, flaky and rate-limited LLM
+conditions, offline, against the stand-in server in stubs/llm_stub.py.
+
+For each scenario it measures
+  - sync:  generate_event_summary per event, i.e. what a hook waits for with
+           SUMMARY_MODE=sync
+  - batch: generate_event_summaries over all events (summary_worker.py)
+  - async: enqueue_summary per event, i.e. what a hook waits for with
+           SUMMARY_MODE=async
+Events are UserPromptSubmit prompts, which the local rules do not cover, and
+the summary cache and the LLM circuit breaker start fresh for every scenario.
+Set SUMMARY_DEADLINE_S to see the deadline bound the sync latency.
+
+USAGE:
+    python3 benchmarks/llm_bench.py [--events 50] [--provider local|openai|anthropic]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Keep the summary cache of this run away from the user's
+os.environ["CLAUDE_HOOKS_CACHE_DIR"] = tempfile.mkdtemp(prefix="llm_bench_cache_")
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stubs.llm_stub import LLMStub
+
+SCENARIOS = [
+    # name, latency_ms, jitter_ms, error_rate, rate_limit_rate
+    ("fast", 50, 20, 0.0, 0.0),
+    ("slow", 1500, 500, 0.0, 0.0),
+    ("flaky", 200, 100, 0.3, 0.0),
+    ("rate-limited", 200, 100, 0.0, 0.3),
+]
+
+
+def configure_provider(provider, stub):
+    os.environ["LLM_PROVIDER"] = provider
+    if provider == "local":
+        os.environ["LLM_LOCAL_URL"] = f"{stub.url}/v1/chat/completions"
+    elif provider == "openai":
+        os.environ.update(OPENAI_API_KEY="stub", OPENAI_BASE_URL=f"{stub.url}/v1")
+    else:
+        os.environ.update(ANTHROPIC_API_KEY="stub", ANTHROPIC_BASE_URL=stub.url)
+
+
+def prompt_events(scenario, count):
+    return [{
+        'hook_event_type': 'UserPromptSubmit',
+        'session_id': 'bench-session',
+        'payload': {'session_id': 'bench-session', 'prompt': f'[{scenario}] implement step {i} of the plan'},
+    } for i in range(count)]
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark summarization against a stand-in LLM')
+    parser.add_argument('--events', type=int, default=50, help='Events per scenario')
+    parser.add_argument('--provider', default='local', choices=['local', 'openai', 'anthropic'],
+                        help='Provider implementation to exercise')
+    args = parser.parse_args()
+
+    stub = LLMStub(port=0, seed=42).start()
+    configure_provider(args.provider, stub)
+
+    from utils import summary_cache
+    from utils.summarizer import generate_event_summaries, generate_event_summary, llm_breaker
+    from utils.summary_queue import enqueue_summary
+
+    db_path = os.path.join(tempfile.mkdtemp(prefix="llm_bench_db_"), "log.sqlite")
+
+    print(f"Provider {args.provider}, {args.events} events per scenario\n")
+    print(f"  {'scenario':<13} {'mode':<6} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} "
+          f"{'total s':>8} {'requests':>9} {'summarized':>11}")
+    for name, latency_ms, jitter_ms, error_rate, rate_limit_rate in SCENARIOS:
+        stub.latency_ms, stub.jitter_ms = latency_ms, jitter_ms
+        stub.error_rate, stub.rate_limit_rate = error_rate, rate_limit_rate
+        llm_breaker().reset()
+
+        # sync: one request per event, on the hook's critical path
+        before = stub.stats["requests"]
+        timings, summarized = [], 0
+        for event in prompt_events(f"{name}-sync", args.events):
+            start = time.perf_counter()
+            summarized += generate_event_summary(event) is not None
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  {name:<13} {'sync':<6} {statistics.median(timings):>9.1f} {percentile(timings, 95):>9.1f} "
+              f"{max(timings):>9.1f} {sum(timings) / 1000:>8.2f} {stub.stats['requests'] - before:>9} "
+              f"{summarized:>11}")
+
+        # batch: the worker packs the events into a few requests
+        llm_breaker().reset()
+        before = stub.stats["requests"]
+        start = time.perf_counter()
+        results = generate_event_summaries(prompt_events(f"{name}-batch", args.events))
+        total = time.perf_counter() - start
+        print(f"  {'':<13} {'batch':<6} {'':>9} {'':>9} {'':>9} {total:>8.2f} "
+              f"{stub.stats['requests'] - before:>9} {sum(r is not None for r in results):>11}")
+
+        # async: the hook only queues the job
+        timings = []
+        for event in prompt_events(f"{name}-async", args.events):
+            start = time.perf_counter()
+            enqueue_summary(dict(event, timestamp=time.time_ns()), db_path)
+            timings.append((time.perf_counter() - start) * 1000)
+        print(f"  {'':<13} {'async':<6} {statistics.median(timings):>9.2f} {percentile(timings, 95):>9.2f} "
+              f"{max(timings):>9.2f} {sum(timings) / 1000:>8.2f} {0:>9} {'(queued)':>11}")
+
+    print(f"\nSummary cache: {summary_cache.stats()['counters']}")
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark: dashboard queries on the features table before and after the
+dedup key / index migration (schema version 2 in utils/db.py).
+
+Builds a synthetic database with the original schema (no indexes), times
+the common dashboard queries, runs the in-hook migration through
+get_connection() and the index build of `python -m utils.db migrate`, and
+times the same queries again.
+
+USAGE:
+    python3 benchmarks/sqlite_index_bench.py [--rows 2000000] [--db PATH] [--keep]
+"""
+
+import argparse
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import db
+
+EVENT_TYPES = ['PreToolUse', 'PostToolUse', 'UserPromptSubmit', 'Notification', 'Stop', 'SubagentStop']
+TOOLS = ['Read', 'Write', 'Edit', 'Bash', 'Grep', 'Glob', 'LS']
+
+
+def build_legacy_db(path, rows, sessions, users, duplicate_ratio):
+    """Create a version-0 database filled with synthetic events."""
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=OFF")
+    db._migrate_v1(conn)
+
+    rng = random.Random(42)
+    start_ms = 1_750_000_000_000
+    batch = []
+    for i in range(rows):
+        if batch and rng.random() < duplicate_ratio:
+            batch.append(batch[-1])  # same session/type/timestamp as the previous event
+            continue
+        tool = rng.choice(TOOLS)
+        batch.append((
+            'feature', 'studyguide-template', 'language', f"{rng.randint(1, 40):04d}",
+            f"user{rng.randrange(users)}", f"session-{rng.randrange(sessions)}",
+            rng.choice(EVENT_TYPES), start_ms + i * 250, None, None,
+            json.dumps({'tool_name': tool, 'tool_input': {'file_path': f'/src/file{i % 500}.py'}}),
+        ))
+        if len(batch) >= 50_000:
+            conn.executemany('INSERT INTO features (type, source_app, feature_name, feature_number, user, '
+                             'session_id, hook_event_type, timestamp, chat, summary, payload) '
+                             'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', batch)
+            batch = []
+    if batch:
+        conn.executemany('INSERT INTO features (type, source_app, feature_name, feature_number, user, '
+                         'session_id, hook_event_type, timestamp, chat, summary, payload) '
+                         'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', batch)
+    conn.commit()
+    conn.close()
+
+
+def dashboard_queries(sessions, users):
+    mid = 1_750_000_000_000 + 250 * 1000
+    return [
+        ("events of a session", "SELECT timestamp, hook_event_type, user FROM features "
+         "WHERE session_id = ? ORDER BY timestamp DESC LIMIT 200", (f"session-{sessions // 2}",)),
+        ("events of a user", "SELECT timestamp, hook_event_type, session_id FROM features "
+         "WHERE user = ? ORDER BY timestamp DESC LIMIT 200", (f"user{users // 2}",)),
+        ("type in time range", "SELECT COUNT(*) FROM features "
+         "WHERE hook_event_type = ? AND timestamp BETWEEN ? AND ?", ('PostToolUse', mid, mid + 3_600_000)),
+        ("latest events", "SELECT timestamp, hook_event_type, user, session_id FROM features "
+         "ORDER BY timestamp DESC LIMIT 100", ()),
+        ("feature timeline", "SELECT timestamp, hook_event_type FROM features "
+         "WHERE feature_number = ? ORDER BY timestamp DESC LIMIT 200", ('0007',)),
+        ("event lookup", "SELECT id FROM features "
+         "WHERE session_id = ? AND hook_event_type = ? AND timestamp = ?", ("session-1", "Stop", mid)),
+    ]
+
+
+def time_queries(conn, queries, repeat):
+    results = {}
+    for name, sql, params in queries:
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            conn.execute(sql, params).fetchall()
+            timings.append((time.perf_counter() - start) * 1000)
+        results[name] = min(timings)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the features table indexes')
+    parser.add_argument('--rows', type=int, default=2_000_000, help='Synthetic events to generate')
+    parser.add_argument('--sessions', type=int, default=5_000, help='Distinct sessions')
+    parser.add_argument('--users', type=int, default=50, help='Distinct users')
+    parser.add_argument('--duplicate-ratio', type=float, default=0.01, help='Share of duplicated events')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per query (best is reported)')
+    parser.add_argument('--db', help='Database path (default: temporary file)')
+    parser.add_argument('--keep', action='store_true', help='Keep the database afterwards')
+    args = parser.parse_args()
+
+    path = args.db or os.path.join(tempfile.mkdtemp(prefix='features_bench_'), 'log.sqlite')
+    print(f"Building {args.rows:,} rows in {path} ...")
+    start = time.perf_counter()
+    build_legacy_db(path, args.rows, args.sessions, args.users, args.duplicate_ratio)
+    print(f"  built in {time.perf_counter() - start:.1f}s, {os.path.getsize(path) / 1e6:.0f} MB")
+
+    queries = dashboard_queries(args.sessions, args.users)
+    conn = sqlite3.connect(path)
+    before = time_queries(conn, queries, args.repeat)
+    conn.close()
+
+    start = time.perf_counter()
+    conn = db.get_connection(path)
+    migrate_s = time.perf_counter() - start
+    print(f"  migrated to schema v{db.SCHEMA_VERSION} in {migrate_s:.2f}s (in the hook)")
+
+    start = time.perf_counter()
+    db.build_indexes(path)
+    index_s = time.perf_counter() - start
+    print(f"  built indexes in {index_s:.1f}s, {os.path.getsize(path) / 1e6:.0f} MB")
+
+    after = time_queries(conn, queries, args.repeat)
+    db.close_connection(path)
+
+    print(f"\n  {'query':<22} {'before ms':>12} {'after ms':>12} {'speedup':>10}")
+    for name, _, _ in queries:
+        speedup = before[name] / after[name] if after[name] else float('inf')
+        print(f"  {name:<22} {before[name]:>12.3f} {after[name]:>12.3f} {speedup:>9.0f}x")
+
+    if not args.keep and not args.db:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+        os.rmdir(os.path.dirname(path))
+
+
+if __name__ == "__main__":
+    main()
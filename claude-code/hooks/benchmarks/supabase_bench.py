@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Supabase insert throughput, against the stand-in REST endpoint in
+stubs/postgrest_stub.py.
+
+Compares
+  - per-event:  the old send_event_to_supabase_database, a new client and a
+                one-row insert per event
+  - cached:     the cached client, still one row per insert
+  - buffered:   send_event_to_supabase_database as it is now, bulk inserts
+                of SUPABASE_BATCH_SIZE rows
+
+USAGE:
+    python3 benchmarks/supabase_bench.py [--events 500] [--latency-ms 20]
+"""
+
+import argparse
+import os
+import sys
+import time
+import warnings
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from supabase import create_client
+
+from stubs.postgrest_stub import STUB_KEY, PostgRESTStub
+from utils import logger
+
+warnings.simplefilter("ignore", DeprecationWarning)
+
+
+def make_event(i):
+    return {
+        'source_app': 'bench', 'type': 'feature', 'feature_name': 'bench', 'user': 'bench',
+        'session_id': 'bench-session', 'hook_event_type': 'PostToolUse', 'timestamp': i,
+        'payload': {'tool_name': 'Bash', 'tool_input': {'command': f'pytest tests/test_{i}.py -q'}},
+    }
+
+
+def per_event(event_data, url):
+    """The old send_event_to_supabase_database."""
+    client = create_client(url, STUB_KEY)
+    return client.table('features').insert(logger._prepare_event_record(event_data)).execute().data
+
+
+def cached(event_data, url):
+    client = logger.get_supabase_client(url, STUB_KEY)
+    return client.table('features').insert(logger._prepare_event_record(event_data)).execute().data
+
+
+def buffered(event_data, url):
+    return logger.send_event_to_supabase_database(event_data, url, STUB_KEY)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Supabase inserts')
+    parser.add_argument('--events', type=int, default=500, help='Events per mode')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Round trip of the REST endpoint')
+    args = parser.parse_args()
+
+    stub = PostgRESTStub(port=0, latency_ms=args.latency_ms).start()
+    batch_size = os.environ.get("SUPABASE_BATCH_SIZE", "100")
+    print(f"{args.events} events, {args.latency_ms} ms per request, SUPABASE_BATCH_SIZE={batch_size}\n")
+    print(f"  {'mode':<10} {'total s':>8} {'events/s':>9} {'requests':>9} {'connections':>12}")
+
+    for name, send in [('per-event', per_event), ('cached', cached), ('buffered', buffered)]:
+        before = dict(stub.stats)
+        start = time.perf_counter()
+        for i in range(args.events):
+            send(make_event(i), stub.url)
+        logger.flush_supabase_buffer()
+        total = time.perf_counter() - start
+        print(f"  {name:<10} {total:>8.2f} {args.events / total:>9.0f} "
+              f"{stub.stats['requests'] - before['requests']:>9} "
+              f"{stub.stats['connections'] - before['connections']:>12}")
+
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
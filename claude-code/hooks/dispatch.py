@@ -0,0 +1,132 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [
+#     "anthropic",
+#     "openai",
+#     "python-dotenv",
+#     "supabase"
+# ]
+# ///
+
+"""
+Single entry point for every Claude Code hook event.
+
+settings.local.json used to register two commands per event (the event's own
+hook, e.g. pre_tool_use.py, and log_feature.py), so every event started two
+interpreters that each read and parsed the same payload. This runs both in
+one process: stdin is read and parsed once, the event's hook runs first and
+decides the exit code (2 blocks a tool call or prompt), then the event is
+logged by log_feature (forwarded to the hook daemon if one is running).
+
+Options of the event hooks (--notify, --chat, --validate, --log-only) are
+handled here; every other option is passed on to log_feature.py.
+
+USAGE:
+    uv run ~/.claude/hooks/dispatch.py PreToolUse --source-app my-app --summarize
+    uv run ~/.claude/hooks/dispatch.py Notification --notify --source-app my-app
+    uv run ~/.claude/hooks/dispatch.py Stop --source-app my-app --add-chat
+"""
+
+import argparse
+import importlib
+import json
+import sys
+import time
+
+# Event type -> module of its own hook (None: the event is only logged)
+HOOK_MODULES = {
+    'PreToolUse': 'pre_tool_use',
+    'PostToolUse': 'post_tool_use',
+    'Notification': 'notification',
+    'SubagentStop': 'subagent_stop',
+    'UserPromptSubmit': 'user_prompt_submit',
+    'Stop': None,
+    'PreCompact': None,
+}
+
+
+def parse_args(argv):
+    """Split the command line into dispatcher options and log_feature.py arguments."""
+    parser = argparse.ArgumentParser(description='Run the hook and the logging of a Claude Code event')
+    parser.add_argument('event', help='Hook event type (PreToolUse, PostToolUse, etc.)')
+    parser.add_argument('--notify', action='store_true', help='Notification: enable TTS notifications')
+    parser.add_argument('--chat', action='store_true',
+                        help='SubagentStop: append new transcript messages to chat.jsonl')
+    parser.add_argument('--validate', action='store_true', help='UserPromptSubmit: enable prompt validation')
+    parser.add_argument('--log-only', action='store_true',
+                        help='UserPromptSubmit: only log prompts, no validation or blocking')
+    parser.add_argument('--no-log', action='store_true', help='Skip log_feature.py')
+    options, log_argv = parser.parse_known_args(argv)
+    return options, ['--event-type', options.event, *log_argv]
+
+
+def run_hook(event, input_data, options):
+    """Run the event's own hook; returns its exit code."""
+    module_name = HOOK_MODULES.get(event)
+    if module_name is None:
+        return 0
+    try:
+        return importlib.import_module(module_name).handle(input_data, options) or 0
+    except Exception as e:
+        # A failing hook must not block Claude Code
+        print(f"{module_name} failed: {e}", file=sys.stderr)
+        return 0
+
+
+def run_logging(log_argv, stdin_text, input_data, timer=None):
+    """Log the event with log_feature, through the daemon when it runs."""
+    from utils.daemon_client import forward_to_daemon
+
+    try:
+        if forward_to_daemon(log_argv, stdin_text):
+            return
+        import log_feature
+        log_feature.process_event(log_argv, stdin_text, input_data, timer)
+    except SystemExit:
+        pass  # argparse errors; the message is already on stderr
+    except Exception as e:
+        print(f"Failed to log event: {e}", file=sys.stderr)
+
+
+def dispatch(argv, stdin_text):
+    """
+    Handle one hook event.
+
+    Args:
+        argv: Command line arguments (without the script name)
+        stdin_text: The raw JSON payload Claude Code sent on stdin
+
+    Returns:
+        int: The exit code of the event's hook
+    """
+    from utils.daemon_client import with_timestamp
+    from utils.timing import StageTimer
+
+    # Timed from here on; log_feature records the stages with the event
+    timer = StageTimer()
+    fired_ms = int(time.time() * 1000)
+    try:
+        with timer.stage("parse"):
+            options, log_argv = parse_args(argv)
+            try:
+                input_data = json.loads(stdin_text)
+            except json.JSONDecodeError as e:
+                print(f"Failed to parse JSON input: {e}", file=sys.stderr)
+                return 1
+
+        with timer.stage("hook"):
+            exit_code = run_hook(options.event, input_data, options)
+        if not options.no_log:
+            run_logging(with_timestamp(log_argv, fired_ms), stdin_text, input_data, timer)
+        return exit_code
+    finally:
+        timer.cancel()
+
+
+def main():
+    sys.exit(dispatch(sys.argv[1:], sys.stdin.read()))
+
+
+if __name__ == '__main__':
+    main()
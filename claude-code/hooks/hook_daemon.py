@@ -0,0 +1,231 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [
+#     "anthropic",
+#     "openai",
+#     "python-dotenv",
+#     "supabase"
+# ]
+# ///
+
+"""
+Long-lived hook daemon.
+
+Listens on a Unix domain socket for events forwarded by log_feature.py and
+processes them with the imports, database connections and git context kept
+warm between events. Events are acknowledged as soon as they are received and
+processed in order by a single worker thread, so the hook itself returns in a
+few milliseconds.
+
+USAGE:
+    uv run ~/.claude/hooks/hook_daemon.py            # run in the foreground
+    uv run ~/.claude/hooks/hook_daemon.py --status   # check if it is running
+    uv run ~/.claude/hooks/hook_daemon.py --stop     # stop a running daemon
+    uv run ~/.claude/hooks/hook_daemon.py --once --event-type Stop < payload.json
+                                                     # process one event and exit
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import queue
+import signal
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+from utils.constants import HOOK_DAEMON_SOCKET
+from utils.daemon_client import FORWARDED_ENV_PREFIXES
+
+# Exit after this many seconds without events (0 keeps the daemon alive forever)
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("CLAUDE_HOOKS_DAEMON_IDLE_TIMEOUT", "3600"))
+
+# Upper bound on a single forwarded request (Stop events can carry a large payload)
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+def _pid_path(socket_path):
+    return Path(f"{socket_path}.pid")
+
+
+def _read_request(conn):
+    """Read a complete request from a client connection."""
+    chunks = []
+    size = 0
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > MAX_REQUEST_BYTES:
+            raise ValueError("request too large")
+        chunks.append(chunk)
+    return json.loads(b"".join(chunks).decode("utf-8"))
+
+
+def _apply_env(env):
+    """Replace the forwarded settings of os.environ with those of the hook."""
+    for name in [name for name in os.environ if name.startswith(FORWARDED_ENV_PREFIXES)]:
+        del os.environ[name]
+    os.environ.update(env)
+
+
+def _worker(requests):
+    """
+    Process forwarded events one at a time.
+
+    Each event runs in the hook's working directory and with the hook's
+    forwarded settings. Both are process-wide (os.chdir, os.environ), which is
+    only safe because this single thread is the one processing events; the
+    accept loop never reads either.
+    """
+    import log_feature
+    from utils.summarizer import flush_stats
+
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        try:
+            os.chdir(request["cwd"])
+            if "env" in request:  # clients before the env was forwarded
+                _apply_env(request["env"])
+            log_feature.process_event(request["argv"], request["stdin"])
+        except SystemExit:
+            pass  # argparse errors; the message is already on stderr
+        except Exception as e:
+            print(f"Failed to process event: {e}", file=sys.stderr)
+        # The hook already has its ack; the daemon may run until it is killed
+        flush_stats()
+
+
+def serve(socket_path=HOOK_DAEMON_SOCKET, idle_timeout=DEFAULT_IDLE_TIMEOUT):
+    """Run the daemon until it is stopped or has been idle for idle_timeout seconds."""
+    socket_dir = os.path.dirname(socket_path)
+    if socket_dir:
+        os.makedirs(socket_dir, exist_ok=True)
+
+    # Only one daemon per socket; the lock is released when the process dies
+    pid_file = open(_pid_path(socket_path), "a+")
+    try:
+        fcntl.flock(pid_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print(f"Hook daemon already running on {socket_path}", file=sys.stderr)
+        return 1
+    pid_file.seek(0)
+    pid_file.truncate()
+    pid_file.write(str(os.getpid()))
+    pid_file.flush()
+
+    # Warm up the expensive imports before accepting events
+    import log_feature  # noqa: F401
+    import utils.logger  # noqa: F401
+    import utils.summarizer  # noqa: F401
+
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    os.chmod(socket_path, 0o600)
+    server.listen(64)
+    if idle_timeout > 0:
+        server.settimeout(idle_timeout)
+
+    requests = queue.Queue()
+    worker = threading.Thread(target=_worker, args=(requests,), daemon=True)
+    worker.start()
+
+    def _shutdown(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    print(f"Hook daemon listening on {socket_path} (pid {os.getpid()})", file=sys.stderr)
+
+    try:
+        while True:
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                print("Hook daemon idle, shutting down", file=sys.stderr)
+                break
+            with conn:
+                try:
+                    conn.settimeout(5)
+                    request = _read_request(conn)
+                    requests.put(request)
+                    conn.sendall(b"ok\n")
+                except Exception as e:
+                    print(f"Rejected request: {e}", file=sys.stderr)
+                    try:
+                        conn.sendall(b"error\n")
+                    except OSError:
+                        pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+        # Finish the events that were already acknowledged
+        requests.put(None)
+        worker.join()
+
+        pid_file.seek(0)
+        pid_file.truncate()
+        pid_file.close()
+
+    return 0
+
+
+def _running_pid(socket_path):
+    """Return the pid of the running daemon, or None."""
+    try:
+        pid = int(_pid_path(socket_path).read_text().strip())
+        os.kill(pid, 0)
+        return pid
+    except (OSError, ValueError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Long-lived daemon for Claude Code logging hooks')
+    parser.add_argument('--socket', default=HOOK_DAEMON_SOCKET, help='Unix socket path')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='Seconds without events before exiting (0 = never)')
+    parser.add_argument('--status', action='store_true', help='Report whether the daemon is running')
+    parser.add_argument('--stop', action='store_true', help='Stop a running daemon')
+    parser.add_argument('--once', nargs=argparse.REMAINDER, metavar='ARGS',
+                        help='Process one event from stdin with these log_feature.py arguments, '
+                             'without starting the daemon (the fallback of log_feature.py)')
+    args = parser.parse_args()
+
+    if args.once is not None:
+        import log_feature
+        sys.exit(log_feature.process_event(args.once, sys.stdin.read()))
+
+    if args.status or args.stop:
+        pid = _running_pid(args.socket)
+        if pid is None:
+            print("Hook daemon is not running")
+            sys.exit(1 if args.status else 0)
+        if args.status:
+            print(f"Hook daemon running (pid {pid}) on {args.socket}")
+            sys.exit(0)
+        os.kill(pid, signal.SIGTERM)
+        for _ in range(50):
+            if _running_pid(args.socket) is None:
+                break
+            time.sleep(0.1)
+        print(f"Stopped hook daemon (pid {pid})")
+        sys.exit(0)
+
+    sys.exit(serve(args.socket, args.idle_timeout))
+
+
+if __name__ == '__main__':
+    main()
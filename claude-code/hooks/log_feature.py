@@ -1,155 +1,220 @@
 #!/usr/bin/env -S uv run --script
 # /// script
 # requires-python = ">=3.8"
-# dependencies = [
-#     "openai",
-#     "python-dotenv",
-#     "supabase"
-# ]
 # ///
 
 """
 Multi-Agent Observability Hook Script
 Sends Claude Code hook events to the observability server.
+
+If the hook daemon (hook_daemon.py) is running, this script only forwards the
+raw stdin payload over its Unix socket and exits; the daemon keeps the heavy
+imports, database connections and git context warm. Otherwise the event is
+processed in-process exactly as before.
+
+The script header declares no dependencies, so uv starts the forwarding path
+without resolving an environment. When there is no daemon and the pipeline's
+packages are not installed, the event is processed by `hook_daemon.py --once`,
+whose header declares them.
 """
 
 import json
 import sys
 import os
 import argparse
+import importlib.util
+import subprocess
 from datetime import datetime
-from dotenv import load_dotenv
-from utils.summarizer import generate_event_summary
-from utils.logger import (
-    send_event_to_sqllite_database,
-    send_event_to_file,
-    send_event_to_server,
-)
+from pathlib import Path
 
-from utils.data_manager import (
-    repo_root,
-    current_branch,
-    current_user,
-    repo_folder_name,
-    extract_feature_name,
-    extract_feature_number,
-    find_feature_log_path,
-)
+from utils.daemon_client import forward_to_daemon, with_timestamp
 
 
+def process_event(argv, stdin_text, input_data=None, timer=None):
+    """
+    Process a single hook event in the current process.
 
+    Args:
+        argv: Command line arguments of the hook (without the script name)
+        stdin_text: The raw JSON payload Claude Code sent on stdin
+        input_data: The payload already parsed from stdin_text, if the
+            caller has it (dispatch.py)
+        timer: The StageTimer of the event, if the caller started timing it
+            (dispatch.py); its stages are recorded with the event
 
+    Returns:
+        int: The exit code for the hook
+    """
+    from utils.timing import StageTimer
 
+    timer = timer or StageTimer()
+    try:
+        return _process_event(argv, stdin_text, input_data, timer)
+    finally:
+        timer.cancel()  # stop the profiler of an event that was not recorded
 
 
+def _process_event(argv, stdin_text, input_data, timer):
+    from utils.data_manager import resolve_context, find_feature_log_path
 
-def main():
-    # Check if logging is enabled from .env
-    load_dotenv()
-    
-    
-    # Check if logging is enabled from environment variable
-    # First try to load .env file from the hooks folder
-    hooks_env_path = os.path.join(os.path.dirname(__file__), '.env')
-    if os.path.exists(hooks_env_path):
-        load_dotenv(dotenv_path=hooks_env_path)
+    # Check if this event is a feature event, before any third-party import:
+    # outside a feature folder the hook has nothing to do
+    with timer.stage("context"):
+        if not find_feature_log_path():
+            return 0
+
+    with timer.stage("imports"):
+        from dotenv import load_dotenv
+        from utils.logger import (
+            send_event_to_sqllite_database,
+            send_event_to_file,
+            send_event_to_server,
+        )
+        from utils.spool import send_event_to_spool
+        from utils.summary_queue import enqueue_summary, start_summary_worker
+        from utils.transcript_tail import TranscriptTail
+
+        # Check if logging is enabled from .env
+        load_dotenv()
+        
+        
+        # Check if logging is enabled from environment variable
+        # First try to load .env file from the hooks folder
+        hooks_env_path = os.path.join(os.path.dirname(__file__), '.env')
+        if os.path.exists(hooks_env_path):
+            load_dotenv(dotenv_path=hooks_env_path)
     
     if os.environ.get("LOG_ENABLED", "true").lower() == "false":
-        return
-    
-    # Parse command line arguments
-    # Check if this event is a feature event
-    log_path = find_feature_log_path()
-    if not log_path:                                   # no matching folder → done
-        return
+        return 0
     
-    parser = argparse.ArgumentParser(description='Send Claude Code hook events to observability server')
-    parser.add_argument('--source-app', default=repo_folder_name(), help='Source application name')
-    parser.add_argument('--event-type', required=True, help='Hook event type (PreToolUse, PostToolUse, etc.)')
-    parser.add_argument('--server-url', default='http://localhost:4000/events', help='Server URL')
-    parser.add_argument('--add-chat', action='store_true', help='Include chat transcript if available')
-    parser.add_argument('--summarize', action='store_true', help='Generate AI summary of the event')
-    
-    if True:
-        args = parser.parse_args()
-    else:
-        class MockArgs:
-            def __init__(self):
-                self.source_app = repo_folder_name()
-                self.event_type = "TestEvent"
-                self.server_url = "http://localhost:4000/events"
-                self.add_chat = False
-                self.summarize = True
-
-        args = MockArgs()
-        input_data = {
-            "session_id": "test-session-id",
-            "transcript_path": "/tmp/test_transcript.jsonl",
-            "hook_event_name": "TestEvent",
-            "payload": {"test": "data", "summary": "test summary"}
-        }
+    with timer.stage("context"):
+        # Resolve again: .env may set FEATURE_LOG_FORMAT
+        log_path = find_feature_log_path()
+        
+        context = resolve_context()
+
+    with timer.stage("parse"):
+        parser = argparse.ArgumentParser(description='Send Claude Code hook events to observability server')
+        parser.add_argument('--source-app', default=context.repo_root.name, help='Source application name')
+        parser.add_argument('--event-type', required=True, help='Hook event type (PreToolUse, PostToolUse, etc.)')
+        parser.add_argument('--server-url', default='http://localhost:4000/events', help='Server URL')
+        parser.add_argument('--send-to-server', action='store_true',
+                            help='Also send the event to the observability server at --server-url')
+        parser.add_argument('--add-chat', action='store_true', help='Include chat transcript if available')
+        parser.add_argument('--summarize', action='store_true', help='Generate AI summary of the event')
+        parser.add_argument('--timestamp', type=int,
+                            help='When the hook fired, in ms since the epoch (default: now)')
         
-        # print(f"Error parsing arguments: {e}", file=sys.stderr)
-        # sys.exit(1)
-    if True:
-        try:
-            # Read hook data from stdin
-            input_data = json.load(sys.stdin)
-        except json.JSONDecodeError as e:
-            print(f"Failed to parse JSON input: {e}", file=sys.stderr)
-            sys.exit(1)
+        args = parser.parse_args(argv)
+
+        if input_data is None:
+            try:
+                # Parse the hook data read from stdin
+                input_data = json.loads(stdin_text)
+            except json.JSONDecodeError as e:
+                print(f"Failed to parse JSON input: {e}", file=sys.stderr)
+                return 1
     
     # Prepare event data for server
     event_data = {
         'source_app': args.source_app,
         'type': 'feature',
-        'feature_name': extract_feature_name(current_branch()),
-        'feature_number': extract_feature_number(current_branch()),
-        'user': current_user(),
+        'feature_name': context.feature_name,
+        'feature_number': context.feature_number,
+        'user': context.user,
         'session_id': input_data.get('session_id', 'unknown'),
         'hook_event_type': args.event_type,
         'payload': input_data,
-        'timestamp': int(datetime.now().timestamp() * 1000)
+        'timestamp': args.timestamp or int(datetime.now().timestamp() * 1000)
     }
     
-    # Handle --add-chat option
+    # Handle --add-chat option: attach only the messages appended since the
+    # last Stop; 'chat_start' is the position of the first one in the transcript
+    transcript_tail = None
     if args.add_chat and 'transcript_path' in input_data:
         transcript_path = input_data['transcript_path']
         if os.path.exists(transcript_path):
-            # Read .jsonl file and convert to JSON array
-            chat_data = []
             try:
-                with open(transcript_path, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line:
-                            try:
-                                chat_data.append(json.loads(line))
-                            except json.JSONDecodeError:
-                                pass  # Skip invalid lines
-                
-                # Add chat to event data
-                event_data['chat'] = chat_data
+                with timer.stage("chat"):
+                    transcript_tail = TranscriptTail(transcript_path, consumer='log_feature')
+                    event_data['chat'], event_data['chat_start'] = transcript_tail.read_new()
             except Exception as e:
+                transcript_tail = None
                 print(f"Failed to read transcript: {e}", file=sys.stderr)
     
-    # Generate summary if requested
+    # Generate summary if requested. Common tool calls are summarized on the
+    # spot by rules; the rest in the background by summary_worker.py (default),
+    # or inline before the event is stored when SUMMARY_MODE=sync. An inline
+    # call waits at most SUMMARY_DEADLINE_S and is skipped while the LLM
+    # circuit breaker is open; the event is then queued for the worker
+    summary_mode = os.environ.get("SUMMARY_MODE", "async").lower()
     if args.summarize:
-        summary = generate_event_summary(event_data)
+        with timer.stage("summary"):
+            from utils.summarizer import generate_event_summary, local_event_summary
+            summary = generate_event_summary(event_data) if summary_mode == "sync" else local_event_summary(event_data)
         if summary:
             event_data['summary'] = summary
         # Continue even if summary generation fails
     
-    # Send to database
-    success = send_event_to_sqllite_database(event_data, "./planning/dashboard/log.sqlite")
+    # Send to database: through the write-ahead spool (default), or with a
+    # direct per-event transaction when SQLITE_WRITE_MODE=direct
+    db_path = "./planning/dashboard/log.sqlite"
+    write_mode = os.environ.get("SQLITE_WRITE_MODE", "spool").lower()
+    with timer.stage("sqlite"):
+        if write_mode == "direct":
+            success = send_event_to_sqllite_database(event_data, db_path)
+        else:
+            # spool-only leaves draining to a dedicated `python -m utils.spool --watch` writer
+            success = send_event_to_spool(event_data, db_path, drain=write_mode != "spool-only")
     
     if not success:
         print(f"Failed to send event to database: {event_data}", file=sys.stderr)
+    else:
+        if transcript_tail:
+            # The delta is stored; the next Stop continues after it
+            transcript_tail.commit()
+        if args.summarize and not event_data.get('summary'):
+            with timer.stage("summary"):
+                if enqueue_summary(event_data, db_path):
+                    start_summary_worker(db_path)
     
-    send_event_to_file(event_data, log_path)
+    with timer.stage("file"):
+        send_event_to_file(event_data, log_path)
+
+    # Batched and queued on disk while the server is down (utils/http_sink.py)
+    if args.send_to_server:
+        with timer.stage("server"):
+            send_event_to_server(event_data, args.server_url)
+
+    # One line per event in planning/dashboard/hook_timings.jsonl (utils/timing.py)
+    timer.finish(event_data)
     
     # Always exit with 0 to not block Claude Code operations
-    sys.exit(0)
+    return 0
+
+
+def _process_with_uv(argv, stdin_text):
+    """Process the event under hook_daemon.py's script header, which declares the pipeline's packages."""
+    daemon = Path(__file__).with_name("hook_daemon.py")
+    try:
+        return subprocess.run(["uv", "run", "--script", str(daemon), "--once", *argv],
+                              input=stdin_text, text=True).returncode
+    except OSError as e:
+        print(f"Failed to process event without the hook daemon: {e}", file=sys.stderr)
+        return 0
+
+
+def main():
+    stdin_text = sys.stdin.read()
+    argv = with_timestamp(sys.argv[1:])
+
+    # Fast path: hand the event to the warm daemon
+    if forward_to_daemon(argv, stdin_text):
+        sys.exit(0)
+
+    if importlib.util.find_spec("dotenv") is None:
+        sys.exit(_process_with_uv(argv, stdin_text))
+    sys.exit(process_event(argv, stdin_text))
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
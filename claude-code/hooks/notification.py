@@ -13,7 +13,7 @@ import sys
 import subprocess
 import random
 from pathlib import Path
-from utils.constants import ensure_session_log_dir
+from utils.session_log import append_session_event
 
 try:
     from dotenv import load_dotenv
@@ -85,6 +85,27 @@ def announce_notification():
         pass
 
 
+def handle(input_data, options=None):
+    """
+    Log a Notification payload and announce it if --notify is set.
+
+    Args:
+        input_data: The hook payload Claude Code sent on stdin
+        options: Parsed command line options (notify)
+
+    Returns:
+        int: The exit code
+    """
+    # Append to the session log
+    append_session_event(input_data.get('session_id', 'unknown'), 'notification', input_data)
+
+    # Announce notification via TTS only if --notify flag is set
+    # Skip TTS for the generic "Claude is waiting for your input" message
+    if getattr(options, 'notify', False) and input_data.get('message') != 'Claude is waiting for your input':
+        announce_notification()
+    return 0
+
+
 def main():
     try:
         # Parse command line arguments
@@ -94,37 +115,7 @@ def main():
         
         # Read JSON input from stdin
         input_data = json.loads(sys.stdin.read())
-        
-        # Extract session_id
-        session_id = input_data.get('session_id', 'unknown')
-        
-        # Ensure session log directory exists
-        log_dir = ensure_session_log_dir(session_id)
-        log_file = log_dir / 'notification.json'
-        
-        # Read existing log data or initialize empty list
-        if log_file.exists():
-            with open(log_file, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
-        
-        # Write back to file with formatting
-        with open(log_file, 'w') as f:
-            json.dump(log_data, f, indent=2)
-        
-        # Announce notification via TTS only if --notify flag is set
-        # Skip TTS for the generic "Claude is waiting for your input" message
-        if args.notify and input_data.get('message') != 'Claude is waiting for your input':
-            announce_notification()
-        
-        sys.exit(0)
+        sys.exit(handle(input_data, args))
         
     except json.JSONDecodeError:
         # Handle JSON decode errors gracefully
@@ -134,4 +125,4 @@ def main():
         sys.exit(0)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
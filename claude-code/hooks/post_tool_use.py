@@ -7,38 +7,18 @@ import json
 import os
 import sys
 from pathlib import Path
-from utils.constants import ensure_session_log_dir
+from utils.session_log import append_session_event
+
+def handle(input_data, options=None):
+    """Append a PostToolUse payload to the session log; returns the exit code."""
+    append_session_event(input_data.get('session_id', 'unknown'), 'post_tool_use', input_data)
+    return 0
 
 def main():
     try:
         # Read JSON input from stdin
         input_data = json.load(sys.stdin)
-        
-        # Extract session_id
-        session_id = input_data.get('session_id', 'unknown')
-        
-        # Ensure session log directory exists
-        log_dir = ensure_session_log_dir(session_id)
-        log_path = log_dir / 'post_tool_use.json'
-        
-        # Read existing log data or initialize empty list
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
-        
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
-        
-        sys.exit(0)
+        sys.exit(handle(input_data))
         
     except json.JSONDecodeError:
         # Handle JSON decode errors gracefully
@@ -48,4 +28,4 @@ def main():
         sys.exit(0)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Stand-in observability server for testing utils/http_sink.py offline.
+
+Accepts POST /events with one JSON event (application/json) or a batch of
+newline-delimited events (application/x-ndjson), optionally gzip-encoded,
+and keeps what it received in memory. A configurable share of requests
+fail with a 500, and every request can be delayed.
+
+USAGE:
+    python3 stubs/event_server.py [--port 4000] [--latency-ms 5] [--error-rate 0.1]
+
+GET /stats returns the request counters.
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class EventServerStub:
+    """
+    A stand-in event server running in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency_ms: Delay before each response
+        error_rate: Share of requests answered with HTTP 500
+        seed: Seed for the error draws
+    """
+
+    def __init__(self, port=4000, latency_ms=0, error_rate=0.0, seed=None):
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.events = []
+        self.stats = {"requests": 0, "errors": 0, "events": 0, "connections": 0, "bytes": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}/events"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.stats["connections"] += 1
+
+            def _send_json(self, status, body):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    with stub._lock:
+                        self._send_json(200, dict(stub.stats))
+                else:
+                    self._send_json(404, {"error": "not found"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stub._lock:
+                    stub.stats["requests"] += 1
+                    stub.stats["bytes"] += len(body)
+                    failed = stub._random.random() < stub.error_rate
+                    if failed:
+                        stub.stats["errors"] += 1
+                time.sleep(stub.latency_ms / 1000)
+                if failed:
+                    self._send_json(500, {"error": "stub failure"})
+                    return
+                if self.path.split("?")[0] != "/events":
+                    self._send_json(404, {"error": "not found"})
+                    return
+
+                try:
+                    if self.headers.get("Content-Encoding") == "gzip":
+                        body = gzip.decompress(body)
+                    if self.headers.get("Content-Type", "").startswith("application/x-ndjson"):
+                        events = [json.loads(line) for line in body.splitlines() if line.strip()]
+                    else:
+                        events = [json.loads(body)]
+                except (OSError, ValueError):
+                    self._send_json(400, {"error": "invalid body"})
+                    return
+
+                with stub._lock:
+                    stub.events.extend(events)
+                    stub.stats["events"] += len(events)
+                self._send_json(200, {"received": len(events)})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in observability event server')
+    parser.add_argument('--port', type=int, default=4000, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=5, help='Response delay')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 500')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible errors')
+    args = parser.parse_args()
+
+    stub = EventServerStub(args.port, args.latency_ms, args.error_rate, args.seed)
+    print(f"Event server stub listening on {stub.url}", flush=True)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+        print(f"Received {stub.stats}")
+
+
+if __name__ == "__main__":
+    main()
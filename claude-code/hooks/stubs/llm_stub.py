@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Stand-in LLM server for offline testing and benchmarking.
+
+Speaks just enough of the OpenAI chat completions API (POST
+/v1/chat/completions) and the Anthropic messages API (POST /v1/messages) for
+the hooks: every request gets a canned response after a configurable delay,
+and a configurable share of requests fail with a 500 or are rate limited
+with a 429. Batch summary prompts (see generate_event_summaries) get a JSON
+array with one canned summary per event.
+
+Point the hooks at it with one of:
+    LLM_PROVIDER=local LLM_LOCAL_URL=http://127.0.0.1:8089/v1/chat/completions
+    LLM_PROVIDER=openai OPENAI_API_KEY=stub OPENAI_BASE_URL=http://127.0.0.1:8089/v1
+    LLM_PROVIDER=anthropic ANTHROPIC_API_KEY=stub ANTHROPIC_BASE_URL=http://127.0.0.1:8089
+
+USAGE:
+    python3 stubs/llm_stub.py [--port 8089] [--latency-ms 300] [--jitter-ms 100]
+                              [--error-rate 0.1] [--rate-limit-rate 0.05] [--responses canned.json]
+
+GET /stats returns the request counters.
+"""
+
+import argparse
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_RESPONSES = [
+    "Reads project configuration file",
+    "Runs the test suite with pytest",
+    "Edits module to fix failing import",
+    "Searches codebase for function definition",
+    "Agent responds with implementation plan",
+]
+
+_BATCH_RE = re.compile(r"JSON array of exactly (\d+) strings")
+
+
+class LLMStub:
+    """
+    A stand-in LLM server running in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency_ms: Base delay before each response
+        jitter_ms: Random extra delay, uniformly up to this much
+        error_rate: Share of requests answered with HTTP 500
+        rate_limit_rate: Share of requests answered with HTTP 429
+        responses: Canned response texts, used in turn
+        seed: Seed for the error and jitter draws
+    """
+
+    def __init__(self, port=8089, latency_ms=0, jitter_ms=0, error_rate=0.0, rate_limit_rate=0.0,
+                 responses=None, seed=None):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._responses = itertools.cycle(responses or DEFAULT_RESPONSES)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "ok": 0, "errors": 0, "rate_limited": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _draw(self):
+        """Pick the outcome and delay of a request."""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+            delay = (self.latency_ms + self._random.uniform(0, self.jitter_ms)) / 1000
+            if roll < self.error_rate:
+                outcome = "errors"
+            elif roll < self.error_rate + self.rate_limit_rate:
+                outcome = "rate_limited"
+            else:
+                outcome = "ok"
+            self.stats[outcome] += 1
+            return outcome, delay
+
+    def _completion_text(self, prompt):
+        with self._lock:
+            batch = _BATCH_RE.search(prompt)
+            if batch:
+                return json.dumps([next(self._responses) for _ in range(int(batch.group(1)))])
+            return next(self._responses)
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like the real APIs
+            disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status, body, headers=None):
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    with stub._lock:
+                        self._send_json(200, dict(stub.stats))
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    self._send_json(400, {"error": {"message": "invalid JSON"}})
+                    return
+
+                outcome, delay = stub._draw()
+                time.sleep(delay)
+                if outcome == "errors":
+                    self._send_json(500, {"error": {"type": "server_error", "message": "stub failure"}})
+                    return
+                if outcome == "rate_limited":
+                    self._send_json(429, {"error": {"type": "rate_limit_error", "message": "slow down"}},
+                                    {"Retry-After": "1"})
+                    return
+
+                messages = request.get("messages") or [{}]
+                content = messages[-1].get("content", "")
+                if isinstance(content, list):
+                    content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+                text = stub._completion_text(content)
+                usage = {"prompt_tokens": len(content) // 4, "completion_tokens": len(text) // 4}
+
+                if self.path.rstrip("/").endswith("/messages"):
+                    self._send_json(200, {
+                        "id": "msg_stub", "type": "message", "role": "assistant",
+                        "model": request.get("model", "stub"),
+                        "content": [{"type": "text", "text": text}],
+                        "stop_reason": "end_turn", "stop_sequence": None,
+                        "usage": {"input_tokens": usage["prompt_tokens"],
+                                  "output_tokens": usage["completion_tokens"]},
+                    })
+                elif self.path.rstrip("/").endswith("/chat/completions"):
+                    self._send_json(200, {
+                        "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                        "model": request.get("model", "stub"),
+                        "choices": [{"index": 0, "finish_reason": "stop",
+                                     "message": {"role": "assistant", "content": text}}],
+                        "usage": dict(usage, total_tokens=sum(usage.values())),
+                    })
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in LLM server')
+    parser.add_argument('--port', type=int, default=8089, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=300, help='Base response delay')
+    parser.add_argument('--jitter-ms', type=float, default=100, help='Random extra delay, up to')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Share of requests failing with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Share of requests answered with 429')
+    parser.add_argument('--responses', help='JSON file with a list of canned response texts')
+    parser.add_argument('--seed', type=int, help='Seed for reproducible errors and jitter')
+    args = parser.parse_args()
+
+    responses = None
+    if args.responses:
+        with open(args.responses, encoding="utf-8") as f:
+            responses = json.load(f)
+
+    stub = LLMStub(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.rate_limit_rate,
+                   responses, args.seed)
+    print(f"LLM stub listening on {stub.url}", flush=True)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
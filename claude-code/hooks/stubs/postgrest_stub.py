@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Stand-in Supabase REST endpoint (PostgREST) for testing and benchmarking
+send_event_to_supabase_database offline.
+
+Accepts POST /rest/v1/<table> with one JSON row or an array of rows, as
+supabase-py's `table(...).insert(...)` sends them, and keeps the rows in
+memory per table. Answers 201 with the rows for `Prefer:
+return=representation` and an empty body otherwise. Every request can be
+delayed, to stand in for the round trip to the hosted service.
+
+Point the client at it with:
+    SUPABASE_URL=http://127.0.0.1:54321 SUPABASE_KEY=<STUB_KEY>
+
+USAGE:
+    python3 stubs/postgrest_stub.py [--port 54321] [--latency-ms 20]
+
+GET /stats returns the request counters.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# supabase-py only accepts keys shaped like a JWT
+STUB_KEY = "eyJhbGciOiJIUzI1NiJ9.eyJyb2xlIjoic3R1YiJ9.c3R1Yg"
+
+REST_PREFIX = "/rest/v1/"
+
+
+class PostgRESTStub:
+    """
+    A stand-in PostgREST server running in a background thread.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency_ms: Delay before each response
+    """
+
+    def __init__(self, port=54321, latency_ms=0):
+        self.latency_ms = latency_ms
+        self._lock = threading.Lock()
+        self.rows = {}
+        self.stats = {"requests": 0, "rows": 0, "connections": 0}
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def port(self):
+        return self.server.server_address[1]
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.stats["connections"] += 1
+
+            def _send(self, status, body=None):
+                data = b"" if body is None else json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path == "/stats":
+                    with stub._lock:
+                        self._send(200, dict(stub.stats))
+                else:
+                    self._send(404, {"message": "not found"})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                path = self.path.split("?")[0]
+                if not path.startswith(REST_PREFIX):
+                    self._send(404, {"message": "not found"})
+                    return
+                try:
+                    rows = json.loads(body)
+                except ValueError:
+                    self._send(400, {"code": "PGRST102", "message": "Empty or invalid json"})
+                    return
+                rows = rows if isinstance(rows, list) else [rows]
+
+                time.sleep(stub.latency_ms / 1000)
+                with stub._lock:
+                    stub.stats["requests"] += 1
+                    stub.stats["rows"] += len(rows)
+                    stub.rows.setdefault(path[len(REST_PREFIX):], []).extend(rows)
+
+                if "return=representation" in self.headers.get("Prefer", ""):
+                    self._send(201, rows)
+                else:
+                    self._send(201)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stand-in Supabase REST endpoint')
+    parser.add_argument('--port', type=int, default=54321, help='Port to listen on')
+    parser.add_argument('--latency-ms', type=float, default=20, help='Response delay')
+    args = parser.parse_args()
+
+    stub = PostgRESTStub(args.port, args.latency_ms)
+    print(f"PostgREST stub listening on {stub.url} (SUPABASE_KEY={STUB_KEY})", flush=True)
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.server.server_close()
+        print(f"Received {stub.stats}")
+
+
+if __name__ == "__main__":
+    main()
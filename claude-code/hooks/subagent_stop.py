@@ -13,7 +13,10 @@ import sys
 import subprocess
 from pathlib import Path
 from datetime import datetime
-from utils.constants import ensure_session_log_dir
+from utils.constants import get_session_log_dir
+from utils.session_log import append_session_event
+from utils.jsonl_store import append_jsonl
+from utils.transcript_tail import TranscriptTail
 
 try:
     from dotenv import load_dotenv
@@ -79,68 +82,57 @@ def announce_subagent_completion():
         pass
 
 
+def handle(input_data, options=None):
+    """
+    Log a SubagentStop payload, optionally copy the new chat messages, and announce it.
+
+    Args:
+        input_data: The hook payload Claude Code sent on stdin
+        options: Parsed command line options (chat)
+
+    Returns:
+        int: The exit code
+    """
+    # Extract required fields
+    session_id = input_data.get("session_id", "")
+
+    # Append to the session log
+    append_session_event(session_id, "subagent_stop", input_data)
+    log_dir = get_session_log_dir(session_id)
+
+    # Handle --chat switch: append the transcript messages added since the
+    # last SubagentStop to logs/<session>/chat.jsonl
+    if getattr(options, 'chat', False) and 'transcript_path' in input_data:
+        transcript_path = input_data['transcript_path']
+        if os.path.exists(transcript_path):
+            try:
+                tail = TranscriptTail(transcript_path, consumer=f'subagent_stop:{session_id}')
+                messages, start_seq = tail.read_new()
+
+                chat_file = log_dir / 'chat.jsonl'
+                if start_seq == 0 and chat_file.exists():
+                    chat_file.unlink()  # transcript was (re)read from the start
+                for message in messages:
+                    append_jsonl(chat_file, message, index=False)
+                tail.commit()
+            except Exception:
+                pass  # Fail silently
+
+    # Announce subagent completion via TTS
+    announce_subagent_completion()
+    return 0
+
+
 def main():
     try:
         # Parse command line arguments
         parser = argparse.ArgumentParser()
-        parser.add_argument('--chat', action='store_true', help='Copy transcript to chat.json')
+        parser.add_argument('--chat', action='store_true', help='Append new transcript messages to chat.jsonl')
         args = parser.parse_args()
         
         # Read JSON input from stdin
         input_data = json.load(sys.stdin)
-
-        # Extract required fields
-        session_id = input_data.get("session_id", "")
-        stop_hook_active = input_data.get("stop_hook_active", False)
-
-        # Ensure session log directory exists
-        log_dir = ensure_session_log_dir(session_id)
-        log_path = log_dir / "subagent_stop.json"
-
-        # Read existing log data or initialize empty list
-        if log_path.exists():
-            with open(log_path, 'r') as f:
-                try:
-                    log_data = json.load(f)
-                except (json.JSONDecodeError, ValueError):
-                    log_data = []
-        else:
-            log_data = []
-        
-        # Append new data
-        log_data.append(input_data)
-        
-        # Write back to file with formatting
-        with open(log_path, 'w') as f:
-            json.dump(log_data, f, indent=2)
-        
-        # Handle --chat switch (same as stop.py)
-        if args.chat and 'transcript_path' in input_data:
-            transcript_path = input_data['transcript_path']
-            if os.path.exists(transcript_path):
-                # Read .jsonl file and convert to JSON array
-                chat_data = []
-                try:
-                    with open(transcript_path, 'r') as f:
-                        for line in f:
-                            line = line.strip()
-                            if line:
-                                try:
-                                    chat_data.append(json.loads(line))
-                                except json.JSONDecodeError:
-                                    pass  # Skip invalid lines
-                    
-                    # Write to logs/chat.json
-                    chat_file = os.path.join(log_dir, 'chat.json')
-                    with open(chat_file, 'w') as f:
-                        json.dump(chat_data, f, indent=2)
-                except Exception:
-                    pass  # Fail silently
-
-        # Announce subagent completion via TTS
-        announce_subagent_completion()
-
-        sys.exit(0)
+        sys.exit(handle(input_data, args))
 
     except json.JSONDecodeError:
         # Handle JSON decode errors gracefully
@@ -151,4 +143,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [
+#     "anthropic",
+#     "openai",
+#     "python-dotenv",
+#     "supabase"
+# ]
+# ///
+
+"""
+Background summary worker.
+
+Drains the summary queue of a dashboard database (see utils/summary_queue.py):
+queued events are summarized several per LLM request (see
+generate_event_summaries in utils/summarizer.py) and `features.summary` is
+filled in with an UPDATE. log_feature.py starts it on demand; only one worker
+runs per database (flock on the queue directory), and it exits once the queue
+has been empty for --idle-timeout seconds. While the LLM circuit breaker is
+open (see utils/circuit_breaker.py) jobs stay queued for a later worker.
+--backfill summarizes events that were stored without a summary.
+
+USAGE:
+    uv run ~/.claude/hooks/summary_worker.py --db planning/dashboard/log.sqlite
+    uv run ~/.claude/hooks/summary_worker.py --db planning/dashboard/log.sqlite --once
+    uv run ~/.claude/hooks/summary_worker.py --db planning/dashboard/log.sqlite --backfill [--limit N]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from dotenv import load_dotenv
+
+from utils.db import get_connection, close_connection
+from utils.logger import event_key
+from utils.spool import drain_spool, pending_files, quarantine
+from utils.codec import decode_json
+from utils.summarizer import SUMMARY_BATCH_SIZE, flush_stats, generate_event_summaries, llm_breaker
+from utils.summary_queue import UPDATE_SUMMARY_SQL, acquire_worker_lock, summary_queue_dir_for
+
+# Exit after the queue has been empty this long
+DEFAULT_IDLE_TIMEOUT = float(os.environ.get("SUMMARY_WORKER_IDLE_TIMEOUT", "30"))
+
+# A job whose event never reaches the database (failed write) is dropped after this long
+MAX_JOB_AGE_S = 600
+
+POLL_INTERVAL_S = 1.0
+
+EVENT_STATE_SQL = '''
+    SELECT summary IS NULL FROM features WHERE event_key = ?
+'''
+
+# Backfilled rows are addressed by id: rows stored before event_key existed have none
+UPDATE_SUMMARY_BY_ID_SQL = '''
+    UPDATE features SET summary = ? WHERE id = ? AND summary IS NULL
+'''
+
+
+def _store_summaries(conn, jobs, batch_size, update_sql=UPDATE_SUMMARY_SQL, key='event_key'):
+    """Summarize jobs batch_size at a time and UPDATE their rows (job[key]); returns the number stored."""
+    stored = 0
+    for i in range(0, len(jobs), batch_size):
+        chunk = jobs[i:i + batch_size]
+        summaries = generate_event_summaries(chunk, batch_size)
+        rows = [(summary, job[key]) for job, summary in zip(chunk, summaries) if summary]
+        conn.executemany(update_sql, rows)
+        conn.commit()
+        stored += len(rows)
+    return stored
+
+
+def summarize_pending(path_to_db, queue_dir, batch_size=SUMMARY_BATCH_SIZE):
+    """
+    Summarize the queued jobs whose events are in the database.
+
+    Returns:
+        tuple: (summarized, waiting) - jobs done in this pass, and jobs left
+        queued because their event has not been written yet
+    """
+    files = pending_files(queue_dir)
+    if not files:
+        return 0, 0
+
+    # The events may still sit in the write-ahead spool
+    drain_spool(path_to_db)
+    conn = get_connection(path_to_db)
+
+    ready = []
+    waiting = 0
+    for path in files:
+        try:
+            job = json.loads(path.read_bytes())
+        except FileNotFoundError:
+            continue
+        except (OSError, ValueError):
+            quarantine(path)
+            continue
+        if not isinstance(job, dict):
+            quarantine(path)
+            continue
+        # Jobs queued before they carried the key hash to the same one
+        job.setdefault('event_key', event_key(job))
+
+        row = conn.execute(EVENT_STATE_SQL, (job['event_key'],)).fetchone()
+        if row is None:
+            age_s = (time.time_ns() - int(path.name.split("-", 1)[0])) / 1e9
+            if age_s < MAX_JOB_AGE_S:
+                waiting += 1
+                continue
+        if row and row[0]:
+            ready.append((path, job))
+        else:
+            path.unlink(missing_ok=True)  # already summarized, or its event never arrived
+
+    summarized = 0
+    for i in range(0, len(ready), batch_size):
+        if llm_breaker().is_open():
+            # The provider is failing; keep the rest queued until it recovers
+            return summarized, waiting + len(ready) - i
+        chunk = ready[i:i + batch_size]
+        summarized += _store_summaries(conn, [job for _, job in chunk], batch_size)
+        for path, _ in chunk:
+            path.unlink(missing_ok=True)
+    return summarized, waiting
+
+
+def backfill_summaries(path_to_db, limit=None, batch_size=SUMMARY_BATCH_SIZE):
+    """
+    Summarize events already in the database that have no summary, newest first.
+
+    Returns:
+        int: Number of summaries stored
+    """
+    drain_spool(path_to_db)
+    conn = get_connection(path_to_db)
+    rows = conn.execute(
+        "SELECT id, event_key, session_id, hook_event_type, timestamp, payload FROM features "
+        "WHERE summary IS NULL ORDER BY timestamp DESC LIMIT ?",
+        (limit if limit else -1,),
+    ).fetchall()
+    jobs = [
+        {'id': row_id, 'event_key': key, 'session_id': session_id, 'hook_event_type': hook_event_type,
+         'timestamp': timestamp, 'payload': decode_json(payload, conn) or {}}
+        for row_id, key, session_id, hook_event_type, timestamp, payload in rows
+    ]
+    return _store_summaries(conn, jobs, batch_size, UPDATE_SUMMARY_BY_ID_SQL, key='id')
+
+
+def run_worker(path_to_db, idle_timeout=DEFAULT_IDLE_TIMEOUT, once=False, batch_size=SUMMARY_BATCH_SIZE):
+    """Drain the summary queue until it has been idle for idle_timeout seconds."""
+    queue_dir = summary_queue_dir_for(path_to_db)
+    while True:
+        lock_fd = acquire_worker_lock(queue_dir)
+        if lock_fd is None:
+            return 0  # another worker owns the queue
+        try:
+            idle_since = time.monotonic()
+            while True:
+                try:
+                    summarized, waiting = summarize_pending(path_to_db, queue_dir, batch_size)
+                except sqlite3.Error as e:
+                    close_connection(path_to_db)
+                    print(f"Failed to store summaries: {e}", file=sys.stderr)
+                    summarized, waiting = 0, 0
+                flush_stats()
+                if once:
+                    return 0
+                if summarized:
+                    idle_since = time.monotonic()
+                    continue
+                if time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(POLL_INTERVAL_S)
+        finally:
+            os.close(lock_fd)
+
+        # A hook may have queued a job after our last pass and seen the lock
+        # still taken; pick it up instead of leaving it for the next event
+        if not pending_files(queue_dir) or llm_breaker().is_open():
+            return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Fill in LLM summaries of queued hook events')
+    parser.add_argument('--db', default='./planning/dashboard/log.sqlite', help='SQLite database')
+    parser.add_argument('--idle-timeout', type=float, default=DEFAULT_IDLE_TIMEOUT,
+                        help='Seconds to wait for new jobs before exiting')
+    parser.add_argument('--once', action='store_true', help='Process the queued jobs once and exit')
+    parser.add_argument('--backfill', action='store_true',
+                        help='Summarize stored events that have no summary, then exit')
+    parser.add_argument('--limit', type=int, help='With --backfill: at most this many events')
+    parser.add_argument('--batch-size', type=int, default=SUMMARY_BATCH_SIZE, help='Events per LLM request')
+    args = parser.parse_args()
+
+    # Same .env lookup as log_feature.py: the project, then the hooks folder
+    load_dotenv()
+    hooks_env_path = os.path.join(os.path.dirname(__file__), '.env')
+    if os.path.exists(hooks_env_path):
+        load_dotenv(dotenv_path=hooks_env_path)
+
+    if args.backfill:
+        print(f"Stored {backfill_summaries(args.db, args.limit, args.batch_size)} summaries")
+        return
+    sys.exit(run_worker(args.db, args.idle_timeout, args.once, args.batch_size))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared circuit breaker and the call deadline in
+utils/circuit_breaker.py.
+
+USAGE:
+    python3 circuit_breaker_test.py
+    python3 -m pytest circuit_breaker_test.py
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.circuit_breaker import CircuitBreaker, call_with_deadline
+
+
+def test_opens_after_consecutive_failures():
+    with tempfile.TemporaryDirectory() as tmp:
+        breaker = CircuitBreaker('llm', failure_threshold=2, cooldown_s=60, state_dir=tmp)
+        breaker.record(False)
+        breaker.record(True)  # a success resets the count
+        breaker.record(False)
+        assert breaker.allow() and breaker.state() == 'closed'
+
+        breaker.record(False)
+        assert breaker.state() == 'open'
+        # Another process sees the same state
+        assert not CircuitBreaker('llm', cooldown_s=60, state_dir=tmp).allow()
+
+
+def test_half_open_lets_one_probe_through():
+    with tempfile.TemporaryDirectory() as tmp:
+        breaker = CircuitBreaker('llm', failure_threshold=1, cooldown_s=0.05, state_dir=tmp)
+        breaker.record(False)
+        assert not breaker.allow()
+        time.sleep(0.06)
+
+        assert breaker.allow()  # the probe
+        assert not breaker.allow()  # others wait for its outcome
+        breaker.record(False)
+        assert breaker.state() == 'open'
+
+        time.sleep(0.06)
+        assert breaker.allow()
+        breaker.record(True)
+        assert breaker.state() == 'closed' and breaker.allow()
+
+
+def test_deadline_bounds_the_wait():
+    start = time.monotonic()
+    assert call_with_deadline(time.sleep, 0.05, 2) == (False, None)
+    assert time.monotonic() - start < 1
+
+    assert call_with_deadline(lambda x: x * 2, 1, 21) == (True, 42)
+    assert call_with_deadline(lambda: 1 / 0, 1) == (True, None)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the BLOB codec in utils/codec.py.
+
+USAGE:
+    python3 codec_test.py
+    python3 -m pytest codec_test.py
+"""
+
+import base64
+import gzip
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import codec, db
+from utils.logger import insert_events
+
+
+def hook_payload(i):
+    return {
+        'session_id': 'test-session-12345',
+        'transcript_path': '/home/user/.claude/projects/studyguide/test-session-12345.jsonl',
+        'cwd': '/home/user/studyguide',
+        'hook_event_name': 'PostToolUse',
+        'tool_name': 'Read',
+        'tool_input': {'file_path': f'/home/user/studyguide/src/module{i}.py'},
+    }
+
+
+def test_round_trip_every_codec():
+    text = json.dumps([hook_payload(i) for i in range(20)])
+    for name in ('raw', 'zlib', 'lzma', 'zstd', 'auto'):
+        blob = codec.encode(text, codec=name)
+        assert isinstance(blob, bytes)
+        assert codec.decode(blob) == text
+    assert codec.encode(None) is None and codec.decode(None) is None
+
+
+def test_reads_legacy_text_values():
+    text = json.dumps(hook_payload(1))
+    legacy = codec.LEGACY_GZIP_PREFIX + base64.b64encode(gzip.compress(text.encode('utf-8'))).decode('ascii')
+    assert codec.decode(legacy) == text
+    assert codec.decode(text) == text
+
+
+def test_dictionary_shrinks_small_payloads():
+    samples = [json.dumps(hook_payload(i)) for i in range(200)]
+    body = codec.train_dictionary(samples)
+    dictionary = (codec.dictionary_id(body), body)
+
+    sample = json.dumps(hook_payload(999))
+    plain = codec.encode(sample, codec='zlib')
+    with_dict = codec.encode(sample, dictionary=dictionary)
+    assert with_dict[0] == codec.ZLIB_DICT
+    assert len(with_dict) < len(plain)
+    assert codec.decode(with_dict) == sample
+
+
+def test_migrate_converts_legacy_rows_in_place():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = db.get_connection(path)
+        try:
+            big = json.dumps({'output': 'x' * 200000})
+            legacy_payload = codec.LEGACY_GZIP_PREFIX + base64.b64encode(gzip.compress(big.encode('utf-8'))).decode('ascii')
+            conn.execute(
+                "INSERT INTO features (session_id, hook_event_type, timestamp, payload) VALUES (?, ?, ?, ?)",
+                ('test-session-12345', 'PostToolUse', 1, legacy_payload),
+            )
+            insert_events(conn, [{'session_id': 'test-session-12345', 'hook_event_type': 'PreToolUse',
+                                  'timestamp': 2, 'payload': hook_payload(2)}])
+            conn.commit()
+
+            assert codec.migrate_columns(conn) == 1
+            rows = conn.execute("SELECT payload FROM features ORDER BY timestamp").fetchall()
+            assert all(isinstance(value, bytes) for (value,) in rows)
+            assert codec.decode(rows[0][0], conn) == big
+            assert codec.decode_json(rows[1][0], conn) == hook_payload(2)
+
+            # After training, --all re-encodes with the dictionary
+            body = codec.train_dictionary([json.dumps(hook_payload(i)) for i in range(50)])
+            codec.store_dictionary(conn, body, 50)
+            conn.commit()
+            assert codec.migrate_columns(conn, reencode=True) == 2
+            value = conn.execute("SELECT payload FROM features WHERE timestamp = 2").fetchone()[0]
+            assert value[0] == codec.ZLIB_DICT
+            assert codec.decode_json(value, conn) == hook_payload(2)
+        finally:
+            db.close_connection(path)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests for the Bash command scanner in utils/command_scanner.py and the
+pre_tool_use.py checks built on it.
+
+USAGE:
+    python3 command_scanner_test.py
+    python3 -m pytest command_scanner_test.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pre_tool_use import is_dangerous_rm_command, is_env_file_access
+from utils.command_scanner import scan_command, tokenize
+
+
+def test_tokenizer_splits_simple_commands():
+    assert tokenize("cd src && rm -r 'my dir' | tee log; echo $(ls)") == [
+        ['cd', 'src'], ['rm', '-r', 'my dir'], ['tee', 'log'], ['echo', '$'], ['ls'],
+    ]
+    assert tokenize("echo hi\nrm -rf `pwd`") == [['echo', 'hi'], ['rm', '-rf'], ['pwd']]
+
+
+def test_dangerous_rm_commands():
+    for command in ["rm -rf /", "sudo rm -Rf build", "rm -fr ~", "rm --recursive --force tmp",
+                    "rm -r -f tmp", "rm -r ./build", "ls && rm -r *", "echo $(rm -rf ~)",
+                    "echo ok\nrm -r ..", "/bin/rm -rf tmp", "RM -RF /"]:
+        assert is_dangerous_rm_command(command), command
+
+    for command in ["rm file.txt", "rm -r build", "rm -f notes", "rm file.txt; ls -lr",
+                    "git rm -r --cached build", "echo 'rm -rf /' > notes"]:
+        assert not is_dangerous_rm_command(command), command
+
+
+def test_env_file_access():
+    for command in ["cat .env", "source .env", "echo KEY=1 >> .env", "cp config/.env.local /tmp",
+                    "grep KEY .env"]:
+        assert is_env_file_access('Bash', {'command': command}), command
+
+    for command in ["cat .env.sample", "python -m dotenv", "ls .environment",
+                    "git commit -m 'read settings from .env lazily'"]:
+        assert not is_env_file_access('Bash', {'command': command}), command
+
+    assert is_env_file_access('Read', {'file_path': '/src/.env'})
+    assert not is_env_file_access('Read', {'file_path': '/src/.env.sample'})
+    assert not is_env_file_access('Glob', {'pattern': '.env'})
+
+
+def test_commands_run_from_quoted_strings():
+    for command in ['bash -c "rm -rf /"', "sh -c 'rm -rf ~'", 'eval "rm -rf /"', 'sudo /bin/bash -lc "rm -rf *"',
+                    'echo "done $(rm -rf ~)"', 'echo "`rm -rf /`"', 'bash -c "sh -c \\"eval rm -rf /\\""']:
+        assert is_dangerous_rm_command(command), command
+
+    for command in ['bash -c "cat .env"', "sh -c 'cat .env'", 'echo "$(cat .env)"', 'echo "`cat .env`"',
+                    'eval cat .env']:
+        assert is_env_file_access('Bash', {'command': command}), command
+
+    # Quoted text the shell does not run
+    assert not is_env_file_access('Bash', {'command': "bash -c 'git commit -m \"load .env lazily\"'"})
+    assert not is_dangerous_rm_command("echo '$(rm -rf ~)'")
+    assert not is_dangerous_rm_command('git commit -m "drop rm -rf from the build"')
+
+
+def test_quoted_paths_and_programs_that_are_not_shell():
+    for command in ['cat "/home/u/my project/.env"', "cat '/tmp/a b/.env'",
+                    "python3 -c \"print(open('.env').read())\"", "ssh host 'cat ~/app/.env'"]:
+        assert is_env_file_access('Bash', {'command': command}), command
+
+    for command in ["python -c \"import os; os.system('rm -rf /')\"", "RM=rm; $RM -rf /",
+                    "perl -e 'system(\"rm -rf /\")'", "node -e \"require('child_process').execSync('rm -rf ~')\"",
+                    "ssh host 'rm -rf /'", "sudo $(echo rm) -rf /"]:
+        assert is_dangerous_rm_command(command), command
+
+    for command in ["python -m pytest -q", "ssh host uptime", "$EDITOR notes.txt"]:
+        assert not is_dangerous_rm_command(command), command
+
+
+def test_scan_time_is_linear():
+    def scan_seconds(size):
+        commands = [
+            "cat <<'EOF'\n" + "line with 'quotes' and \"more\" -rf ~/x\n" * (size // 40) + "EOF",
+            "rm " + "-" * size,
+            "echo \"" + "a" * size,
+            "rm " + "rm " * (size // 3),
+            'echo "' + "$(rm " * (size // 5) + '"',
+        ]
+        # Best of three, so a busy machine does not fail the bound
+        runs = []
+        for _ in range(3):
+            scan_command.cache_clear()
+            start = time.perf_counter()
+            for command in commands:
+                scan_command(command)
+            runs.append(time.perf_counter() - start)
+        return min(runs)
+
+    small, large = scan_seconds(8_000), scan_seconds(128_000)
+    assert large < 0.5
+    assert large < 40 * small  # 16x input, with room for timer noise
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for the hook daemon client in utils/daemon_client.py: when the hook
+falls back to processing an event itself, and the settings it forwards.
+
+USAGE:
+    python3 daemon_client_test.py
+    python3 -m pytest daemon_client_test.py
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the hooks and utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+import hook_daemon
+from utils.daemon_client import forward_to_daemon, with_timestamp
+
+
+def forward_to_fake_daemon(reply):
+    """Forward one event to a socket that reads it and answers `reply` (None: never answers)."""
+    received = []
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "hookd.sock")
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(path)
+        server.listen(1)
+        done = threading.Event()
+
+        def serve():
+            conn, _ = server.accept()
+            with conn:
+                received.append(hook_daemon._read_request(conn))
+                if reply is not None:
+                    conn.sendall(reply)
+                else:
+                    done.wait(2)
+
+        thread = threading.Thread(target=serve)
+        thread.start()
+        try:
+            forwarded = forward_to_daemon(['--event-type', 'Stop'], '{}', socket_path=path, timeout=0.2)
+        finally:
+            done.set()
+            thread.join()
+            server.close()
+    return forwarded, received
+
+
+def test_no_daemon_falls_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        assert forward_to_daemon([], '{}', socket_path=os.path.join(tmp, "missing.sock")) is False
+
+
+def test_sent_event_is_never_processed_twice():
+    assert forward_to_fake_daemon(b"ok\n")[0] is True
+    assert forward_to_fake_daemon(None)[0] is True  # no ack in time, but the daemon has the event
+    assert forward_to_fake_daemon(b"error\n")[0] is False  # rejected: process it in-process
+
+
+def test_event_is_stamped_once_when_the_hook_fires():
+    argv = with_timestamp(['--event-type', 'Stop'], 1700000000000)
+    assert argv == ['--event-type', 'Stop', '--timestamp', '1700000000000']
+    assert with_timestamp(argv) == argv  # a forwarded or replayed event keeps its stamp
+
+
+def test_settings_are_forwarded_and_applied_per_event():
+    original = dict(os.environ)
+    try:
+        os.environ.update(LOG_ENABLED="false", FEATURE_LOG_FORMAT="json", UNRELATED_SETTING="x")
+        _, received = forward_to_fake_daemon(b"ok\n")
+        env = received[0]['env']
+        assert env['LOG_ENABLED'] == 'false' and env['FEATURE_LOG_FORMAT'] == 'json'
+        assert 'UNRELATED_SETTING' not in env
+
+        # The daemon drops its own forwarded settings the hook did not send
+        os.environ['SQLITE_WRITE_MODE'] = 'direct'
+        hook_daemon._apply_env({'LOG_ENABLED': 'true'})
+        assert os.environ['LOG_ENABLED'] == 'true'
+        assert 'SQLITE_WRITE_MODE' not in os.environ and 'FEATURE_LOG_FORMAT' not in os.environ
+        assert os.environ['UNRELATED_SETTING'] == 'x'
+    finally:
+        os.environ.clear()
+        os.environ.update(original)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
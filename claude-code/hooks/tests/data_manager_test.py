@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for the git fast path and the context cache in utils/data_manager.py.
+
+Checks that reading .git/HEAD directly agrees with `git rev-parse` for a
+regular checkout, a linked worktree and a detached HEAD, and that cached
+contexts are dropped when HEAD or planning/features change.
+
+USAGE:
+    python3 data_manager_test.py
+    python3 -m pytest data_manager_test.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import data_manager
+from utils.data_manager import find_git_dir, read_head_branch, resolve_context
+
+
+def git(*args, cwd):
+    env = dict(os.environ, GIT_AUTHOR_NAME='test', GIT_AUTHOR_EMAIL='test@example.com',
+               GIT_COMMITTER_NAME='test', GIT_COMMITTER_EMAIL='test@example.com')
+    return subprocess.check_output(['git', *args], cwd=cwd, text=True, env=env).strip()
+
+
+def assert_matches_git(directory):
+    root, git_dir = find_git_dir(Path(directory))
+    assert root == Path(git('rev-parse', '--show-toplevel', cwd=directory))
+    assert git_dir.resolve() == Path(git('rev-parse', '--absolute-git-dir', cwd=directory)).resolve()
+    assert read_head_branch(git_dir) == git('rev-parse', '--abbrev-ref', 'HEAD', cwd=directory)
+
+
+def test_matches_git_rev_parse():
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = Path(tmp).resolve() / 'repo'
+        repo.mkdir()
+        git('init', '-q', cwd=repo)
+        git('checkout', '-q', '-b', '0001_language', cwd=repo)
+        git('commit', '-q', '--allow-empty', '-m', 'init', cwd=repo)
+        (repo / 'src' / 'nested').mkdir(parents=True)
+
+        assert_matches_git(repo)
+        assert_matches_git(repo / 'src' / 'nested')
+
+        # Linked worktree: .git is a file pointing into the main repository
+        worktree = Path(tmp).resolve() / 'worktree'
+        git('worktree', 'add', '-q', '-b', 'feature/other', str(worktree), cwd=repo)
+        assert (worktree / '.git').is_file()
+        assert_matches_git(worktree)
+
+        # Detached HEAD
+        git('checkout', '-q', '--detach', cwd=repo)
+        assert_matches_git(repo)
+
+
+def resolve_in(directory, memory=True):
+    """resolve_context() in directory; memory=False drops the in-memory cache first (a new hook process)."""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        if not memory:
+            data_manager._context_cache.clear()
+        return resolve_context()
+    finally:
+        os.chdir(cwd)
+
+
+def with_context_cache(test):
+    """Run test(repo) with the context cache in a temporary directory."""
+    original = data_manager.CONTEXT_CACHE_PATH
+    with tempfile.TemporaryDirectory() as tmp:
+        data_manager.CONTEXT_CACHE_PATH = Path(tmp) / 'context.json'
+        data_manager._context_cache.clear()
+        repo = Path(tmp).resolve() / 'repo'
+        repo.mkdir()
+        git('init', '-q', '-b', 'language', cwd=repo)
+        (repo / 'planning' / 'features' / '0001_language').mkdir(parents=True)
+        try:
+            test(repo)
+        finally:
+            data_manager.CONTEXT_CACHE_PATH = original
+            data_manager._context_cache.clear()
+
+
+def test_context_cache_is_reused_across_processes():
+    def check(repo):
+        first = resolve_in(repo)
+        assert first.feature_folder == repo / 'planning' / 'features' / '0001_language'
+
+        original = data_manager._compute_context
+        data_manager._compute_context = lambda: (_ for _ in ()).throw(AssertionError('cache missed'))
+        try:
+            assert resolve_in(repo) == first
+            assert resolve_in(repo, memory=False) == first  # from the on-disk cache
+        finally:
+            data_manager._compute_context = original
+
+    with_context_cache(check)
+
+
+def test_branch_switch_invalidates_context():
+    def check(repo):
+        for memory in (True, False):
+            resolve_in(repo)
+            git('checkout', '-q', '-b', 'other' if memory else 'another', cwd=repo)
+            context = resolve_in(repo, memory)
+            assert context.branch == ('other' if memory else 'another')
+            assert context.feature_folder is None
+
+    with_context_cache(check)
+
+
+def test_new_feature_folder_invalidates_context():
+    def check(repo):
+        for number, memory in (('0002', True), ('0003', False)):
+            resolve_in(repo)
+            (repo / 'planning' / 'features' / f'{number}_language').mkdir()
+            assert resolve_in(repo, memory).feature_number == number
+
+    with_context_cache(check)
+
+
+def test_rewrite_with_same_mtime_invalidates_context():
+    def check(repo):
+        resolve_in(repo)
+        head = repo / '.git' / 'HEAD'
+        st = head.stat()
+        tmp = head.with_name('HEAD.lock')
+        tmp.write_text('ref: refs/heads/langu4ge\n')  # same size: only the inode tells
+        os.replace(tmp, head)
+        os.utime(head, ns=(st.st_atime_ns, st.st_mtime_ns))
+        assert (head.stat().st_mtime_ns, head.stat().st_size) == (st.st_mtime_ns, st.st_size)
+        assert resolve_in(repo).branch == 'langu4ge'
+
+    with_context_cache(check)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Tests for the features table schema in utils/db.py and its dedup key
+(event_key in utils/logger.py).
+
+USAGE:
+    python3 db_test.py
+    python3 -m pytest db_test.py
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import db
+from utils.logger import insert_events
+
+
+def event(tool_use_id, summary=None):
+    return {
+        'session_id': 'test-session-12345',
+        'hook_event_type': 'PreToolUse',
+        'timestamp': 1700000000000,
+        'summary': summary,
+        'payload': {'tool_name': 'Read', 'tool_use_id': tool_use_id},
+    }
+
+
+def test_replayed_event_is_ignored_and_distinct_events_are_kept():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        try:
+            conn = db.get_connection(path)
+            insert_events(conn, [event('toolu_1', summary="Reads a file")])
+            insert_events(conn, [event('toolu_1'), event('toolu_2')])  # replay, and a second event in the same ms
+            conn.commit()
+
+            rows = conn.execute("SELECT summary FROM features ORDER BY id").fetchall()
+            assert rows == [("Reads a file",), (None,)]  # the replay did not clobber the stored row
+        finally:
+            db.close_connection(path)
+
+
+def test_migration_keeps_historical_rows():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = sqlite3.connect(path)
+        db._migrate_v1(conn)
+        legacy = ('test-session-12345', 'Stop', 1700000000000, json.dumps({}))
+        conn.executemany("INSERT INTO features (session_id, hook_event_type, timestamp, payload) VALUES (?, ?, ?, ?)",
+                         [legacy, legacy])
+        conn.commit()
+        conn.close()
+
+        try:
+            conn = db.get_connection(path)
+            assert conn.execute("PRAGMA user_version").fetchone()[0] == db.SCHEMA_VERSION
+            assert conn.execute("SELECT COUNT(*) FROM features").fetchone()[0] == 2
+            # The dashboard indexes over the history are left to `migrate`
+            assert db.build_indexes(path) == [name for name, _ in db.INDEXES]
+            assert db.build_indexes(path) == []
+        finally:
+            db.close_connection(path)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-process hook dispatcher in dispatch.py. log_feature is
+replaced by a fake that records its calls.
+
+USAGE:
+    python3 dispatch_test.py
+    python3 -m pytest dispatch_test.py
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the hooks and utils
+sys.path.append(str(Path(__file__).parent.parent))
+
+import dispatch
+import log_feature
+from utils import constants, daemon_client
+from utils.session_log import read_session_events
+
+
+def run_dispatch(argv, payload):
+    """Dispatch one event; returns (exit_code, log_feature calls, session log dir)."""
+    calls = []
+    original = log_feature.process_event, daemon_client.forward_to_daemon, constants.LOG_BASE_DIR
+    fired_ms = int(time.time() * 1000)
+
+    def record_call(argv, stdin_text, input_data=None, timer=None):
+        # Stamped with when the hook fired, before the event is forwarded
+        assert argv[-2] == '--timestamp' and int(argv[-1]) >= fired_ms
+        calls.append((argv[:-2], input_data))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_feature.process_event = record_call
+        daemon_client.forward_to_daemon = lambda argv, stdin_text: False
+        constants.LOG_BASE_DIR = tmp
+        try:
+            exit_code = dispatch.dispatch(argv, json.dumps(payload))
+            events = list(read_session_events(payload['session_id'], 'pre_tool_use'))
+            return exit_code, calls, events
+        finally:
+            log_feature.process_event, daemon_client.forward_to_daemon, constants.LOG_BASE_DIR = original
+
+
+def test_policy_verdict_and_logging_in_one_process():
+    payload = {'session_id': 'test-session-12345', 'tool_name': 'Bash', 'tool_input': {'command': 'ls -la'}}
+    exit_code, calls, events = run_dispatch(['PreToolUse', '--source-app', 'app', '--summarize'], payload)
+
+    assert exit_code == 0
+    assert events == [payload]
+    assert calls == [(['--event-type', 'PreToolUse', '--source-app', 'app', '--summarize'], payload)]
+
+
+def test_blocked_call_is_still_logged():
+    payload = {'session_id': 'test-session-12345', 'tool_name': 'Bash', 'tool_input': {'command': 'rm -rf /'}}
+    exit_code, calls, events = run_dispatch(['PreToolUse'], payload)
+
+    assert exit_code == 2
+    assert events == []  # the hook only records allowed calls
+    assert len(calls) == 1
+
+
+def test_hook_options_are_not_passed_to_log_feature():
+    payload = {'session_id': 'test-session-12345', 'prompt': 'hello'}
+    exit_code, calls, _ = run_dispatch(['UserPromptSubmit', '--log-only', '--source-app', 'app'], payload)
+    assert exit_code == 0
+    assert calls[0][0] == ['--event-type', 'UserPromptSubmit', '--source-app', 'app']
+
+    exit_code, calls, _ = run_dispatch(['Stop', '--no-log'], payload)
+    assert (exit_code, calls) == (0, [])
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
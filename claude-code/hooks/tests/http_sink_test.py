@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched event sender in utils/http_sink.py, run against the
+stand-in server in stubs/event_server.py.
+
+USAGE:
+    python3 http_sink_test.py
+    python3 -m pytest http_sink_test.py
+"""
+
+import os
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stubs.event_server import EventServerStub
+from utils import circuit_breaker, http_sink
+from utils.spool import acquire_writer_lock, pending_files, spool_event
+
+
+def in_temp_cache(func):
+    """Run func with the breaker state in a temporary directory."""
+    original = circuit_breaker.STATE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        circuit_breaker.STATE_DIR = Path(tmp) / 'breakers'
+        try:
+            return func(Path(tmp) / 'outbox')
+        finally:
+            circuit_breaker.STATE_DIR = original
+
+
+def event(i):
+    return {'session_id': 'test-session', 'hook_event_type': 'PostToolUse', 'timestamp': i,
+            'payload': {'tool_name': 'Read', 'tool_input': {'file_path': f'/src/file{i}.py'}}}
+
+
+def unused_url():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return f"http://127.0.0.1:{sock.getsockname()[1]}/events"
+
+
+def test_events_are_posted_one_object_each_by_default():
+    stub = EventServerStub(port=0).start()
+
+    def run(outbox):
+        for i in range(3):
+            spool_event(event(i), outbox)
+        assert http_sink.send_event(event(3), stub.url, outbox)
+        assert pending_files(outbox) == []
+
+    try:
+        in_temp_cache(run)
+        assert [e['timestamp'] for e in stub.events] == list(range(4))
+        assert stub.stats['requests'] == 4
+        assert stub.stats['connections'] == 1
+    finally:
+        stub.stop()
+
+
+def test_queued_events_go_out_in_one_compressed_ndjson_batch():
+    os.environ['HTTP_SINK_FORMAT'] = 'ndjson'
+    stub = EventServerStub(port=0).start()
+
+    def run(outbox):
+        for i in range(30):
+            spool_event(event(i), outbox)
+        assert http_sink.send_event(event(30), stub.url, outbox)
+        assert pending_files(outbox) == []
+
+    try:
+        in_temp_cache(run)
+        assert [e['timestamp'] for e in stub.events] == list(range(31))
+        assert stub.stats['requests'] == 1
+        assert stub.stats['bytes'] < len(str(stub.events))  # gzip
+    finally:
+        stub.stop()
+        del os.environ['HTTP_SINK_FORMAT']
+
+
+def test_hook_flush_stops_at_the_deadline():
+    os.environ.update(HTTP_SINK_BACKOFF_MS='1000', HTTP_SINK_DEADLINE_S='0.2')
+    try:
+        def run(outbox):
+            start = time.monotonic()
+            assert http_sink.send_event(event(1), unused_url(), outbox)
+            return time.monotonic() - start, pending_files(outbox)
+
+        elapsed, pending = in_temp_cache(run)
+        assert elapsed < 0.5  # not 1 s + 2 s of backoff
+        assert len(pending) == 1
+    finally:
+        del os.environ['HTTP_SINK_BACKOFF_MS'], os.environ['HTTP_SINK_DEADLINE_S']
+
+
+def test_events_wait_in_the_outbox_while_the_server_is_down():
+    os.environ['HTTP_SINK_BACKOFF_MS'] = '1'
+    try:
+        def run(outbox):
+            url = unused_url()
+            assert http_sink.send_event(event(1), url, outbox)
+            assert http_sink.send_event(event(2), url, outbox)  # skipped: server known down
+            assert len(pending_files(outbox)) == 2
+
+            stub = EventServerStub(port=0).start()
+            try:
+                assert http_sink.flush_outbox(stub.url, outbox, blocking=True) == 2
+                return [e['timestamp'] for e in stub.events]
+            finally:
+                stub.stop()
+
+        assert in_temp_cache(run) == [1, 2]
+    finally:
+        del os.environ['HTTP_SINK_BACKOFF_MS']
+
+
+def test_busy_flush_lock_does_not_use_up_the_recovery_probe():
+    os.environ.update(HTTP_SINK_BACKOFF_MS='1', HTTP_SINK_RETRY_AFTER_S='0.05')
+    try:
+        def run(outbox):
+            assert http_sink.send_event(event(1), unused_url(), outbox)  # server down: breaker opens
+            time.sleep(0.1)  # half-open: the next flush may probe
+
+            lock_fd = acquire_writer_lock(outbox, blocking=True)
+            try:
+                assert http_sink.flush_outbox(unused_url(), outbox) is None  # someone else is flushing
+            finally:
+                os.close(lock_fd)
+
+            stub = EventServerStub(port=0).start()
+            try:
+                assert http_sink.flush_outbox(stub.url, outbox) == 1
+            finally:
+                stub.stop()
+
+        in_temp_cache(run)
+    finally:
+        del os.environ['HTTP_SINK_BACKOFF_MS'], os.environ['HTTP_SINK_RETRY_AFTER_S']
+
+
+def test_retries_server_errors_on_a_kept_alive_connection():
+    os.environ['HTTP_SINK_BACKOFF_MS'] = '1'
+    stub = EventServerStub(port=0, error_rate=0.5, seed=3).start()
+    try:
+        def run(outbox):
+            for i in range(5):
+                http_sink.send_event(event(i), stub.url, outbox)
+            return pending_files(outbox)
+
+        assert in_temp_cache(run) == []
+        assert sorted(e['timestamp'] for e in stub.events) == list(range(5))
+        assert stub.stats['errors'] > 0
+        assert stub.stats['connections'] == 1
+    finally:
+        stub.stop()
+        del os.environ['HTTP_SINK_BACKOFF_MS']
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
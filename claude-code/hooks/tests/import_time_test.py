@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Import-time regression tests for the hook entry point.
+
+Each test starts dispatch.py cold under `python -X importtime` in a scratch
+git repository and checks the modules it imported: no third-party package
+may load before log_feature.py knows there is a feature folder, the sinks and
+LLM SDKs only load when their option is set, and the imports of the whole
+process must fit in HOOK_IMPORT_BUDGET_MS.
+
+USAGE:
+    python3 import_time_test.py
+    python3 -m pytest import_time_test.py
+    HOOK_IMPORT_BUDGET_MS=60 python3 -m pytest import_time_test.py
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).parent.parent
+
+# Cumulative import time of a cold hook, in milliseconds; generous because
+# CI machines are slow, tighten it locally to catch smaller regressions
+IMPORT_BUDGET_MS = float(os.environ.get("HOOK_IMPORT_BUDGET_MS", "150"))
+
+# Packages that must not load on the paths tested here
+HEAVY_PACKAGES = ("supabase", "openai", "anthropic", "httpx", "pydantic")
+
+
+def best_import_ms(repo, args, payload, runs=3):
+    """The least import time of a few cold runs; one run is too noisy for a budget."""
+    return min(import_ms(run_hook_cold(repo, args, payload)) for _ in range(runs))
+
+
+def run_hook_cold(repo, args, payload):
+    """Run dispatch.py under -X importtime; returns {module: cumulative us} of top-level imports."""
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ,
+                   CLAUDE_HOOKS_CACHE_DIR=cache,
+                   CLAUDE_HOOKS_LOG_DIR=os.path.join(cache, "logs"),
+                   CLAUDE_HOOKS_SOCKET=os.path.join(cache, "none.sock"),
+                   CLAUDE_HOOKS_DAEMON_AUTOSTART="false",
+                   SQLITE_WRITE_MODE="spool-only")
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", str(HOOKS_DIR / "dispatch.py"), *args],
+            input=json.dumps(payload), cwd=repo, env=env, capture_output=True, text=True, timeout=60,
+        )
+    assert result.returncode == 0, result.stderr
+
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        imports[name.strip()] = (int(cumulative), not name[1:].startswith(" "))
+    return imports
+
+
+def heavy_modules(imports):
+    return sorted(name for name in imports if name.split(".")[0] in HEAVY_PACKAGES)
+
+
+def import_ms(imports):
+    return sum(cumulative for cumulative, top_level in imports.values() if top_level) / 1000
+
+
+def make_repo(tmp, feature_folder=None):
+    repo = Path(tmp) / "repo"
+    repo.mkdir()
+    subprocess.run(["git", "init", "-q", "-b", "demo", str(repo)], check=True)
+    if feature_folder:
+        (repo / "planning" / "features" / feature_folder).mkdir(parents=True)
+    return repo
+
+
+PAYLOAD = {"session_id": "test-session-12345", "tool_name": "Bash", "tool_input": {"command": "ls -la"}}
+
+
+def test_no_feature_folder_imports_no_third_party_package():
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(tmp)
+        imports = run_hook_cold(repo, ["PreToolUse", "--summarize"], PAYLOAD)
+        elapsed = best_import_ms(repo, ["PreToolUse", "--summarize"], PAYLOAD)
+
+    assert "log_feature" in imports
+    assert "dotenv" not in imports
+    assert "utils.logger" not in imports
+    assert heavy_modules(imports) == []
+    assert elapsed < IMPORT_BUDGET_MS, f"{elapsed:.1f} ms of imports"
+
+
+def test_feature_event_without_summary_skips_sdks():
+    with tempfile.TemporaryDirectory() as tmp:
+        repo = make_repo(tmp, "0001_demo")
+        imports = run_hook_cold(repo, ["PreToolUse"], PAYLOAD)
+        assert (repo / "planning" / "features" / "0001_demo" / "log.jsonl").exists()
+        elapsed = best_import_ms(repo, ["PreToolUse"], PAYLOAD)
+
+    assert "utils.logger" in imports
+    assert "utils.summarizer" not in imports
+    assert heavy_modules(imports) == []
+    assert elapsed < IMPORT_BUDGET_MS, f"{elapsed:.1f} ms of imports"
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only JSONL event store in utils/jsonl_store.py.
+
+USAGE:
+    python3 jsonl_store_test.py
+    python3 -m pytest jsonl_store_test.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.jsonl_store import (
+    append_jsonl,
+    count_jsonl_records,
+    export_json_array,
+    import_json_array,
+    index_path,
+    iter_jsonl,
+    read_jsonl_record,
+    rebuild_index,
+)
+
+
+def make_events(count):
+    return [
+        {
+            'hook_event_type': 'PreToolUse',
+            'session_id': 'test-session-12345',
+            'timestamp': 1752900000000 + i,
+            'payload': {'tool_name': 'Bash', 'tool_input': {'command': f'echo {i}\nline two'}},
+        }
+        for i in range(count)
+    ]
+
+
+def test_append_and_read_back():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "feature" / "log.jsonl"
+        events = make_events(5)
+        for event in events:
+            append_jsonl(log_path, event)
+
+        assert list(iter_jsonl(log_path)) == events
+        assert count_jsonl_records(log_path) == 5
+        assert read_jsonl_record(log_path, 2) == events[2]
+        assert read_jsonl_record(log_path, -1) == events[-1]
+
+
+def test_export_matches_legacy_format():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "log.jsonl"
+        events = make_events(3)
+        for event in events:
+            append_jsonl(log_path, event)
+
+        exported = export_json_array(log_path)
+        assert exported == Path(tmp) / "log.json"
+        assert exported.read_text(encoding="utf-8") == json.dumps(events, indent=2)
+
+        empty = export_json_array(Path(tmp) / "missing.jsonl")
+        assert empty.read_text(encoding="utf-8") == json.dumps([], indent=2)
+
+
+def test_import_and_rebuild_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = Path(tmp) / "log.json"
+        events = make_events(4)
+        legacy.write_text(json.dumps(events, indent=2), encoding="utf-8")
+
+        log_path = import_json_array(legacy)
+        assert import_json_array(legacy) == log_path  # rerunning does not duplicate
+        assert count_jsonl_records(log_path) == 4
+        index_path(log_path).unlink()
+        assert rebuild_index(log_path) == 4
+        assert read_jsonl_record(log_path, 3) == events[3]
+
+
+def test_record_after_a_torn_line_is_indexed_on_its_own():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "log.jsonl"
+        events = make_events(3)
+        append_jsonl(log_path, events[0])
+        # A writer died mid-append; the next record lands on its line
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(events[1])[:20])
+        append_jsonl(log_path, events[2])
+
+        assert rebuild_index(log_path) == 2
+        assert read_jsonl_record(log_path, -1) == events[2]
+        assert list(iter_jsonl(log_path)) == [events[0], events[2]]
+
+
+def test_stale_index_is_rebuilt():
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = Path(tmp) / "log.jsonl"
+        events = make_events(4)
+        for event in events[:3]:
+            append_jsonl(log_path, event)
+
+        # Crash between the data and the index write: the record is not indexed
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(events[3]) + "\n")
+        assert count_jsonl_records(log_path) == 4
+        assert read_jsonl_record(log_path, -1) == events[3]
+
+        # Data file rewritten shorter than the index
+        log_path.write_text(json.dumps(events[0]) + "\n", encoding="utf-8")
+        assert count_jsonl_records(log_path) == 1
+        assert read_jsonl_record(log_path, -1) == events[0]
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
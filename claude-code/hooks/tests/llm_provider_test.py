@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the provider layer in utils/llm/provider.py, run against the
+stand-in LLM server in stubs/llm_stub.py.
+
+USAGE:
+    python3 llm_provider_test.py
+    python3 -m pytest llm_provider_test.py
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stubs.llm_stub import LLMStub
+from utils.llm import provider
+
+
+def with_provider(name, env, func):
+    saved = {key: os.environ.get(key) for key in ['LLM_PROVIDER', *env]}
+    os.environ['LLM_PROVIDER'] = name
+    os.environ.update(env)
+    provider._provider = None
+    try:
+        return func()
+    finally:
+        provider._provider = None
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def test_local_provider_against_stub():
+    stub = LLMStub(port=0, responses=['Reads the plan']).start()
+    env = {'LLM_LOCAL_URL': f'{stub.url}/v1/chat/completions'}
+    try:
+        assert with_provider('local', env, lambda: provider.prompt_llm('Summarize')) == 'Reads the plan'
+        assert with_provider('local', env, lambda: provider.prompt_llm(
+            'Return ONLY a JSON array of exactly 2 strings')) == '["Reads the plan", "Reads the plan"]'
+
+        stub.error_rate = 1.0
+        assert with_provider('local', env, lambda: provider.prompt_llm('Summarize')) is None
+        assert stub.stats == {'requests': 3, 'ok': 2, 'errors': 1, 'rate_limited': 0}
+    finally:
+        stub.stop()
+
+
+def test_registered_provider_is_selectable():
+    provider.register_provider('echo', lambda prompt_text, max_tokens=100: prompt_text.upper())
+    assert with_provider('echo', {}, lambda: provider.prompt_llm('reads file')) == 'READS FILE'
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
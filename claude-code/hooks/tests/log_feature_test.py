@@ -33,10 +33,12 @@ import tempfile
 from datetime import datetime
 from pathlib import Path
 
-# Add the utils directory to the path so we can import the logger
-sys.path.append(str(Path(__file__).parent.parent / "utils"))
+# Add the hooks directory to the path so we can import the logger
+sys.path.append(str(Path(__file__).parent.parent))
 
-from logger import send_event_to_sqllite_database
+from utils.logger import send_event_to_sqllite_database
+from utils.transcript_store import load_event_chat
+from utils.codec import decode
 
 
 def create_mock_event_data():
@@ -153,9 +155,17 @@ def query_database(db_path):
         schema = cursor.fetchall()
         
         # Get all events
-        cursor.execute("SELECT * FROM features ORDER BY timestamp")
+        cursor.execute("""
+            SELECT id, type, source_app, feature_name, feature_number, user, session_id,
+                   hook_event_type, timestamp, chat, summary, payload
+            FROM features ORDER BY timestamp
+        """)
         events = cursor.fetchall()
         
+        # Reconstruct normalized chat transcripts and decode the payload BLOBs
+        events = [event[:9] + (load_event_chat(conn, event[0]), event[10], decode(event[11], conn))
+                  for event in events]
+        
         conn.close()
         return schema, events
     except Exception as e:
@@ -255,6 +265,10 @@ def test_database_operations():
     
     print(f"\n{'='*60}")
     print(f"RESULTS: {success_count}/{len(events)} events inserted successfully")
+
+    # The events share one millisecond; their payloads tell them apart
+    assert success_count == len(events)
+    assert len(query_database(db_path)[1]) == len(events)
     
     # Show database contents
     print_database_contents(db_path)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared session log writer in utils/session_log.py.
+
+USAGE:
+    python3 session_log_test.py
+    python3 -m pytest session_log_test.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from multiprocessing import Pool
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import constants
+from utils.session_log import append_session_event, compact_session_log, read_session_events
+
+
+def _append_many(args):
+    session_id, worker, count = args
+    for i in range(count):
+        append_session_event(session_id, 'pre_tool_use', {'worker': worker, 'i': i}, max_bytes=2048)
+
+
+def test_rotation_and_compaction():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_base = constants.LOG_BASE_DIR
+        constants.LOG_BASE_DIR = tmp
+        try:
+            events = [{'session_id': 'test-session-12345', 'n': i, 'pad': 'x' * 50} for i in range(40)]
+            for event in events:
+                append_session_event('test-session-12345', 'post_tool_use', event, max_bytes=1024)
+
+            log_dir = Path(tmp) / 'test-session-12345'
+            assert (log_dir / 'post_tool_use.1.jsonl').exists()
+            assert all(p.stat().st_size <= 1024 for p in log_dir.glob('post_tool_use*.jsonl'))
+            assert list(read_session_events('test-session-12345', 'post_tool_use')) == events
+
+            compacted = compact_session_log('test-session-12345', 'post_tool_use')
+            assert json.loads(compacted.read_text()) == events
+        finally:
+            constants.LOG_BASE_DIR = old_base
+
+
+def test_concurrent_writers_do_not_lose_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        old_cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            with Pool(4) as pool:
+                pool.map(_append_many, [('concurrent', w, 50) for w in range(4)])
+            events = list(read_session_events('concurrent', 'pre_tool_use'))
+            assert len(events) == 200
+            assert {(e['worker'], e['i']) for e in events} == {(w, i) for w in range(4) for i in range(50)}
+        finally:
+            os.chdir(old_cwd)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests for the SQLite write spool in utils/spool.py: draining, events that
+keep failing, and the size of the drain metrics.
+
+USAGE:
+    python3 spool_test.py
+    python3 -m pytest spool_test.py
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import spool
+from utils.db import close_connection, get_connection
+
+
+def make_event(n):
+    return {
+        'source_app': 'test', 'session_id': 'test-session-12345', 'hook_event_type': 'PreToolUse',
+        'timestamp': 1700000000000 + n, 'payload': {'tool_name': 'Bash', 'n': n},
+    }
+
+
+def count_rows(path_to_db):
+    return get_connection(path_to_db).execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+
+def test_drain_commits_queued_events():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "events.db"
+        try:
+            for n in range(3):
+                spool.spool_event(make_event(n), spool.spool_dir_for(db))
+            assert spool.drain_spool(db) == 3
+            assert count_rows(db) == 3
+            assert spool.pending_files(spool.spool_dir_for(db)) == []
+        finally:
+            close_connection(db)
+
+
+def test_failing_event_is_quarantined_without_blocking_the_queue():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "events.db"
+        spool_dir = spool.spool_dir_for(db)
+        try:
+            bad = spool.spool_event(["not", "an", "event"], spool_dir)
+            spool.spool_event(make_event(1), spool_dir)
+            assert spool.drain_spool(db) == 1  # the good event of the batch still commits
+            assert spool.pending_files(spool_dir) == [bad]
+
+            for _ in range(spool.MAX_ATTEMPTS - 1):
+                spool.drain_spool(db)
+            assert spool.pending_files(spool_dir) == []
+            assert (spool_dir / "failed" / bad.name).exists()
+            assert not (spool_dir / ".attempts.json").exists()
+            assert count_rows(db) == 1
+        finally:
+            close_connection(db)
+
+
+def test_send_event_survives_a_failing_drain():
+    original = spool.drain_spool
+
+    def broken_drain(path_to_db):
+        raise OSError("disk on fire")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "events.db"
+        spool.drain_spool = broken_drain
+        try:
+            assert spool.send_event_to_spool(make_event(1), db) is True
+        finally:
+            spool.drain_spool = original
+        assert len(spool.pending_files(spool.spool_dir_for(db))) == 1
+
+
+def test_writer_backs_off_while_the_database_fails():
+    original = spool._drain_locked, spool.time.sleep
+    sleeps = []
+
+    def locked_db(path_to_db, spool_dir, batch_size):
+        raise sqlite3.OperationalError("database is locked")
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        if len(sleeps) == 8:
+            raise KeyboardInterrupt
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Path(tmp) / "events.db"
+        spool.spool_event(make_event(1), spool.spool_dir_for(db))
+        spool._drain_locked, spool.time.sleep = locked_db, sleep
+        try:
+            spool.run_writer(db, max_wait_ms=0)
+        finally:
+            spool._drain_locked, spool.time.sleep = original
+    assert sleeps == sorted(sleeps) and sleeps[-1] == spool.MAX_RETRY_DELAY_S
+
+
+def test_metrics_are_rotated():
+    original = spool.METRICS_MAX_BYTES
+    spool.METRICS_MAX_BYTES = 200
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for _ in range(20):
+                spool._record_metrics(tmp, 5, 1, 0.0, None)
+            current = Path(tmp) / "metrics.jsonl"
+            assert current.stat().st_size < 400
+            assert (Path(tmp) / "metrics.1.jsonl").stat().st_size < 400
+            stats = spool.spool_stats(tmp)
+            assert 0 < stats['drains'] < 20
+            assert json.loads(current.read_text().splitlines()[-1])['events'] == 5
+    finally:
+        spool.METRICS_MAX_BYTES = original
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Tests for batched summarization in utils/summarizer.py. The LLM is replaced
+by a fake prompt_llm that records its calls.
+
+USAGE:
+    python3 summarizer_test.py
+    python3 -m pytest summarizer_test.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import circuit_breaker, summarizer, summary_cache
+from utils.llm import provider
+
+
+def tool_event(file_path, session_id='test-session-12345', tool_name='mcp__docs__read'):
+    # MCP tools have no local summarizer, so these go to the (fake) LLM
+    return {
+        'hook_event_type': 'PreToolUse',
+        'session_id': session_id,
+        'payload': {'session_id': session_id, 'cwd': '/src', 'tool_name': tool_name,
+                    'tool_input': {'file_path': file_path}},
+    }
+
+
+class FakeLLM:
+    """Answers batch prompts with a JSON array and single prompts with one line."""
+
+    def __init__(self, malformed=False):
+        self.calls = []
+        self.malformed = malformed
+
+    def __call__(self, prompt, max_tokens=100):
+        self.calls.append(max_tokens)
+        paths = [line.split('"file_path": "')[1].split('"')[0]
+                 for line in prompt.splitlines() if '"file_path"' in line]
+        if 'JSON array' in prompt:
+            if self.malformed:
+                return "Here are the summaries: Reads one; Reads two"
+            return "```json\n" + json.dumps([f"Reads {p}." for p in paths]) + "\n```"
+        return f"Reads {paths[0]}."
+
+
+def run_with(fake, func):
+    original_llm, original_path = summarizer.prompt_llm, summary_cache.CACHE_PATH
+    original_state_dir = circuit_breaker.STATE_DIR
+    with tempfile.TemporaryDirectory() as tmp:
+        summarizer.prompt_llm = fake
+        summary_cache.CACHE_PATH = Path(tmp) / 'summaries.sqlite'
+        circuit_breaker.STATE_DIR = Path(tmp) / 'breakers'
+        try:
+            return func()
+        finally:
+            summarizer.flush_stats()  # into this test's cache
+            summarizer.prompt_llm, summary_cache.CACHE_PATH = original_llm, original_path
+            circuit_breaker.STATE_DIR = original_state_dir
+            summary_cache.close_connection(Path(tmp) / 'summaries.sqlite')
+
+
+def test_batches_events_into_one_request():
+    fake = FakeLLM()
+    events = [tool_event(f'/src/file{i}.py') for i in range(5)]
+    events.append(tool_event('/src/file0.py', session_id='other-session'))  # same as events[0]
+
+    summaries = run_with(fake, lambda: summarizer.generate_event_summaries(events, batch_size=10))
+
+    assert summaries == [f"Reads /src/file{i}.py" for i in range(5)] + ["Reads /src/file0.py"]
+    assert len(fake.calls) == 1
+    assert fake.calls[0] > 100
+
+
+def test_falls_back_to_one_request_per_event():
+    fake = FakeLLM(malformed=True)
+    events = [tool_event(f'/src/file{i}.py') for i in range(3)]
+
+    summaries = run_with(fake, lambda: summarizer.generate_event_summaries(events, batch_size=10))
+
+    assert summaries == [f"Reads /src/file{i}.py" for i in range(3)]
+    assert len(fake.calls) == 1 + 3
+
+
+def test_failed_batch_request_is_not_retried_per_event():
+    calls = []
+
+    def failing_llm(prompt, max_tokens=100):
+        calls.append(max_tokens)
+        return None  # network error or deadline exceeded
+
+    events = [tool_event(f'/src/file{i}.py') for i in range(3)]
+    summaries = run_with(failing_llm, lambda: summarizer.generate_event_summaries(events, batch_size=10))
+
+    assert summaries == [None] * 3
+    assert len(calls) == 1
+
+
+def test_cached_events_skip_the_llm():
+    fake = FakeLLM()
+
+    def summarize_twice():
+        summarizer.generate_event_summary(tool_event('/src/app.py'))
+        return summarizer.generate_event_summaries([tool_event('/src/app.py', session_id='s2')])
+
+    assert run_with(fake, summarize_twice) == ["Reads /src/app.py"]
+    assert len(fake.calls) == 1
+
+
+def test_known_tools_are_summarized_locally():
+    fake = FakeLLM()
+    events = [
+        tool_event('/src/app.py', tool_name='Read'),
+        tool_event('/src/app.py', tool_name='Edit'),
+        {'hook_event_type': 'PostToolUse', 'payload': {'tool_name': 'Bash', 'tool_input': {'command': 'npm test'}}},
+        tool_event('/src/notes.md'),
+    ]
+
+    def summarize():
+        summaries = summarizer.generate_event_summaries(events)
+        summarizer.flush_stats()
+        return summaries, summary_cache.stats()['counters']
+
+    summaries, counters = run_with(fake, summarize)
+
+    assert summaries == ["Reads app.py", "Edits app.py", "Runs npm test", "Reads /src/notes.md"]
+    assert len(fake.calls) == 1
+    assert counters['local_summary.Read'] == 1
+    assert counters['local_summary.Bash'] == 1
+    assert counters['llm_requests'] == 1
+
+
+def test_open_breaker_skips_the_llm():
+    calls = []
+
+    def failing_llm(prompt, max_tokens=100):
+        calls.append(max_tokens)
+        return None
+
+    def summarize():
+        summaries = [summarizer.generate_event_summary(tool_event(f'/src/file{i}.py')) for i in range(5)]
+        summarizer.flush_stats()
+        return summaries, summary_cache.stats()['counters'], summarizer.llm_breaker().state()
+
+    summaries, counters, state = run_with(failing_llm, summarize)
+
+    assert summaries == [None] * 5
+    assert len(calls) == 3  # CIRCUIT_BREAKER_FAILURES
+    assert counters['llm_skipped'] == 2
+    assert state == 'open'
+
+
+def test_missing_sdk_does_not_trip_the_breaker():
+    fake = FakeLLM()
+
+    def summarize():
+        summaries = [summarizer.generate_event_summary(tool_event(f'/src/file{i}.py')) for i in range(5)]
+        return summaries, summarizer.llm_breaker().state()
+
+    original = provider._provider, dict(provider._sdk_installed)
+    provider._provider = 'anthropic'
+    provider._sdk_installed['anthropic'] = False  # as if `import anthropic` failed
+    try:
+        summaries, state = run_with(fake, summarize)
+    finally:
+        provider._provider = original[0]
+        provider._sdk_installed.clear()
+        provider._sdk_installed.update(original[1])
+
+    assert summaries == [None] * 5
+    assert fake.calls == []
+    assert state == 'closed'
+
+
+def test_unusual_input_escalates_to_the_llm():
+    assert summarizer.summarize_locally(tool_event('/src/app.py', tool_name='Read')) == "Reads app.py"
+    assert summarizer.summarize_locally({'hook_event_type': 'PreToolUse',
+                                         'payload': {'tool_name': 'Read', 'tool_input': {}}}) is None
+    assert summarizer.summarize_locally({'hook_event_type': 'Stop', 'payload': {}}) is None
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Tests for the summary cache in utils/summary_cache.py.
+
+USAGE:
+    python3 summary_cache_test.py
+    python3 -m pytest summary_cache_test.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import summary_cache
+
+
+def read_event(session_id, file_path, timestamp):
+    return {
+        'hook_event_type': 'PreToolUse',
+        'session_id': session_id,
+        'timestamp': timestamp,
+        'payload': {
+            'session_id': session_id,
+            'transcript_path': f'/tmp/{session_id}.jsonl',
+            'cwd': '/home/user/project',
+            'tool_name': 'Read',
+            'tool_input': {'file_path': file_path},
+        },
+    }
+
+
+def test_fingerprint_ignores_volatile_fields():
+    a = summary_cache.fingerprint(read_event('s1', '/src/app.py', 1))
+    b = summary_cache.fingerprint(read_event('s2', '/src/app.py', 2))
+    c = summary_cache.fingerprint(read_event('s1', '/src/other.py', 1))
+    assert a == b
+    assert a != c
+
+    prompt = {'hook_event_type': 'UserPromptSubmit', 'payload': {'session_id': 's1', 'prompt': 'run tests'}}
+    same_prompt = {'hook_event_type': 'UserPromptSubmit', 'payload': {'session_id': 's2', 'prompt': 'run tests'}}
+    assert summary_cache.fingerprint(prompt) == summary_cache.fingerprint(same_prompt)
+
+
+def test_hits_misses_and_lru_eviction():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = summary_cache.get_connection(os.path.join(tmp, 'summaries.sqlite'))
+        os.environ['SUMMARY_CACHE_MAX_ENTRIES'] = '2'
+        try:
+            assert summary_cache.get_summary('a', conn) is None
+            summary_cache.put_summary('a', 'Reads app.py', conn)
+            summary_cache.put_summary('b', 'Reads b.py', conn)
+            assert summary_cache.get_summary('a', conn) == 'Reads app.py'
+
+            # 'b' is now the least recently used entry
+            conn.execute("UPDATE summaries SET last_used = last_used - 1000 WHERE fingerprint = 'b'")
+            summary_cache.put_summary('c', 'Reads c.py', conn)
+            assert summary_cache.get_summary('b', conn) is None
+            assert summary_cache.get_summary('c', conn) == 'Reads c.py'
+
+            result = summary_cache.stats(conn)
+            assert result['entries'] == 2
+            assert result['counters'] == {'summary_cache.hit': 2, 'summary_cache.miss': 2}
+            assert result['hit_rate'] == 0.5
+        finally:
+            del os.environ['SUMMARY_CACHE_MAX_ENTRIES']
+            summary_cache.close_connection(os.path.join(tmp, 'summaries.sqlite'))
+
+
+def test_expired_entries_are_misses():
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = summary_cache.get_connection(os.path.join(tmp, 'summaries.sqlite'))
+        try:
+            summary_cache.put_summary('a', 'Reads app.py', conn)
+            conn.execute("UPDATE summaries SET last_used = 0")
+            assert summary_cache.get_summary('a', conn) is None
+            assert summary_cache.prune(conn) == 1
+        finally:
+            summary_cache.close_connection(os.path.join(tmp, 'summaries.sqlite'))
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
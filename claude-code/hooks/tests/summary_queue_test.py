@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Tests for the background summary queue (utils/summary_queue.py and
+summary_worker.py). The LLM call is replaced by a canned summary.
+
+USAGE:
+    python3 summary_queue_test.py
+    python3 -m pytest summary_queue_test.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+import summary_worker
+from utils import db
+from utils.logger import insert_events
+from utils.summary_queue import enqueue_summary, pending_jobs
+
+
+def event(timestamp):
+    return {
+        'session_id': 'test-session-12345',
+        'hook_event_type': 'PreToolUse',
+        'timestamp': timestamp,
+        'payload': {'tool_name': 'Read', 'tool_input': {'file_path': f'/src/file{timestamp}.py'}},
+    }
+
+
+def summarize(jobs, batch_size):
+    return [f"Reads {job['payload']['tool_input']['file_path']}" for job in jobs]
+
+
+def test_worker_fills_in_queued_summaries():
+    original = summary_worker.generate_event_summaries
+    summary_worker.generate_event_summaries = summarize
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        try:
+            conn = db.get_connection(path)
+            insert_events(conn, [event(1)])
+            conn.commit()
+
+            enqueue_summary(event(1), path)
+            enqueue_summary(event(2), path)  # not written yet
+            assert conn.execute("SELECT summary FROM features").fetchone()[0] is None
+
+            summary_worker.run_worker(path, once=True)
+
+            assert conn.execute("SELECT summary FROM features WHERE timestamp = 1").fetchone()[0] == "Reads /src/file1.py"
+            assert len(pending_jobs(path)) == 1
+
+            insert_events(conn, [event(2)])
+            conn.commit()
+            summary_worker.run_worker(path, once=True)
+            assert conn.execute("SELECT summary FROM features WHERE timestamp = 2").fetchone()[0] == "Reads /src/file2.py"
+            assert pending_jobs(path) == []
+        finally:
+            summary_worker.generate_event_summaries = original
+            db.close_connection(path)
+
+
+def test_events_of_the_same_millisecond_get_their_own_summaries():
+    original = summary_worker.generate_event_summaries
+    summary_worker.generate_event_summaries = summarize
+    first, second = event(1), event(1)
+    second['payload'] = {'tool_name': 'Read', 'tool_input': {'file_path': '/src/other.py'}}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        try:
+            conn = db.get_connection(path)
+            insert_events(conn, [first, second])
+            conn.commit()
+            enqueue_summary(first, path)
+            enqueue_summary(second, path)
+
+            summary_worker.run_worker(path, once=True)
+            summaries = [row[0] for row in conn.execute("SELECT summary FROM features ORDER BY id")]
+            assert summaries == ["Reads /src/file1.py", "Reads /src/other.py"]
+        finally:
+            summary_worker.generate_event_summaries = original
+            db.close_connection(path)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Tests for the buffered Supabase inserts in utils/logger.py, run against the
+stand-in REST endpoint in stubs/postgrest_stub.py.
+
+USAGE:
+    python3 supabase_test.py
+    python3 -m pytest supabase_test.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from stubs.postgrest_stub import STUB_KEY, PostgRESTStub
+from utils import circuit_breaker, logger
+
+
+def event(i):
+    return {'session_id': 'test-session', 'hook_event_type': 'PostToolUse', 'timestamp': i,
+            'payload': {'tool_name': 'Read'}}
+
+
+def with_settings(func, **settings):
+    # No timer flushes during the test; it flushes explicitly
+    settings = dict({'SUPABASE_FLUSH_INTERVAL_S': '60'}, **settings)
+    saved = {name: os.environ.get(name) for name in settings}
+    os.environ.update(settings)
+    original_state_dir = circuit_breaker.STATE_DIR
+    tmp = tempfile.TemporaryDirectory()
+    circuit_breaker.STATE_DIR = Path(tmp.name) / 'breakers'
+    try:
+        return func()
+    finally:
+        circuit_breaker.STATE_DIR = original_state_dir
+        tmp.cleanup()
+        logger._supabase_buffers.clear()
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_events_are_buffered_into_bulk_inserts():
+    stub = PostgRESTStub(port=0).start()
+
+    def run():
+        for i in range(5):
+            assert logger.send_event_to_supabase_database(event(i), stub.url, STUB_KEY)
+        assert stub.stats['requests'] == 2  # two full batches of 2
+        assert logger.flush_supabase_buffer() == 1
+
+    try:
+        with_settings(run, SUPABASE_BATCH_SIZE='2')
+        assert [row['timestamp'] for row in stub.rows['features']] == list(range(5))
+        assert stub.stats['requests'] == 3
+        assert stub.stats['connections'] == 1
+        assert logger.get_supabase_client(stub.url, STUB_KEY) is logger.get_supabase_client(stub.url, STUB_KEY)
+    finally:
+        stub.stop()
+
+
+def test_failed_rows_stay_buffered():
+    stub = PostgRESTStub(port=0).start()
+    port = stub.port
+    stub.stop()
+
+    def run():
+        url = f"http://127.0.0.1:{port}"
+        assert logger.send_event_to_supabase_database(event(1), url, STUB_KEY)
+        assert logger.flush_supabase_buffer() == 0
+        assert not logger.send_event_to_supabase_database(event(2), url, STUB_KEY)  # backing off
+
+        restarted = PostgRESTStub(port=port).start()
+        try:
+            assert logger.flush_supabase_buffer() == 0  # skipped until SUPABASE_RETRY_AFTER_S is over
+            assert restarted.stats['requests'] == 0
+            assert logger.flush_supabase_buffer(force=True) == 2
+            return restarted.rows['features']
+        finally:
+            restarted.stop()
+
+    assert [row['timestamp'] for row in with_settings(run)] == [1, 2]
+
+
+def test_failed_flush_is_reported():
+    stub = PostgRESTStub(port=0).start()
+    port = stub.port
+    stub.stop()
+
+    def run():
+        return logger.send_event_to_supabase_database(event(1), f"http://127.0.0.1:{port}", STUB_KEY)
+
+    assert with_settings(run, SUPABASE_BATCH_SIZE='1') is False
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for the per-stage hook timings in utils/timing.py.
+
+USAGE:
+    python3 timing_test.py
+    python3 -m pytest timing_test.py
+"""
+
+import io
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.jsonl_store import append_jsonl, iter_jsonl
+from utils.logger import event_key
+from utils.timing import StageTimer, report
+
+EVENT = {'session_id': 'test-session-12345', 'hook_event_type': 'PreToolUse', 'timestamp': 1700000000000}
+
+
+def finish_event(tmp, env, stages=("context", "sqlite", "context")):
+    """Time a fake event with the given environment; returns (record, stored records, profiles)."""
+    original = {name: os.environ.get(name) for name in env}
+    os.environ.update(env)
+    try:
+        timer = StageTimer()
+        for name in stages:
+            with timer.stage(name):
+                time.sleep(0.002)
+        path, profile_dir = Path(tmp) / "hook_timings.jsonl", Path(tmp) / "profiles"
+        record = timer.finish(EVENT, path=path, profile_dir=profile_dir)
+        return record, list(iter_jsonl(path)), sorted(profile_dir.glob("*.prof"))
+    finally:
+        for name, value in original.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+def test_stages_are_recorded_with_the_event_key():
+    with tempfile.TemporaryDirectory() as tmp:
+        record, stored, profiles = finish_event(tmp, {'HOOK_TIMINGS': 'true', 'HOOK_PROFILE_MS': ''})
+
+    assert stored == [record]
+    assert {key: record[key] for key in EVENT} == EVENT
+    assert record['event_key'] == event_key(EVENT)  # the key of the event's features row
+    assert set(record['stages']) == {'context', 'sqlite'}
+    assert record['stages']['context'] >= 4  # repeated stages add up: two 2 ms sleeps
+    assert record['total_ms'] >= sum(record['stages'].values())
+    assert profiles == []
+
+
+def test_timings_can_be_disabled():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, stored, _ = finish_event(tmp, {'HOOK_TIMINGS': 'false', 'HOOK_PROFILE_MS': ''})
+    assert stored == []
+
+
+def test_only_slow_events_are_profiled():
+    with tempfile.TemporaryDirectory() as tmp:
+        _, stored, profiles = finish_event(tmp, {'HOOK_TIMINGS': 'true', 'HOOK_PROFILE_MS': '60000'})
+        assert profiles == [] and 'profile' not in stored[0]
+
+        record, _, profiles = finish_event(tmp, {'HOOK_TIMINGS': 'true', 'HOOK_PROFILE_MS': '0'})
+        assert [str(p) for p in profiles] == [record['profile']]
+        assert record['event_key'] in record['profile']
+
+
+def test_report_lists_slowest_stages():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "hook_timings.jsonl"
+        append_jsonl(path, dict(EVENT, total_ms=9.0, stages={'context': 6.0, 'sqlite': 2.0}), index=False)
+        append_jsonl(path, dict(EVENT, total_ms=3.0, stages={'sqlite': 2.5}, session_id='other-session'), index=False)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            report(path, session_id='test-session-12345')
+            report(path, session_id='missing-session')
+
+    lines = output.getvalue().splitlines()
+    assert lines[0].startswith("1 events")
+    assert [line.split()[0] for line in lines[3:5]] == ['context', 'sqlite']  # largest share first
+    assert "slowest stage context (6.00 ms)" in output.getvalue()
+    assert lines[-1].startswith("No timings")
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the normalized transcript storage in utils/transcript_store.py.
+
+USAGE:
+    python3 transcript_store_test.py
+    python3 -m pytest transcript_store_test.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils import db
+from utils.logger import insert_events
+from utils.transcript_store import load_event_chat, load_session_messages, migrate_legacy_chats, store_transcript
+
+
+def make_transcript(count):
+    return [
+        {'uuid': f'msg-{i}', 'type': 'user' if i % 2 == 0 else 'assistant', 'message': {'content': f'message {i}'}}
+        for i in range(count)
+    ]
+
+
+def stop_event(timestamp, chat):
+    return {
+        'source_app': 'studyguide-template',
+        'session_id': 'test-session-12345',
+        'hook_event_type': 'Stop',
+        'timestamp': timestamp,
+        'payload': {'session_id': 'test-session-12345'},
+        'chat': chat,
+    }
+
+
+def event_id(conn, timestamp):
+    return conn.execute("SELECT id FROM features WHERE timestamp = ?", (timestamp,)).fetchone()[0]
+
+
+def test_each_stop_stores_only_new_messages():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = db.get_connection(path)
+        try:
+            transcript = make_transcript(10)
+            insert_events(conn, [stop_event(1, transcript[:4])])
+            insert_events(conn, [stop_event(2, transcript[:10])])
+            conn.commit()
+
+            assert conn.execute("SELECT COUNT(*) FROM transcript_messages").fetchone()[0] == 10
+            assert conn.execute("SELECT chat FROM features WHERE chat IS NOT NULL").fetchall() == []
+            assert load_event_chat(conn, event_id(conn, 1)) == transcript[:4]
+            assert load_event_chat(conn, event_id(conn, 2)) == transcript
+            assert load_event_chat(conn, event_id(conn, 2), delta=True) == transcript[4:]
+        finally:
+            db.close_connection(path)
+
+
+def test_rewritten_transcript_is_restored():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = db.get_connection(path)
+        try:
+            transcript = make_transcript(6)
+            insert_events(conn, [stop_event(1, transcript)])
+
+            # Truncated and regrown: the last stored positions no longer match
+            rewritten = transcript[:3] + [dict(m, uuid=f"new-{m['uuid']}") for m in transcript[3:]] + make_transcript(8)[6:]
+            insert_events(conn, [stop_event(2, rewritten)])
+            conn.commit()
+
+            assert load_event_chat(conn, event_id(conn, 2)) == rewritten
+            assert load_event_chat(conn, event_id(conn, 2), delta=True) == rewritten[3:]
+        finally:
+            db.close_connection(path)
+
+
+def test_drifted_delta_is_restored_from_the_transcript_file():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = db.get_connection(path)
+        try:
+            transcript = make_transcript(10)
+            transcript_path = Path(tmp) / 'transcript.jsonl'
+            transcript_path.write_text(''.join(json.dumps(m) + '\n' for m in transcript))
+            store_transcript(conn, 'test-session-12345', transcript[:2])
+
+            # A tail checkpoint ahead of the database: positions 2-5 were never stored
+            event = dict(stop_event(1, transcript[6:]), chat_start=6,
+                         payload={'session_id': 'test-session-12345', 'transcript_path': str(transcript_path)})
+            insert_events(conn, [event])
+            assert load_event_chat(conn, event_id(conn, 1)) == transcript
+
+            # A delta whose first message differs from the stored one
+            assert store_transcript(conn, 'test-session-12345', make_transcript(12)[8:], start_seq=8) == (10, 12)
+            wrong = [dict(m, uuid='other') for m in make_transcript(12)[10:11]]
+            assert store_transcript(conn, 'test-session-12345', wrong, start_seq=10) == (10, 11)
+            assert load_session_messages(conn, 'test-session-12345') == transcript + wrong
+        finally:
+            db.close_connection(path)
+
+
+def test_migrate_legacy_chat_column():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / 'log.sqlite')
+        conn = db.get_connection(path)
+        try:
+            transcript = make_transcript(6)
+            for timestamp, count in ((10, 3), (20, 6)):
+                conn.execute(
+                    "INSERT INTO features (session_id, hook_event_type, timestamp, chat, payload) VALUES (?, ?, ?, ?, ?)",
+                    ('test-session-12345', 'Stop', timestamp, json.dumps(transcript[:count]), '{}'),
+                )
+            conn.commit()
+
+            assert migrate_legacy_chats(conn) == 2
+            assert load_event_chat(conn, event_id(conn, 10)) == transcript[:3]
+            assert load_event_chat(conn, event_id(conn, 20), delta=True) == transcript[3:]
+        finally:
+            db.close_connection(path)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental transcript reader in utils/transcript_tail.py.
+
+USAGE:
+    python3 transcript_tail_test.py
+    python3 -m pytest transcript_tail_test.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add the hooks directory to the path so we can import the utils package
+sys.path.append(str(Path(__file__).parent.parent))
+
+from utils.transcript_tail import TranscriptTail
+
+
+def write_messages(path, messages, mode='a'):
+    with open(path, mode) as f:
+        for message in messages:
+            f.write(json.dumps(message) + '\n')
+
+
+def messages(start, end):
+    return [{'uuid': f'msg-{i}', 'message': {'content': f'message {i}'}} for i in range(start, end)]
+
+
+def read(path, checkpoints):
+    tail = TranscriptTail(path, consumer='test', checkpoint_dir=checkpoints)
+    result = tail.read_new()
+    tail.commit()
+    return result
+
+
+def test_reads_only_appended_messages():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.jsonl')
+        write_messages(path, messages(0, 3))
+        assert read(path, tmp) == (messages(0, 3), 0)
+
+        write_messages(path, messages(3, 5))
+        assert read(path, tmp) == (messages(3, 5), 3)
+        assert read(path, tmp) == ([], 5)
+
+
+def test_partial_line_waits_for_newline():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.jsonl')
+        write_messages(path, messages(0, 2))
+        with open(path, 'a') as f:
+            f.write('{"uuid": "msg-2"')
+        assert read(path, tmp) == (messages(0, 2), 0)
+
+        with open(path, 'a') as f:
+            f.write(', "message": {"content": "message 2"}}\n')
+        assert read(path, tmp) == (messages(2, 3), 2)
+
+
+def test_uncommitted_read_is_repeated():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.jsonl')
+        write_messages(path, messages(0, 2))
+        TranscriptTail(path, consumer='test', checkpoint_dir=tmp).read_new()
+        assert read(path, tmp) == (messages(0, 2), 0)
+
+
+def test_truncated_or_replaced_transcript_starts_over():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'transcript.jsonl')
+        write_messages(path, messages(0, 4))
+        read(path, tmp)
+
+        # Rewritten in place with different content of the same length or more
+        write_messages(path, messages(10, 15), mode='w')
+        assert read(path, tmp) == (messages(10, 15), 0)
+
+        # Replaced by a new, shorter file
+        os.remove(path)
+        write_messages(path, messages(20, 21))
+        assert read(path, tmp) == (messages(20, 21), 0)
+
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"  ✓ {name}")
+    print("All tests passed")
@@ -0,0 +1,189 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Circuit breaker shared by all hook processes, and a per-call deadline.
+
+Every hook event is a new process, so the breaker keeps its state in a small
+JSON file in the hooks cache directory, updated under an flock. It opens
+after `failure_threshold` consecutive failed or slow calls; while open,
+calls are skipped without touching the network. After `cooldown_s` one
+process is let through as a probe (half-open): its success closes the
+breaker, its failure opens it for another cooldown.
+
+USAGE:
+    python -m utils.circuit_breaker status [name]
+    python -m utils.circuit_breaker reset [name]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .constants import HOOKS_CACHE_DIR
+
+STATE_DIR = HOOKS_CACHE_DIR / "breakers"
+
+CLOSED = {"failures": 0, "opened_at": None, "probe_at": None}
+
+
+def call_with_deadline(func, deadline_s, *args, **kwargs):
+    """
+    Run func in a daemon thread and wait at most deadline_s for it.
+
+    A call that misses the deadline keeps running in the background until
+    it finishes or the process exits; its result is discarded.
+
+    Returns:
+        tuple: (finished, result) - result is None if the call did not
+        finish in time or raised
+    """
+    outcome = {}
+
+    def run():
+        try:
+            outcome["result"] = func(*args, **kwargs)
+        except Exception:
+            outcome["result"] = None
+
+    thread = threading.Thread(target=run, name="deadline-call", daemon=True)
+    thread.start()
+    thread.join(deadline_s)
+    if thread.is_alive():
+        return False, None
+    return True, outcome.get("result")
+
+
+class CircuitBreaker:
+    """
+    A named circuit breaker whose state is shared through the filesystem.
+
+    Args:
+        name: State file name, e.g. 'llm'
+        failure_threshold: Consecutive failures that open the breaker
+            (default CIRCUIT_BREAKER_FAILURES, or 3)
+        cooldown_s: Seconds the breaker stays open before a probe call
+            (default CIRCUIT_BREAKER_COOLDOWN_S, or 60)
+        state_dir: Directory of the state files (default STATE_DIR)
+    """
+
+    def __init__(self, name, failure_threshold=None, cooldown_s=None, state_dir=None):
+        self.name = name
+        self.failure_threshold = failure_threshold or int(os.environ.get("CIRCUIT_BREAKER_FAILURES", "3"))
+        self.cooldown_s = cooldown_s or float(os.environ.get("CIRCUIT_BREAKER_COOLDOWN_S", "60"))
+        state_dir = Path(state_dir or STATE_DIR)
+        self.state_path = state_dir / f"{name}.json"
+        self.lock_path = state_dir / f"{name}.lock"
+
+    @contextmanager
+    def _locked(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _load(self):
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            return dict(CLOSED, **state) if isinstance(state, dict) else dict(CLOSED)
+        except (OSError, ValueError):
+            return dict(CLOSED)
+
+    def _save(self, state):
+        tmp = self.state_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def state(self):
+        """Return 'closed', 'open' or 'half-open'."""
+        state = self._load()
+        if state["opened_at"] is None:
+            return "closed"
+        if time.time() - state["opened_at"] < self.cooldown_s:
+            return "open"
+        return "half-open"
+
+    def is_open(self):
+        """Check whether calls are currently being skipped (cooldown not over yet)."""
+        return self.state() == "open"
+
+    def allow(self):
+        """
+        Decide whether a call may go ahead.
+
+        Closed: always. Open: never. Half-open: only for the first caller,
+        which becomes the probe; others are skipped until it reports back
+        (or a cooldown passes without it doing so).
+
+        Returns:
+            bool: True if the call should be made
+        """
+        if self._load()["opened_at"] is None:
+            return True  # common case, no lock needed
+
+        with self._locked():
+            state = self._load()
+            now = time.time()
+            if state["opened_at"] is None:
+                return True
+            if now - state["opened_at"] < self.cooldown_s:
+                return False
+            if state["probe_at"] is not None and now - state["probe_at"] < self.cooldown_s:
+                return False  # another process is probing
+            state["probe_at"] = now
+            self._save(state)
+            return True
+
+    def record(self, ok):
+        """
+        Report the outcome of an allowed call.
+
+        Args:
+            ok: False for a failed, timed out or too slow call
+        """
+        if ok and self._load() == CLOSED:
+            return  # nothing to update
+
+        with self._locked():
+            state = self._load()
+            if ok:
+                state = dict(CLOSED)
+            else:
+                state["failures"] += 1
+                if state["opened_at"] is not None or state["failures"] >= self.failure_threshold:
+                    state["opened_at"], state["probe_at"] = time.time(), None
+            self._save(state)
+
+    def reset(self):
+        """Close the breaker."""
+        with self._locked():
+            self._save(dict(CLOSED))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or reset a hook circuit breaker')
+    parser.add_argument('command', choices=['status', 'reset'])
+    parser.add_argument('name', nargs='?', default='llm', help='Breaker name (default: llm)')
+    args = parser.parse_args()
+
+    breaker = CircuitBreaker(args.name)
+    if args.command == 'reset':
+        breaker.reset()
+    state = breaker._load()
+    print(f"{args.name}: {breaker.state()}, {state['failures']} consecutive failures")
+    if state["opened_at"] is not None:
+        print(f"  opened {time.time() - state['opened_at']:.0f}s ago")
+
+
+if __name__ == "__main__":
+    main()
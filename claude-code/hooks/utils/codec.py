@@ -0,0 +1,359 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Binary compression codec for the JSON columns of the dashboard database.
+
+`features.chat`, `features.payload` and `transcript_messages.body` are stored
+as BLOBs whose first byte names the codec:
+
+    0x00  raw UTF-8
+    0x01  zlib
+    0x02  lzma
+    0x03  zstd (only written when the `zstandard` package is installed)
+    0x04  zlib with a preset dictionary; the next 8 bytes are the dictionary id
+
+Hook payloads are small and share most of their keys and many values, which a
+general-purpose compressor cannot exploit within a single row. A preset
+dictionary trained from existing rows (`train`) is stored in the
+`codec_dictionaries` table, and the newest one is used for new rows.
+Dictionaries are content-addressed, so a row can always be decoded with the
+dictionary it was written with.
+
+Text values are rows written before this codec: plain JSON, or the
+`GZIP_B64:` base64-encoded gzip used for values over 100 KB. decode() still
+reads them, and `migrate` rewrites them in place.
+
+The codec for new rows is chosen with SQLITE_CODEC: auto (default: the
+dictionary if one was trained, else zstd if installed, else zlib), zlib,
+lzma, zstd or raw.
+
+USAGE:
+    python -m utils.codec --db planning/dashboard/log.sqlite train [--samples 2000] [--size 32768]
+    python -m utils.codec --db planning/dashboard/log.sqlite migrate [--all]
+    python -m utils.codec --db planning/dashboard/log.sqlite stats
+"""
+
+import argparse
+import base64
+import collections
+import gzip
+import hashlib
+import json
+import lzma
+import os
+import re
+import sys
+import time
+import zlib
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+RAW = 0x00
+ZLIB = 0x01
+LZMA = 0x02
+ZSTD = 0x03
+ZLIB_DICT = 0x04
+
+CODEC_NAMES = {RAW: 'raw', ZLIB: 'zlib', LZMA: 'lzma', ZSTD: 'zstd', ZLIB_DICT: 'zlib+dict'}
+
+DICT_ID_BYTES = 8
+
+# zlib only looks back 32 KB, so a larger preset dictionary is wasted
+MAX_DICT_SIZE = 32768
+
+# Prefix of the base64 text format used before this codec
+LEGACY_GZIP_PREFIX = "GZIP_B64:"
+
+# Dictionaries of this process, keyed by id
+_dictionaries = {}
+
+
+def dictionary_id(body):
+    """Return the content address of a dictionary."""
+    return hashlib.sha256(body).digest()[:DICT_ID_BYTES]
+
+
+def _get_dictionary(conn, dict_id):
+    body = _dictionaries.get(dict_id)
+    if body is None and conn is not None:
+        row = conn.execute("SELECT body FROM codec_dictionaries WHERE id = ?", (dict_id,)).fetchone()
+        if row is not None:
+            body = _dictionaries[dict_id] = bytes(row[0])
+    if body is None:
+        raise ValueError(f"Unknown codec dictionary {dict_id.hex()}")
+    return body
+
+
+def active_dictionary(conn):
+    """
+    Return the dictionary new rows are written with.
+
+    Returns:
+        tuple or None: (dict_id, body) of the newest dictionary, or None
+    """
+    row = conn.execute(
+        "SELECT id, body FROM codec_dictionaries ORDER BY created_at DESC LIMIT 1"
+    ).fetchone()
+    if row is None:
+        return None
+    dict_id, body = bytes(row[0]), bytes(row[1])
+    _dictionaries.setdefault(dict_id, body)
+    return dict_id, body
+
+
+def encode(value, codec=None, dictionary=None):
+    """
+    Encode a JSON document into a tagged BLOB.
+
+    Args:
+        value: JSON text, or a list/dict to serialize
+        codec: 'auto', 'zlib', 'lzma', 'zstd' or 'raw' (default: SQLITE_CODEC)
+        dictionary: (dict_id, body) from active_dictionary(), used by 'auto'
+
+    Returns:
+        bytes: The encoded value, or None for None
+    """
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        value = json.dumps(value)
+    data = value.encode('utf-8')
+    # Read at call time: hooks load .env after importing this module
+    codec = codec or os.environ.get("SQLITE_CODEC", "auto")
+
+    if codec == 'auto':
+        if dictionary is not None:
+            dict_id, body = dictionary
+            _dictionaries.setdefault(dict_id, body)
+            compressor = zlib.compressobj(zdict=body)
+            encoded = bytes([ZLIB_DICT]) + dict_id + compressor.compress(data) + compressor.flush()
+        elif zstandard is not None:
+            encoded = bytes([ZSTD]) + zstandard.ZstdCompressor().compress(data)
+        else:
+            encoded = bytes([ZLIB]) + zlib.compress(data)
+    elif codec == 'zstd' and zstandard is not None:
+        encoded = bytes([ZSTD]) + zstandard.ZstdCompressor().compress(data)
+    elif codec in ('zlib', 'zstd'):
+        encoded = bytes([ZLIB]) + zlib.compress(data)
+    elif codec == 'lzma':
+        encoded = bytes([LZMA]) + lzma.compress(data)
+    elif codec == 'raw':
+        encoded = None
+    else:
+        raise ValueError(f"Unknown codec {codec!r}")
+
+    # Tiny values can grow when compressed
+    if encoded is None or len(encoded) > len(data):
+        return bytes([RAW]) + data
+    return encoded
+
+
+def decode(value, conn=None):
+    """
+    Decode a value read from a codec column back into JSON text.
+
+    Args:
+        value: A tagged BLOB, a legacy text value, or None
+        conn: Database connection, needed to load dictionaries not seen yet
+
+    Returns:
+        str: The JSON text, or None for None
+    """
+    if value is None:
+        return None
+    if isinstance(value, str):
+        if value.startswith(LEGACY_GZIP_PREFIX):
+            compressed = base64.b64decode(value[len(LEGACY_GZIP_PREFIX):])
+            return gzip.decompress(compressed).decode('utf-8')
+        return value
+
+    value = bytes(value)
+    tag, data = value[0], value[1:]
+    if tag == RAW:
+        return data.decode('utf-8')
+    if tag == ZLIB:
+        return zlib.decompress(data).decode('utf-8')
+    if tag == LZMA:
+        return lzma.decompress(data).decode('utf-8')
+    if tag == ZSTD:
+        if zstandard is None:
+            raise ValueError("Value is zstd-compressed but the zstandard package is not installed")
+        return zstandard.ZstdDecompressor().decompress(data).decode('utf-8')
+    if tag == ZLIB_DICT:
+        body = _get_dictionary(conn, data[:DICT_ID_BYTES])
+        decompressor = zlib.decompressobj(zdict=body)
+        return (decompressor.decompress(data[DICT_ID_BYTES:]) + decompressor.flush()).decode('utf-8')
+    raise ValueError(f"Unknown codec tag {tag:#04x}")
+
+
+def decode_json(value, conn=None):
+    """Decode a codec column value and parse it."""
+    text = decode(value, conn)
+    return None if text is None else json.loads(text)
+
+
+# A JSON object key, optionally followed by a short scalar value
+_FRAGMENT_RE = re.compile(
+    r'"(?:[^"\\]|\\.){1,64}"\s*:\s*(?:"(?:[^"\\]|\\.){0,120}"|true|false|null|-?\d{1,20})?'
+)
+
+
+def train_dictionary(samples, size=MAX_DICT_SIZE):
+    """
+    Build a preset dictionary from sample JSON documents.
+
+    The dictionary is made of the key/value fragments that occur in the most
+    samples, weighted by length. The most valuable fragments are placed at
+    the end, where zlib reaches them with the shortest distances.
+
+    Args:
+        samples: Iterable of JSON texts
+        size: Maximum dictionary size in bytes
+
+    Returns:
+        bytes: The dictionary (empty if the samples share nothing)
+    """
+    counts = collections.Counter()
+    total = 0
+    for sample in samples:
+        counts.update(set(_FRAGMENT_RE.findall(sample)))
+        total += 1
+
+    # Fragments seen in a single sample do not help other rows
+    min_count = 2 if total > 1 else 1
+    scored = sorted(
+        ((count * len(fragment), fragment) for fragment, count in counts.items() if count >= min_count),
+        reverse=True,
+    )
+
+    chosen = []
+    used = 0
+    for _, fragment in scored:
+        data = fragment.encode('utf-8')
+        if used + len(data) > size:
+            continue
+        chosen.append(data)
+        used += len(data)
+    return b''.join(reversed(chosen))
+
+
+def store_dictionary(conn, body, sample_count):
+    """Save a dictionary and make it the active one; the caller commits."""
+    dict_id = dictionary_id(body)
+    conn.execute(
+        "INSERT OR REPLACE INTO codec_dictionaries (id, created_at, samples, body) VALUES (?, ?, ?, ?)",
+        (dict_id, int(time.time() * 1000), sample_count, body),
+    )
+    _dictionaries[dict_id] = body
+    return dict_id
+
+
+# Columns holding codec values: (table, key column, value column)
+CODEC_COLUMNS = (
+    ('features', 'id', 'payload'),
+    ('features', 'id', 'chat'),
+    ('transcript_messages', 'msg_key', 'body'),
+)
+
+
+def sample_values(conn, limit):
+    """Return up to limit recent payloads and transcript messages as JSON text."""
+    samples = []
+    for sql in (
+        "SELECT payload FROM features WHERE payload IS NOT NULL ORDER BY id DESC LIMIT ?",
+        "SELECT body FROM transcript_messages LIMIT ?",
+    ):
+        for (value,) in conn.execute(sql, (limit,)):
+            samples.append(decode(value, conn))
+    return samples
+
+
+def migrate_columns(conn, reencode=False, batch_size=1000):
+    """
+    Rewrite codec columns with the current codec.
+
+    Args:
+        conn: Open database connection
+        reencode: Also re-encode values that are already BLOBs (e.g. after
+            training a new dictionary); by default only legacy text is converted
+        batch_size: Rows per transaction
+
+    Returns:
+        int: Number of values rewritten
+    """
+    dictionary = active_dictionary(conn)
+    condition = "IS NOT NULL" if reencode else "IS NOT NULL AND typeof({column}) = 'text'"
+    converted = 0
+    for table, key, column in CODEC_COLUMNS:
+        where = f"{column} " + condition.format(column=column)
+        keys = [k for (k,) in conn.execute(f"SELECT {key} FROM {table} WHERE {where}")]
+        for i in range(0, len(keys), batch_size):
+            rows = []
+            for k in keys[i:i + batch_size]:
+                (value,) = conn.execute(f"SELECT {column} FROM {table} WHERE {key} = ?", (k,)).fetchone()
+                rows.append((encode(decode(value, conn), dictionary=dictionary), k))
+            conn.executemany(f"UPDATE {table} SET {column} = ? WHERE {key} = ?", rows)
+            conn.commit()
+            converted += len(rows)
+    return converted
+
+
+def column_stats(conn):
+    """Return the stored size of each codec column, broken down by codec."""
+    stats = {}
+    for table, _, column in CODEC_COLUMNS:
+        breakdown = collections.defaultdict(lambda: {'rows': 0, 'bytes': 0})
+        for value, in conn.execute(f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL"):
+            if isinstance(value, str):
+                name = 'gzip_b64 (legacy)' if value.startswith(LEGACY_GZIP_PREFIX) else 'text (legacy)'
+                size = len(value.encode('utf-8'))
+            else:
+                name = CODEC_NAMES.get(value[0], 'unknown')
+                size = len(value)
+            breakdown[name]['rows'] += 1
+            breakdown[name]['bytes'] += size
+        stats[f"{table}.{column}"] = dict(breakdown)
+    return stats
+
+
+def main():
+    """Command line interface for training dictionaries and migrating rows."""
+    from .db import get_connection
+
+    parser = argparse.ArgumentParser(description='Compression codec of the dashboard database')
+    parser.add_argument('--db', default='./planning/dashboard/log.sqlite', help='SQLite database')
+    sub = parser.add_subparsers(dest='command', required=True)
+    train = sub.add_parser('train', help='Train a dictionary from existing rows and make it active')
+    train.add_argument('--samples', type=int, default=2000, help='Rows to sample per column')
+    train.add_argument('--size', type=int, default=MAX_DICT_SIZE, help='Dictionary size in bytes')
+    migrate = sub.add_parser('migrate', help='Convert legacy text and GZIP_B64 rows to BLOBs')
+    migrate.add_argument('--all', action='store_true', help='Also re-encode existing BLOBs')
+    sub.add_parser('stats', help='Show stored sizes per codec')
+    args = parser.parse_args()
+
+    conn = get_connection(args.db)
+    if args.command == 'train':
+        samples = sample_values(conn, args.samples)
+        body = train_dictionary(samples, min(args.size, MAX_DICT_SIZE))
+        if not body:
+            print("Not enough data to train a dictionary", file=sys.stderr)
+            sys.exit(1)
+        dict_id = store_dictionary(conn, body, len(samples))
+        conn.commit()
+        print(f"Stored dictionary {dict_id.hex()} ({len(body)} bytes from {len(samples)} samples); "
+              f"run 'migrate --all' to re-encode existing rows")
+    elif args.command == 'migrate':
+        converted = migrate_columns(conn, reencode=args.all)
+        print(f"Rewrote {converted} values; run VACUUM to reclaim the space")
+    else:
+        print(json.dumps(column_stats(conn), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Safety scanner for the Bash commands pre_tool_use.py lets through.
+
+The command is tokenized once, shell style: quoted strings stay one word,
+and `|`, `||`, `&&`, `;`, `&`, `(`, `)`, backticks and newlines end a simple
+command (so unquoted `$(...)`, subshells and pipelines are scanned as the
+commands they contain). All rules are then evaluated in a single pass over
+the tokens. Quoted text that the shell runs as a command is scanned again
+as a command of its own: the script of `sh -c`/`bash -c` (and other
+shells), the words after `eval`, and `$(...)` or backtick substitutions
+inside double quotes. Programs the tokenizer cannot see into get a plain
+regex check of their raw text instead: scripts nested deeper than
+MAX_NESTING, the program of an interpreter (`python -c`, `perl -e`,
+`node -e`, `ruby -e`), the remote command of `ssh`, and any command whose
+command word is an unexpanded variable (`$RM -rf /`).
+
+The tokenizer is one precompiled regex whose alternatives start with
+distinct characters, and no rule pattern has nested or unbounded
+quantifiers around a wildcard, so scanning time is linear in the length of
+the command (times its nesting depth) however long a heredoc it carries.
+
+Rules:
+    dangerous_rm   rm with both recursive and force flags, or recursive on a
+                   path-like argument (/, ~, *, ., ..)
+    env_file       a word naming a .env file (.env.sample is allowed), other
+                   than the message of a commit or tag (`git commit -m ...`)
+
+USAGE:
+    python -m utils.command_scanner 'rm -rf ./build && cat .env'
+"""
+
+import re
+import sys
+from functools import lru_cache
+
+# A word is a run of quoted strings, escapes and plain characters; anything
+# else is an operator. An unterminated quote is a token of its own.
+_TOKEN_RE = re.compile(r"""
+    (?P<word>(?:'[^']*'|"(?:[^"\\]|\\.)*"|\\.|[^\s;&|()`<>'"\\])+)
+  | (?P<sep>[;&|()`\n]+)
+  | (?P<redirect>[<>]+&?)
+  | (?P<other>\S)
+""", re.VERBOSE | re.DOTALL)
+
+# Parts of a word: single-quoted, double-quoted, escaped character, plain
+# text, or a lone (unterminated) quote
+_SEGMENT_RE = re.compile(r"""'([^']*)'|"((?:[^"\\]|\\.)*)"|\\(.)|([^'"\\]+)|(['"])""", re.DOTALL)
+
+# Backslash escapes that are special inside double quotes
+_DQ_ESCAPE_RE = re.compile(r'\\([$`"\\\n])')
+
+# Shells whose -c argument is a script
+_SHELLS = frozenset({"sh", "bash", "zsh", "dash", "ksh"})
+
+# An option cluster that includes -c, such as -c, -lc or -ec
+_SCRIPT_FLAG_RE = re.compile(r"-[a-zA-Z]*c[a-zA-Z]*")
+
+# Nested scripts deeper than this are checked on their raw text
+MAX_NESTING = 4
+
+# Raw-text check for programs the tokenizer cannot see into
+_RAW_RM_RE = re.compile(r"\brm\b[^;&|\n]*\s-[a-z]*r", re.IGNORECASE)
+
+# Interpreters that run a program given on the command line, and the
+# options that take it (python -c, perl -e, node -e/--eval/-p, ruby -e)
+_INTERPRETER_RE = re.compile(r"python[\d.]*|perl|node|ruby")
+_PROGRAM_FLAGS = frozenset({"-c", "-e", "-E", "--eval", "-p", "--print"})
+
+# Cheap test of a whole command for any program _programs() looks for
+_PROGRAM_HINT_RE = re.compile(r"eval|sh\b|python|perl|node|ruby", re.IGNORECASE)
+
+# Words before the command word: variable assignments and command wrappers
+_ASSIGNMENT_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*=")
+_WRAPPERS = frozenset({"sudo", "env", "exec", "command", "nohup", "time", "xargs"})
+
+# Subcommands whose -m/--message argument is a message, not a path
+_MESSAGE_COMMANDS = frozenset({"commit", "tag", "merge", "revert", "stash", "notes"})
+_MESSAGE_FLAG_RE = re.compile(r"-[a-zA-Z]*m|--message")
+
+# rm arguments that make a recursive delete dangerous (root, home, globs,
+# current and parent directory)
+_DANGEROUS_PATH_RE = re.compile(r"[/~*.]|\$\{?home\b", re.IGNORECASE)
+
+# A .env file, but not the .env.sample template
+_ENV_FILE_RE = re.compile(r"\.env\b(?!\.sample\b)")
+
+DANGEROUS_RM = "dangerous_rm"
+ENV_FILE = "env_file"
+
+
+def _substitutions(text):
+    """Return the commands of the $(...) and `...` substitutions in double-quoted text."""
+    commands = []
+    depth = 0
+    start = tick = None
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "\\":
+            i += 2
+            continue
+        if char == "`" and not depth:
+            if tick is None:
+                tick = i + 1
+            else:
+                commands.append(text[tick:i])
+                tick = None
+        elif tick is None and text.startswith("$(", i):
+            if not depth:
+                start = i + 2
+            depth += 1
+            i += 1
+        elif depth and char == "(":
+            depth += 1
+        elif depth and char == ")":
+            depth -= 1
+            if not depth:
+                commands.append(text[start:i])
+        i += 1
+    # Unterminated: scan what there is
+    if depth:
+        commands.append(text[start:])
+    if tick is not None:
+        commands.append(text[tick:])
+    return commands
+
+
+def _unquote(text, nested):
+    """Remove shell quoting from a word; substitutions in double quotes are added to nested."""
+    parts = []
+    for single, double, escaped, plain, lone in _SEGMENT_RE.findall(text):
+        if double:
+            if "$(" in double or "`" in double:
+                nested.extend(_substitutions(double))
+            parts.append(_DQ_ESCAPE_RE.sub(r"\1", double))
+        else:
+            parts.append(single or escaped or plain)
+    return "".join(parts)
+
+
+def _tokenize(command):
+    """tokenize(), plus the command substitutions found inside double quotes."""
+    commands = []
+    nested = []
+    words = []
+    for match in _TOKEN_RE.finditer(command):
+        kind = match.lastgroup
+        if kind == "sep":
+            if words:
+                commands.append(words)
+                words = []
+        elif kind == "word":
+            text = match.group()
+            words.append(_unquote(text, nested) if "'" in text or '"' in text or "\\" in text else text)
+        elif kind == "redirect":
+            words.append(match.group())
+    if words:
+        commands.append(words)
+    return commands, nested
+
+
+def tokenize(command):
+    """
+    Split a shell command into simple commands of unquoted words.
+
+    Returns:
+        list: One list of words per simple command
+    """
+    return _tokenize(command)[0]
+
+
+def _programs(words):
+    """
+    Return the programs a simple command runs from its words.
+
+    Returns:
+        tuple: (scripts, opaque) - shell scripts, scanned as commands
+        (sh -c SCRIPT, eval WORDS), and programs in another language, checked
+        on their raw text (python -c PROGRAM, ssh HOST COMMAND)
+    """
+    for i, word in enumerate(words):
+        name = word.rsplit("/", 1)[-1].lower()
+        if name == "eval":
+            return [" ".join(words[i + 1:])], []
+        if name in _SHELLS:
+            for j in range(i + 1, len(words) - 1):
+                if _SCRIPT_FLAG_RE.fullmatch(words[j]):
+                    return [words[j + 1]], []
+            return [], []
+        if name == "ssh" or (_INTERPRETER_RE.fullmatch(name) and not _PROGRAM_FLAGS.isdisjoint(words[i + 1:])):
+            return [], [" ".join(words[i + 1:])]
+    return [], []
+
+
+def _runs_variable(words):
+    """Check whether the command word of a simple command is unexpanded, such as $RM or $(...)."""
+    for word in words:
+        if _ASSIGNMENT_RE.match(word) or word.rsplit("/", 1)[-1] in _WRAPPERS:
+            continue
+        return word.startswith("$")
+    return False
+
+
+def _raw_findings(text):
+    """The rules as plain regexes over raw text, for programs that cannot be tokenized."""
+    findings = set()
+    if _ENV_FILE_RE.search(text):
+        findings.add(ENV_FILE)
+    if _RAW_RM_RE.search(text):
+        findings.add(DANGEROUS_RM)
+    return findings
+
+
+def is_env_path(path):
+    """Check whether a file path names a .env file (other than .env.sample)."""
+    return '.env' in path and not path.endswith('.env.sample')
+
+
+@lru_cache(maxsize=32)
+def scan_command(command):
+    """
+    Run every rule over a Bash command.
+
+    Args:
+        command: The command string of a Bash tool call
+
+    Returns:
+        frozenset: The names of the rules that matched (DANGEROUS_RM, ENV_FILE)
+    """
+    return frozenset(_scan(command, 0))
+
+
+def _scan(command, depth):
+    if ".env" not in command and "rm" not in command.lower():
+        return set()  # nothing any rule looks for
+    if depth > MAX_NESTING:
+        return _raw_findings(command)
+
+    findings = set()
+    commands, nested = _tokenize(command)
+    may_run_programs = _PROGRAM_HINT_RE.search(command) is not None
+    may_run_variables = "$" in command
+    for words in commands:
+        scripts, opaque = _programs(words) if may_run_programs else ((), ())
+        nested.extend(scripts)
+        for program in opaque:
+            findings |= _raw_findings(program)
+        if may_run_variables and _runs_variable(words):
+            findings |= _raw_findings(command)
+
+        # The next word is the message of a commit or tag
+        message_next = False
+        is_message_command = not _MESSAGE_COMMANDS.isdisjoint(words)
+        # rm state of this simple command: seen, recursive, force, path-like argument
+        rm = recursive = force = dangerous_path = False
+        for word in words:
+            is_message, message_next = message_next, False
+            if is_message_command and not is_message:
+                if word.startswith("--message="):
+                    is_message = True
+                else:
+                    message_next = bool(_MESSAGE_FLAG_RE.fullmatch(word))
+            # A shell script is scanned as the commands it runs
+            if ".env" in word and not is_message and word not in scripts and _ENV_FILE_RE.search(word):
+                findings.add(ENV_FILE)
+
+            lowered = word.lower()
+            if not rm:
+                rm = lowered == "rm" or lowered.endswith("/rm")
+                continue
+            if lowered.startswith("--"):
+                recursive = recursive or lowered == "--recursive"
+                force = force or lowered == "--force"
+            elif lowered.startswith("-") and len(lowered) > 1:
+                recursive = recursive or "r" in lowered
+                force = force or "f" in lowered
+            elif _DANGEROUS_PATH_RE.search(lowered):
+                dangerous_path = True
+
+        if recursive and (force or dangerous_path):
+            findings.add(DANGEROUS_RM)
+
+    for script in nested:
+        findings |= _scan(script, depth + 1)
+    return findings
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("Usage: python -m utils.command_scanner 'command'")
+        return
+    findings = scan_command(" ".join(sys.argv[1:]))
+    print(", ".join(sorted(findings)) if findings else "ok")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,6 +14,30 @@ from pathlib import Path
 # Default is 'logs' in the current working directory
 LOG_BASE_DIR = os.environ.get("CLAUDE_HOOKS_LOG_DIR", "logs")
 
+# Session logs are rotated once they grow past this many bytes
+SESSION_LOG_MAX_BYTES = int(os.environ.get("CLAUDE_HOOKS_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+
+# Per-user cache for state shared between hook processes
+HOOKS_CACHE_DIR = Path(
+    os.environ.get("CLAUDE_HOOKS_CACHE_DIR", str(Path.home() / ".cache" / "claude-hooks"))
+)
+
+# Unix domain socket of the long-lived hook daemon (see hook_daemon.py)
+HOOK_DAEMON_SOCKET = os.environ.get(
+    "CLAUDE_HOOKS_SOCKET",
+    str(Path.home() / ".claude" / "hooks" / "run" / "hookd.sock"),
+)
+
+def setting(name, default):
+    """
+    Read a setting from the environment at call time, as the type of its default.
+
+    Args:
+        name: Environment variable
+        default: Value used when it is not set; its type converts the value
+    """
+    return type(default)(os.environ.get(name, default))
+
 def get_session_log_dir(session_id: str) -> Path:
     """
     Get the log directory for a specific session.
@@ -0,0 +1,128 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Stdlib-only client for the hook daemon.
+
+Hook scripts use this to hand their stdin payload to the long-lived daemon
+(hook_daemon.py) instead of importing and running the full pipeline
+themselves. Nothing in here may import a third-party package, otherwise the
+fast path pays the same startup cost it is meant to avoid.
+"""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from .constants import HOOK_DAEMON_SOCKET
+
+# How long the client waits for the daemon to acknowledge a request
+CLIENT_TIMEOUT = float(os.environ.get("CLAUDE_HOOKS_DAEMON_TIMEOUT", "0.5"))
+
+# Settings the daemon takes from the hook's environment for each event, so
+# LOG_ENABLED, FEATURE_LOG_FORMAT, SQLITE_WRITE_MODE, git layout variables
+# etc. apply as they would in-process
+FORWARDED_ENV_PREFIXES = (
+    "LOG_", "FEATURE_", "SQLITE_", "SUMMARY_", "SUPABASE_", "HTTP_SINK_", "LLM_", "HOOK_",
+    "CIRCUIT_BREAKER_", "GIT_",
+)
+
+
+def with_timestamp(argv, timestamp_ms=None):
+    """
+    Return log_feature.py arguments with --timestamp set to when the hook fired.
+
+    The event is stamped before it is forwarded, so its timestamp does not
+    drift behind while it waits in the daemon's queue.
+
+    Args:
+        argv: Command line arguments of the hook (without the script name)
+        timestamp_ms: Time the hook fired, in ms since the epoch (default: now)
+    """
+    if "--timestamp" in argv:
+        return list(argv)
+    if timestamp_ms is None:
+        timestamp_ms = int(time.time() * 1000)
+    return [*argv, "--timestamp", str(timestamp_ms)]
+
+
+def forwarded_env(environ=None):
+    """Return the variables of environ (default: os.environ) the daemon applies per event."""
+    environ = os.environ if environ is None else environ
+    return {name: value for name, value in environ.items() if name.startswith(FORWARDED_ENV_PREFIXES)}
+
+
+def forward_to_daemon(argv, stdin_text, socket_path=HOOK_DAEMON_SOCKET, timeout=CLIENT_TIMEOUT):
+    """
+    Forward a hook invocation to the daemon.
+
+    The caller only falls back to processing the event itself when the daemon
+    cannot have it: no daemon to connect to, the request could not be sent
+    completely, or the daemon rejected it. Once the whole request is sent, a
+    missing or late acknowledgement counts as delivered, since the daemon
+    queues events before it acknowledges them and a fallback would log the
+    event twice.
+
+    Args:
+        argv: Command line arguments of the hook (without the script name)
+        stdin_text: The raw JSON payload read from stdin
+        socket_path: Path of the daemon's Unix domain socket
+        timeout: Seconds to wait for the daemon's acknowledgement
+
+    Returns:
+        bool: True if the daemon has (or may have) the event, False if the
+        caller must process it in-process
+    """
+    request = json.dumps({
+        "argv": list(argv),
+        "cwd": os.getcwd(),
+        "env": forwarded_env(),
+        "stdin": stdin_text,
+    }).encode("utf-8")
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        try:
+            sock.connect(socket_path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if os.environ.get("CLAUDE_HOOKS_DAEMON_AUTOSTART", "false").lower() == "true":
+                start_daemon(socket_path)
+            return False
+        except OSError:
+            return False
+
+        try:
+            sock.sendall(request)
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            return False  # an incomplete request is rejected by the daemon
+
+        try:
+            reply = sock.recv(16)
+        except OSError:
+            print("Hook daemon did not acknowledge the event in time", file=sys.stderr)
+            return True
+        return not reply.startswith(b"error")
+
+
+def start_daemon(socket_path=HOOK_DAEMON_SOCKET):
+    """Spawn hook_daemon.py in the background, detached from the hook."""
+    daemon_script = Path(__file__).resolve().parent.parent / "hook_daemon.py"
+    if not daemon_script.exists():
+        return
+    try:
+        subprocess.Popen(
+            ["uv", "run", str(daemon_script), "--socket", socket_path],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Failed to start hook daemon: {e}", file=sys.stderr)
@@ -7,23 +7,103 @@ import json
 import datetime
 import os
 import pwd
+from dataclasses import dataclass
+
+from .constants import HOOKS_CACHE_DIR
+
+# On-disk cache of resolved contexts, keyed by working directory
+CONTEXT_CACHE_PATH = HOOKS_CACHE_DIR / "context.json"
+CONTEXT_CACHE_MAX_ENTRIES = 64
+
+
+# ───────────── git ────────────────────────────────────────────────────────── #
+# Environment variables that change how git locates the repository; when any
+# of them is set we leave discovery to git itself.
+_GIT_LAYOUT_ENV = ("GIT_DIR", "GIT_WORK_TREE", "GIT_CEILING_DIRECTORIES", "GIT_DISCOVERY_ACROSS_FILESYSTEM")
+
+
+def find_git_dir(start: pathlib.Path | None = None) -> tuple[pathlib.Path, pathlib.Path] | None:
+    """Walk up from start looking for .git, without spawning git.
+
+    Handles regular repositories (.git directory) as well as worktrees and
+    submodules (.git file containing 'gitdir: <path>').
+
+    Returns:
+        (worktree root, git dir) or None if the layout needs git to resolve
+    """
+    if any(os.environ.get(name) for name in _GIT_LAYOUT_ENV):
+        return None
+
+    start = pathlib.Path.cwd() if start is None else start
+    for directory in (start, *start.parents):
+        dotgit = directory / ".git"
+        if dotgit.is_dir():
+            return directory, dotgit
+        if dotgit.is_file():
+            try:
+                content = dotgit.read_text(encoding="utf-8").strip()
+            except OSError:
+                return None
+            if not content.startswith("gitdir:"):
+                return None
+            git_dir = pathlib.Path(content[len("gitdir:"):].strip())
+            if not git_dir.is_absolute():
+                git_dir = (directory / git_dir).resolve()
+            return directory, git_dir
+    return None
+
+
+def read_head_branch(git_dir: pathlib.Path) -> str | None:
+    """Parse <git_dir>/HEAD like `git rev-parse --abbrev-ref HEAD`.
+
+    Returns the branch name, 'HEAD' when detached, or None if HEAD is in a
+    form only git can interpret.
+    """
+    try:
+        head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    if head.startswith("ref: refs/heads/"):
+        return head[len("ref: refs/heads/"):]
+    if re.fullmatch(r"[0-9a-f]{40}|[0-9a-f]{64}", head):
+        return "HEAD"
+    return None
 
 
 # ───────────── helpers ────────────────────────────────────────────────────── #
 def repo_root() -> pathlib.Path:
-    """Return the repository root via git."""
+    """Return the repository root, reading .git directly when possible."""
+    found = find_git_dir()
+    if found:
+        return found[0]
     return pathlib.Path(
         subprocess.check_output(["git", "rev-parse", "--show-toplevel"], text=True).strip()
     )
 
 
 def current_branch() -> str:
-    """Return the current git branch name."""
+    """Return the current git branch name, parsing HEAD directly when possible."""
+    found = find_git_dir()
+    if found:
+        branch = read_head_branch(found[1])
+        if branch:
+            return branch
     return subprocess.check_output(
         ["git", "rev-parse", "--abbrev-ref", "HEAD"], text=True
     ).strip()
 
 
+def git_head_path() -> pathlib.Path:
+    """Return the HEAD file of the current worktree."""
+    found = find_git_dir()
+    if found:
+        return found[1] / "HEAD"
+    git_dir = subprocess.check_output(
+        ["git", "rev-parse", "--absolute-git-dir"], text=True
+    ).strip()
+    return pathlib.Path(git_dir) / "HEAD"
+
+
 def current_user() -> str:
     """Best‑effort grab of the username running the hook."""
     try:
@@ -37,7 +117,7 @@ def current_user() -> str:
         
 def repo_folder_name() -> str:
     """Return the name of the folder containing the repository."""
-    return repo_root().name
+    return resolve_context().repo_root.name
 
 
 def extract_feature_name(branch: str) -> str:
@@ -62,7 +142,11 @@ def extract_feature_number(branch: str) -> str | None:
     Returns:
         The feature number (before underscore) as string or None if no underscore/number
     """
-    folder = find_feature_folder()
+    return resolve_context().feature_number
+
+
+def _feature_number_of(folder: pathlib.Path | None) -> str | None:
+    """Return the 4-digit XXXX prefix of a feature folder, if it has one."""
     if not folder:
         return None
     folder_name_parts = folder.name.split("_", 1)
@@ -71,10 +155,10 @@ def extract_feature_number(branch: str) -> str | None:
     number_part = folder_name_parts[0]
     return number_part if len(number_part) == 4 and number_part.isdigit() else None
 
-def find_feature_folder() -> pathlib.Path | None:
-    """Locate ./planning/features/XXXX_<branch> with the highest XXXX."""
-    branch = current_branch()
-    base = repo_root() / "planning" / "features"
+
+def _scan_feature_folder(root: pathlib.Path, branch: str) -> pathlib.Path | None:
+    """Scan <root>/planning/features for XXXX_<branch> with the highest XXXX."""
+    base = root / "planning" / "features"
     pattern = re.compile(rf"^(\d+)_({re.escape(branch)})$")
     matches: list[tuple[int, pathlib.Path]] = [
         (int(m.group(1)), d)
@@ -87,9 +171,145 @@ def find_feature_folder() -> pathlib.Path | None:
     return folder
 
 
+def find_feature_folder() -> pathlib.Path | None:
+    """Locate ./planning/features/XXXX_<branch> with the highest XXXX."""
+    return resolve_context().feature_folder
+
+
 def find_feature_log_path() -> pathlib.Path | None:
-    """Locate ./planning/features/XXXX_<branch>/log.json with the highest XXXX."""
+    """Locate ./planning/features/XXXX_<branch>/log.jsonl with the highest XXXX.
+
+    Set FEATURE_LOG_FORMAT=json to keep writing the legacy log.json array.
+    """
     folder = find_feature_folder()
     if not folder:
         return None
-    return folder / "log.json"
\ No newline at end of file
+    if os.environ.get("FEATURE_LOG_FORMAT", "jsonl").lower() == "json":
+        return folder / "log.json"
+    return folder / "log.jsonl"
+
+
+# ───────────── cached context ─────────────────────────────────────────────── #
+@dataclass(frozen=True)
+class FeatureContext:
+    """Everything a hook needs to know about the repository it runs in."""
+
+    repo_root: pathlib.Path
+    branch: str
+    feature_folder: pathlib.Path | None
+    feature_number: str | None
+    user: str
+
+    @property
+    def feature_name(self) -> str:
+        return extract_feature_name(self.branch)
+
+
+# Contexts resolved by this process, keyed by working directory
+_context_cache: dict[str, tuple[dict, FeatureContext]] = {}
+
+
+def _stat_key(path: pathlib.Path) -> list[int] | None:
+    """mtime, inode and size of a path: a rewrite within the mtime granularity
+    (git replaces HEAD through a lock file) still changes the inode or size."""
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_mtime_ns, st.st_ino, st.st_size]
+
+
+def _is_fresh(entry: dict) -> bool:
+    """A cache entry is valid while HEAD and planning/features are unchanged."""
+    return (
+        "head_stat" in entry
+        and _stat_key(pathlib.Path(entry["git_head"])) == entry["head_stat"]
+        and _stat_key(pathlib.Path(entry["repo_root"]) / "planning" / "features")
+        == entry["features_stat"]
+    )
+
+
+def _load_disk_cache() -> dict:
+    try:
+        return json.loads(CONTEXT_CACHE_PATH.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_disk_cache(cwd: str, entry: dict) -> None:
+    try:
+        cache = _load_disk_cache()
+        cache.pop(cwd, None)
+        cache[cwd] = entry
+        while len(cache) > CONTEXT_CACHE_MAX_ENTRIES:
+            cache.pop(next(iter(cache)))
+        CONTEXT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp = CONTEXT_CACHE_PATH.with_name(f"{CONTEXT_CACHE_PATH.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        os.replace(tmp, CONTEXT_CACHE_PATH)
+    except OSError as e:
+        print(f"Failed to write context cache: {e}", file=sys.stderr)
+
+
+def _context_from_entry(entry: dict) -> FeatureContext:
+    return FeatureContext(
+        repo_root=pathlib.Path(entry["repo_root"]),
+        branch=entry["branch"],
+        feature_folder=pathlib.Path(entry["feature_folder"]) if entry["feature_folder"] else None,
+        feature_number=entry["feature_number"],
+        user=entry["user"],
+    )
+
+
+def _compute_context() -> dict:
+    """Resolve the context from git and the filesystem (the slow path)."""
+    found = find_git_dir()
+    if found:
+        root, git_dir = found
+        branch = read_head_branch(git_dir) or current_branch()
+        head = git_dir / "HEAD"
+    else:
+        root = repo_root()
+        branch = current_branch()
+        head = git_head_path()
+    features = root / "planning" / "features"
+
+    # Stat before scanning so a concurrent change invalidates the entry
+    head_stat = _stat_key(head)
+    features_stat = _stat_key(features)
+    folder = _scan_feature_folder(root, branch) if features_stat is not None else None
+
+    return {
+        "repo_root": str(root),
+        "branch": branch,
+        "feature_folder": str(folder) if folder else None,
+        "feature_number": _feature_number_of(folder),
+        "user": current_user(),
+        "git_head": str(head),
+        "head_stat": head_stat,
+        "features_stat": features_stat,
+    }
+
+
+def resolve_context() -> FeatureContext:
+    """Return the repository/feature context for the working directory.
+
+    The context is resolved with git once and then cached in memory and in
+    CONTEXT_CACHE_PATH. Entries are reused until .git/HEAD or the
+    planning/features directory changes, so consecutive hook invocations do
+    not spawn git at all.
+    """
+    cwd = os.getcwd()
+
+    cached = _context_cache.get(cwd)
+    if cached and _is_fresh(cached[0]):
+        return cached[1]
+
+    entry = _load_disk_cache().get(cwd)
+    if not entry or not _is_fresh(entry):
+        entry = _compute_context()
+        _save_disk_cache(cwd, entry)
+
+    context = _context_from_entry(entry)
+    _context_cache[cwd] = (entry, context)
+    return context
@@ -0,0 +1,231 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+SQLite connection manager for the dashboard database.
+
+A connection is opened once per process and database path, tuned with the
+pragmas below and reused for every event. The schema is versioned with
+`PRAGMA user_version`, so DDL only runs when a database is created or needs
+migrating; afterwards an event insert is a single cached statement.
+
+Migrations run inside a hook, so they are kept cheap. The dashboard indexes
+are created with the schema of a new database; on one that already holds
+history they take a full table scan each and are built once by hand:
+
+USAGE:
+    python -m utils.db --db planning/dashboard/log.sqlite migrate
+"""
+
+import argparse
+import os
+import sqlite3
+
+# Connection-level settings applied every time a connection is opened
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",          # readers never block the writer
+    "PRAGMA synchronous=NORMAL",        # safe with WAL, avoids an fsync per commit
+    "PRAGMA busy_timeout=10000",        # wait up to 10 s for a competing writer
+    "PRAGMA mmap_size=268435456",       # map up to 256 MB for reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+def _migrate_v1(conn):
+    """Initial schema."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS features (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            type TEXT,
+            source_app TEXT,
+            feature_name TEXT,
+            feature_number TEXT,
+            user TEXT,
+            session_id TEXT,
+            hook_event_type TEXT,
+            timestamp INTEGER,
+            chat TEXT,
+            summary TEXT,
+            payload JSON
+        )
+    ''')
+
+
+# Indexes for the dashboard filters. Each leads with a filter, is ordered by
+# time for the "latest first" listings and carries the columns those
+# listings show.
+INDEXES = (
+    ("idx_features_session_time", "features (session_id, timestamp, hook_event_type, user)"),
+    ("idx_features_user_time", "features (user, timestamp, hook_event_type, session_id)"),
+    ("idx_features_type_time", "features (hook_event_type, timestamp, session_id, user)"),
+    ("idx_features_feature_time", "features (feature_number, timestamp, hook_event_type)"),
+    ("idx_features_time", "features (timestamp)"),
+)
+
+
+def _create_indexes(conn):
+    """Create the dashboard indexes that do not exist yet."""
+    for name, columns in INDEXES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {columns}")
+
+
+def _migrate_v2(conn):
+    """Real dedup key on the event identity and indexes for dashboard filters."""
+    # Hash of session, type, timestamp and payload (see logger.event_key()).
+    # Rows written before this migration keep a NULL key: they are never
+    # deleted, and the partial index leaves them out, so building it does
+    # not sort the table.
+    conn.execute("ALTER TABLE features ADD COLUMN event_key TEXT")
+    conn.execute('''
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_features_event_key
+        ON features (event_key) WHERE event_key IS NOT NULL
+    ''')
+    # Free on an empty table; otherwise left to `migrate` (see build_indexes())
+    if conn.execute("SELECT 1 FROM features LIMIT 1").fetchone() is None:
+        _create_indexes(conn)
+
+
+def _migrate_v3(conn):
+    """Content-addressed transcript storage (see utils/transcript_store.py)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transcript_messages (
+            msg_key TEXT PRIMARY KEY,
+            body TEXT NOT NULL
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS transcript_index (
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            msg_key TEXT NOT NULL,
+            PRIMARY KEY (session_id, seq)
+        ) WITHOUT ROWID
+    ''')
+    # Range of transcript positions [chat_start, chat_end) an event added
+    conn.execute("ALTER TABLE features ADD COLUMN chat_start INTEGER")
+    conn.execute("ALTER TABLE features ADD COLUMN chat_end INTEGER")
+
+
+def _migrate_v4(conn):
+    """Preset dictionaries for the BLOB codec (see utils/codec.py)."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS codec_dictionaries (
+            id BLOB PRIMARY KEY,
+            created_at INTEGER NOT NULL,
+            samples INTEGER,
+            body BLOB NOT NULL
+        )
+    ''')
+
+
+# Ordered schema migrations; the database's user_version is the number applied
+MIGRATIONS = [
+    _migrate_v1,
+    _migrate_v2,
+    _migrate_v3,
+    _migrate_v4,
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Open connections of this process, keyed by absolute database path
+_connections = {}
+
+
+def _ensure_schema(conn):
+    """Apply any migrations the database has not seen yet."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have migrated while we waited for the lock
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        for migration in MIGRATIONS[version:]:
+            migration(conn)
+        conn.execute(f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}")
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def get_connection(path_to_db):
+    """
+    Return this process's connection to a dashboard database, opening it if needed.
+
+    Args:
+        path_to_db: Path of the SQLite file; the directory is created if missing
+
+    Returns:
+        sqlite3.Connection: A connection with tuned pragmas and an up-to-date schema
+    """
+    key = os.path.abspath(path_to_db)
+    conn = _connections.get(key)
+    if conn is not None:
+        return conn
+
+    db_dir = os.path.dirname(key)
+    if db_dir and not os.path.exists(db_dir):
+        os.makedirs(db_dir, exist_ok=True)
+
+    conn = sqlite3.connect(key, timeout=10.0, cached_statements=128)
+    try:
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        _ensure_schema(conn)
+    except Exception:
+        conn.close()
+        raise
+
+    _connections[key] = conn
+    return conn
+
+
+def build_indexes(path_to_db):
+    """
+    Bring a database up to date, including the dashboard indexes.
+
+    Building an index scans the features table, and the write lock is held
+    meanwhile, so this is run by hand rather than from a hook.
+
+    Args:
+        path_to_db: Path of the SQLite file
+
+    Returns:
+        list: Names of the indexes that were created
+    """
+    conn = get_connection(path_to_db)
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    _create_indexes(conn)
+    conn.execute("ANALYZE features")
+    conn.commit()
+    return [name for name, _ in INDEXES if name not in existing]
+
+
+def close_connection(path_to_db):
+    """Close and forget the cached connection for a database, if any."""
+    conn = _connections.pop(os.path.abspath(path_to_db), None)
+    if conn is not None:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def main():
+    """Command line interface for migrating a dashboard database."""
+    parser = argparse.ArgumentParser(description='Dashboard SQLite database')
+    parser.add_argument('--db', default='./planning/dashboard/log.sqlite', help='SQLite database')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('migrate', help='Apply schema migrations and build the dashboard indexes')
+    args = parser.parse_args()
+
+    created = build_indexes(args.db)
+    print(f"Schema version {SCHEMA_VERSION}; created {len(created)} indexes: {', '.join(created) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
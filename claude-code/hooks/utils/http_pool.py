@@ -0,0 +1,94 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Keep-alive HTTP connections for the standard-library clients (the event
+server sink in utils/http_sink.py and the local LLM provider in
+utils/llm/local.py).
+
+Each thread keeps one connection per server, so a long-lived process (the
+hook daemon, a --watch flusher, the summary worker) pays for the TCP (and
+TLS) setup once instead of per request.
+"""
+
+import http.client
+import threading
+import time
+
+# One keep-alive connection per thread and server
+_local = threading.local()
+
+
+def connection(url, timeout):
+    """Return this thread's connection to the server of a urlsplit() URL, opening it if needed."""
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = (url.scheme, url.netloc)
+    conn = connections.get(key)
+    if conn is None:
+        conn_class = http.client.HTTPSConnection if url.scheme == "https" else http.client.HTTPConnection
+        conn = connections[key] = conn_class(url.netloc, timeout=timeout)
+    return conn
+
+
+def drop_connection(url):
+    """Close and forget this thread's connection to the server of a URL, if any."""
+    conn = getattr(_local, "connections", {}).pop((url.scheme, url.netloc), None)
+    if conn is not None:
+        conn.close()
+
+
+def request(url, method, body, headers, timeout, deadline=None):
+    """
+    Send one request over the kept-alive connection to a server.
+
+    A kept-alive connection may have been closed by the server since the
+    last request; the request is then retried once on a fresh connection.
+
+    Args:
+        url: The target, as returned by urllib.parse.urlsplit()
+        method: HTTP method
+        body: Request body (bytes)
+        headers: Request headers
+        timeout: Seconds per attempt
+        deadline: time.monotonic() value no attempt may run past (default: none)
+
+    Returns:
+        tuple: (status, response body)
+
+    Raises:
+        OSError, http.client.HTTPException: If the server cannot be reached
+            (TimeoutError once the deadline has passed)
+    """
+    path = url.path or "/"
+    if url.query:
+        path += "?" + url.query
+
+    for attempt in range(2):
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError("request deadline passed")
+            timeout = min(timeout, remaining)
+        conn = connection(url, timeout)
+        try:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            data = response.read()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            drop_connection(url)
+            if attempt:
+                raise
+            continue
+        except (OSError, http.client.HTTPException):
+            drop_connection(url)
+            raise
+        if response.will_close:
+            drop_connection(url)
+        return response.status, data
@@ -0,0 +1,276 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Batched, pooled sender for the observability server.
+
+Events are not POSTed one urllib connection each any more. Every event is
+first written to an on-disk outbox for its server URL (same durable
+one-file-per-event format as utils/spool.py, under HOOKS_CACHE_DIR/outbox/),
+then whoever gets the outbox's flush lock sends everything queued so far,
+one event per POST (the /events server's format) or, for servers that accept
+it, NDJSON batches of up to HTTP_SINK_BATCH_SIZE events; bodies are
+gzip-compressed and go over a keep-alive connection that is reused for the
+life of the process (the hook daemon, a --watch flusher). Connection errors,
+429 and 5xx responses are retried with exponential backoff; once
+HTTP_SINK_RETRIES retries are used up the events stay in the outbox, so
+nothing is lost while the server is down, and hooks stop trying to reach it
+for HTTP_SINK_RETRY_AFTER_S (a circuit breaker, see
+utils/circuit_breaker.py). An event or batch the server rejects (other 4xx)
+is moved to `failed/`.
+
+A flush from a hook stops after HTTP_SINK_DEADLINE_S, retries included, and
+leaves the rest queued for the next event or a --watch flusher.
+
+Settings:
+    HTTP_SINK_FORMAT       json (default), or ndjson for servers that take batches
+    HTTP_SINK_BATCH_SIZE   events per flush step, and per request with ndjson (default 100)
+    HTTP_SINK_TIMEOUT      seconds per request (default 2)
+    HTTP_SINK_RETRIES      retries per request (default 2)
+    HTTP_SINK_BACKOFF_MS   first retry delay, doubled each time (default 100)
+    HTTP_SINK_DEADLINE_S   seconds a hook spends flushing, at most (default 3)
+    HTTP_SINK_RETRY_AFTER_S  seconds before hooks try a down server again (default 30)
+
+USAGE:
+    python -m utils.http_sink --url http://localhost:4000/events --flush
+    python -m utils.http_sink --url http://localhost:4000/events --watch [--interval 1]
+    python -m utils.http_sink --url http://localhost:4000/events --stats
+"""
+
+import argparse
+import gzip
+import hashlib
+import http.client
+import json
+import os
+import sys
+import time
+import urllib.parse
+from pathlib import Path
+
+from .circuit_breaker import CircuitBreaker
+from .constants import HOOKS_CACHE_DIR, setting
+from .http_pool import request
+from .spool import acquire_writer_lock, pending_files, quarantine, spool_event
+
+OUTBOX_DIR = HOOKS_CACHE_DIR / "outbox"
+
+# Bodies smaller than this are not worth compressing
+GZIP_MIN_BYTES = 1024
+
+USER_AGENT = "Claude-Code-Hook/1.0"
+
+
+def outbox_dir_for(server_url):
+    """Return the outbox directory of a server URL."""
+    return OUTBOX_DIR / hashlib.sha256(server_url.encode("utf-8")).hexdigest()[:16]
+
+
+def _remaining(deadline):
+    """Seconds left before a time.monotonic() deadline; None means no deadline."""
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def _expired(deadline):
+    return deadline is not None and time.monotonic() >= deadline
+
+
+def _post(server_url, body, content_type, deadline=None):
+    """
+    POST one request body.
+
+    Returns:
+        int or None: The HTTP status, or None if the server could not be reached
+    """
+    url = urllib.parse.urlsplit(server_url)
+    headers = {"Content-Type": content_type, "User-Agent": USER_AGENT}
+    if len(body) >= GZIP_MIN_BYTES:
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    try:
+        status, _ = request(url, "POST", body, headers, setting("HTTP_SINK_TIMEOUT", 2.0), deadline)
+        return status
+    except (OSError, http.client.HTTPException):
+        return None
+
+
+def _retryable(status):
+    return status is None or status == 429 or status >= 500
+
+
+def _send_with_retry(server_url, body, content_type, deadline=None):
+    """POST with exponential backoff until the deadline; returns the last status (None if unreachable)."""
+    retries = setting("HTTP_SINK_RETRIES", 2)
+    delay = setting("HTTP_SINK_BACKOFF_MS", 100) / 1000
+    status = _post(server_url, body, content_type, deadline)
+    for _ in range(retries):
+        if not _retryable(status):
+            break
+        remaining = _remaining(deadline)
+        if remaining is not None and remaining <= delay:
+            break  # no time left for another attempt
+        time.sleep(delay)
+        delay *= 2
+        status = _post(server_url, body, content_type, deadline)
+    return status
+
+
+def _read_batch(files):
+    """Load the events of a batch of outbox files, moving unreadable ones aside."""
+    loaded = []
+    for path in files:
+        try:
+            loaded.append((path, json.loads(path.read_bytes())))
+        except FileNotFoundError:
+            pass  # sent by another flush
+        except (OSError, ValueError):
+            quarantine(path)
+    return loaded
+
+
+def _deliver(server_url, loaded, deadline=None):
+    """
+    Send loaded outbox events and delete the delivered files.
+
+    Returns:
+        tuple: (sent, server_up) - events delivered, and False if the server
+        could not take them so the flush should stop
+    """
+    if setting("HTTP_SINK_FORMAT", "json").lower() == "ndjson":
+        body = "".join(json.dumps(event, separators=(",", ":")) + "\n" for _, event in loaded)
+        requests = [([path for path, _ in loaded], body.encode("utf-8"))] if loaded else []
+        content_type = "application/x-ndjson"
+    else:
+        requests = [([path], json.dumps(event).encode("utf-8")) for path, event in loaded]
+        content_type = "application/json"
+
+    sent = 0
+    for paths, body in requests:
+        if _expired(deadline):
+            break  # out of time; the rest stays queued
+        status = _send_with_retry(server_url, body, content_type, deadline)
+        if _retryable(status):
+            print(f"Event server unavailable ({status or 'unreachable'}); "
+                  f"{len(loaded) - sent} events kept in the outbox", file=sys.stderr)
+            return sent, False
+        if 200 <= status < 300:
+            for path in paths:
+                path.unlink(missing_ok=True)
+            sent += len(paths)
+        else:
+            print(f"Event server rejected {len(paths)} events with status {status}", file=sys.stderr)
+            for path in paths:
+                quarantine(path)
+    return sent, True
+
+
+def _server_breaker(outbox_dir):
+    """Breaker that spares hooks the connect and retries while the server is down."""
+    return CircuitBreaker(f"outbox-{Path(outbox_dir).name}", failure_threshold=1,
+                          cooldown_s=setting("HTTP_SINK_RETRY_AFTER_S", 30.0))
+
+
+def flush_outbox(server_url, outbox_dir=None, batch_size=None, blocking=False, deadline_s=None):
+    """
+    Send all queued events of a server.
+
+    Args:
+        server_url: URL of the event server
+        outbox_dir: Outbox directory; defaults to outbox_dir_for(server_url)
+        batch_size: Maximum events per request (default HTTP_SINK_BATCH_SIZE)
+        blocking: Wait for the flush lock instead of leaving the work to
+            whoever currently holds it, and try the server even if it was
+            found down less than HTTP_SINK_RETRY_AFTER_S ago
+        deadline_s: Stop sending after this many seconds, retries included,
+            and leave the rest queued; None sends until done
+
+    Returns:
+        int or None: Number of events delivered, or None if another process
+        holds the lock (it will pick up our events)
+    """
+    outbox_dir = Path(outbox_dir or outbox_dir_for(server_url))
+    batch_size = batch_size or setting("HTTP_SINK_BATCH_SIZE", 100)
+    deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+    lock_fd = acquire_writer_lock(outbox_dir, blocking)
+    if lock_fd is None:
+        return None
+    try:
+        # Asked only by the lock holder: in half-open state, allow() makes
+        # us the probe, which must then record how the server did
+        breaker = _server_breaker(outbox_dir)
+        if not blocking and not breaker.allow():
+            return 0  # the server was down a moment ago; leave the events queued
+        sent, server_up = 0, True
+        # Re-list so events queued while we were sending go out with this flush
+        for _ in range(3):
+            files = pending_files(outbox_dir)
+            if not files:
+                break
+            for i in range(0, len(files), batch_size):
+                delivered, server_up = _deliver(server_url, _read_batch(files[i:i + batch_size]), deadline)
+                sent += delivered
+                if not server_up or _expired(deadline):
+                    break
+            if not server_up or _expired(deadline):
+                break
+        breaker.record(server_up)
+        return sent
+    finally:
+        os.close(lock_fd)
+
+
+def send_event(event_data, server_url, outbox_dir=None):
+    """
+    Queue an event for the server and flush the outbox.
+
+    Args:
+        event_data: The event dictionary
+        server_url: URL of the event server
+        outbox_dir: Outbox directory; defaults to outbox_dir_for(server_url)
+
+    Returns:
+        bool: True if the event is delivered or safely queued for a later flush
+    """
+    outbox_dir = outbox_dir or outbox_dir_for(server_url)
+    try:
+        spool_event(event_data, outbox_dir)
+    except OSError as e:
+        print(f"Failed to queue event for {server_url}: {e}", file=sys.stderr)
+        return False
+    flush_outbox(server_url, outbox_dir, deadline_s=setting("HTTP_SINK_DEADLINE_S", 3.0))
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Send the queued events of an observability server')
+    parser.add_argument('--url', default='http://localhost:4000/events', help='Event server URL')
+    parser.add_argument('--batch-size', type=int, help='Events per request')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--flush', action='store_true', help='Send the queued events once')
+    group.add_argument('--watch', action='store_true', help='Keep sending queued events')
+    group.add_argument('--stats', action='store_true', help='Show the outbox size')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between --watch flushes')
+    args = parser.parse_args()
+
+    outbox_dir = outbox_dir_for(args.url)
+    if args.stats:
+        files = pending_files(outbox_dir)
+        failed = list((outbox_dir / "failed").glob("*.json")) if (outbox_dir / "failed").exists() else []
+        print(f"{outbox_dir}: {len(files)} queued, {len(failed)} failed")
+        return
+    if args.flush:
+        sent = flush_outbox(args.url, outbox_dir, args.batch_size, blocking=True)
+        print(f"Sent {sent} events")
+        return
+    try:
+        while True:
+            flush_outbox(args.url, outbox_dir, args.batch_size, blocking=True)
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
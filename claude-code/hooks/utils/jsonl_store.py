@@ -0,0 +1,323 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Append-only JSONL event storage.
+
+Each event is one line in `<name>.jsonl`, written with a single O_APPEND
+write, so the cost of logging an event does not depend on how many events
+the file already holds. A sidecar `<name>.jsonl.idx` stores the byte offset
+of every line as a little-endian uint64, which gives O(1) random access and
+counting without parsing the log.
+
+The legacy JSON array format (`log.json`) can still be produced on demand:
+
+USAGE:
+    python -m utils.jsonl_store export planning/features/0001_x/log.jsonl [out.json]
+    python -m utils.jsonl_store import planning/features/0001_x/log.json [out.jsonl]
+    python -m utils.jsonl_store reindex planning/features/0001_x/log.jsonl
+    python -m utils.jsonl_store count planning/features/0001_x/log.jsonl
+"""
+
+import fcntl
+import json
+import os
+import struct
+import sys
+import textwrap
+from pathlib import Path
+
+_OFFSET = struct.Struct("<Q")
+
+
+def index_path(path):
+    """Return the path of the byte-offset index belonging to a JSONL file."""
+    path = Path(path)
+    return path.with_name(path.name + ".idx")
+
+
+def write_all(fd, data):
+    """Write all of data to a raw file descriptor."""
+    while data:
+        written = os.write(fd, data)
+        data = data[written:]
+
+
+def append_jsonl(path, record, index=True):
+    """
+    Append one record to a JSONL file.
+
+    The write is serialized with an exclusive flock so concurrent hooks never
+    interleave lines, and the record's offset is appended to the index while
+    the lock is held.
+
+    Args:
+        path: Path of the .jsonl file
+        record: JSON-serializable object
+        index: Whether to maintain the .idx sidecar
+
+    Returns:
+        int: Byte offset at which the record was written
+    """
+    path = Path(path)
+    line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        offset = os.lseek(fd, 0, os.SEEK_END)
+        write_all(fd, line)
+        if index:
+            idx_fd = os.open(index_path(path), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                write_all(idx_fd, _OFFSET.pack(offset))
+            finally:
+                os.close(idx_fd)
+        return offset
+    finally:
+        os.close(fd)
+
+
+def _parse_line(line):
+    """
+    Decode the record on one line of a JSONL file.
+
+    A writer that dies mid-append leaves a torn line without its newline, and
+    the next append lands on the same line. The record on such a line starts
+    after the torn prefix.
+
+    Returns:
+        tuple: (offset of the record within the line, record), or None if the
+        line holds no valid record
+    """
+    try:
+        return 0, json.loads(line)
+    except ValueError:
+        pass
+    start = line.find(b"{", 1)
+    while start != -1:
+        try:
+            return start, json.loads(line[start:])
+        except ValueError:
+            start = line.find(b"{", start + 1)
+    return None
+
+
+def iter_jsonl(path):
+    """Yield every valid record of a JSONL file in order, skipping corrupt lines."""
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, "rb") as f:
+        for line in f:
+            parsed = _parse_line(line)
+            if parsed:
+                yield parsed[1]
+
+
+def _index_matches(path):
+    """
+    Check that the index describes the whole data file.
+
+    append_jsonl writes the line before its offset, so a crash in between
+    leaves the data file ahead of the index; a truncated or replaced data file
+    leaves it behind. Either way the last indexed line no longer ends where
+    the file does.
+    """
+    path = Path(path)
+    try:
+        idx_size = index_path(path).stat().st_size
+    except FileNotFoundError:
+        return False
+    try:
+        data_size = path.stat().st_size
+    except FileNotFoundError:
+        return idx_size == 0
+    if idx_size % _OFFSET.size:
+        return False
+    if idx_size == 0:
+        return data_size == 0
+
+    with open(index_path(path), "rb") as idx:
+        idx.seek(idx_size - _OFFSET.size)
+        (last,) = _OFFSET.unpack(idx.read(_OFFSET.size))
+    if last >= data_size:
+        return False
+    with open(path, "rb") as f:
+        f.seek(last)
+        line = f.readline()
+    return line.endswith(b"\n") and last + len(line) == data_size
+
+
+def _ensure_index(path):
+    """Rebuild the index if it does not match the data file."""
+    if _index_matches(path):
+        return
+    if not Path(path).exists():
+        rebuild_index(path)
+        return
+    # Under the writers' lock, so an append cannot land between check and rebuild
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        if not _index_matches(path):
+            rebuild_index(path)
+    finally:
+        os.close(fd)
+
+
+def count_jsonl_records(path):
+    """Return the number of records in a JSONL file using its index."""
+    _ensure_index(path)
+    return index_path(path).stat().st_size // _OFFSET.size
+
+
+def read_jsonl_record(path, n):
+    """
+    Read the n-th record of a JSONL file without scanning it.
+
+    Args:
+        path: Path of the .jsonl file
+        n: Zero-based record number; negative values count from the end
+
+    Returns:
+        The decoded record
+
+    Raises:
+        IndexError: If n is out of range
+    """
+    count = count_jsonl_records(path)
+    if n < 0:
+        n += count
+    if not 0 <= n < count:
+        raise IndexError(f"record {n} out of range (0..{count - 1})")
+
+    with open(index_path(path), "rb") as idx:
+        idx.seek(n * _OFFSET.size)
+        (offset,) = _OFFSET.unpack(idx.read(_OFFSET.size))
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return json.loads(f.readline())
+
+
+def rebuild_index(path):
+    """
+    Regenerate the .idx sidecar from the JSONL file. Returns the record count.
+
+    Lines without a valid record are left out, and a record appended to a
+    torn line is indexed at its own offset, so every indexed offset decodes.
+    """
+    path = Path(path)
+    offsets = []
+    if path.exists():
+        with open(path, "rb") as f:
+            offset = 0
+            for line in f:
+                parsed = _parse_line(line)
+                if parsed:
+                    offsets.append(offset + parsed[0])
+                offset += len(line)
+
+    tmp = index_path(path).with_suffix(".idx.tmp")
+    with open(tmp, "wb") as idx:
+        for offset in offsets:
+            idx.write(_OFFSET.pack(offset))
+    os.replace(tmp, index_path(path))
+    return len(offsets)
+
+
+def write_json_array(records, json_path):
+    """
+    Stream records into a JSON array file in the legacy format.
+
+    The output is byte-for-byte what `json.dumps(list(records), indent=2)`
+    produces, but records are written one at a time so memory stays flat.
+
+    Args:
+        records: Iterable of JSON-serializable objects
+        json_path: Destination file, replaced atomically
+
+    Returns:
+        Path: The written file
+    """
+    json_path = Path(json_path)
+    tmp = json_path.with_name(json_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as out:
+        first = True
+        for record in records:
+            out.write("[\n" if first else ",\n")
+            out.write(textwrap.indent(json.dumps(record, indent=2), "  "))
+            first = False
+        out.write("[]" if first else "\n]")
+    os.replace(tmp, json_path)
+    return json_path
+
+
+def export_json_array(jsonl_path, json_path=None):
+    """
+    Write the records of a JSONL file as a legacy JSON array (indent=2).
+
+    Args:
+        jsonl_path: Source .jsonl file
+        json_path: Destination file; defaults to the same name with .json
+
+    Returns:
+        Path: The written file
+    """
+    jsonl_path = Path(jsonl_path)
+    json_path = Path(json_path) if json_path else jsonl_path.with_suffix(".json")
+    return write_json_array(iter_jsonl(jsonl_path), json_path)
+
+
+def import_json_array(json_path, jsonl_path=None):
+    """
+    Convert a legacy JSON array log into JSONL (with index).
+
+    The destination is replaced atomically rather than appended to, so
+    running the import again does not duplicate the events.
+
+    Args:
+        json_path: Source .json file containing a list of events
+        jsonl_path: Destination file; defaults to the same name with .jsonl
+
+    Returns:
+        Path: The written file
+    """
+    json_path = Path(json_path)
+    jsonl_path = Path(jsonl_path) if jsonl_path else json_path.with_suffix(".jsonl")
+
+    records = json.loads(json_path.read_text(encoding="utf-8"))
+    if not isinstance(records, list):
+        records = [records]
+    tmp = jsonl_path.with_name(jsonl_path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as out:
+        for record in records:
+            out.write(json.dumps(record, separators=(",", ":")) + "\n")
+    os.replace(tmp, jsonl_path)
+    rebuild_index(jsonl_path)
+    return jsonl_path
+
+
+def main():
+    """Command line interface for converting and inspecting JSONL logs."""
+    if len(sys.argv) < 3 or sys.argv[1] not in ("export", "import", "reindex", "count"):
+        print(__doc__.split("USAGE:")[1].rstrip())
+        sys.exit(1)
+
+    command, path = sys.argv[1], sys.argv[2]
+    out = sys.argv[3] if len(sys.argv) > 3 else None
+    if command == "export":
+        print(export_json_array(path, out))
+    elif command == "import":
+        print(import_json_array(path, out))
+    elif command == "reindex":
+        print(f"Indexed {rebuild_index(path)} records")
+    else:
+        print(count_jsonl_records(path))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,33 +9,35 @@
 
 import os
 import sys
-from dotenv import load_dotenv
 
+try:
+    from .provider import get_client
+except ImportError:  # run directly as a script
+    from provider import get_client
 
-def prompt_llm(prompt_text):
+
+def prompt_llm(prompt_text, max_tokens=100):
     """
     Base Anthropic LLM prompting method using fastest model.
 
+    The client, and its keep-alive connection pool, is shared by every call
+    in the process (see provider.py).
+
     Args:
         prompt_text (str): The prompt to send to the model
+        max_tokens (int): Upper bound on the length of the response
 
     Returns:
         str: The model's response text, or None if error
     """
-    load_dotenv()
-
-    api_key = os.getenv("ANTHROPIC_API_KEY")
-    if not api_key:
-        return None
-
     try:
-        import anthropic
-
-        client = anthropic.Anthropic(api_key=api_key)
+        client = get_client("anthropic")
+        if client is None:
+            return None
 
         message = client.messages.create(
             model="claude-3-5-haiku-20241022",  # Fastest Anthropic model
-            max_tokens=100,
+            max_tokens=max_tokens,
             temperature=0.7,
             messages=[{"role": "user", "content": prompt_text}],
         )
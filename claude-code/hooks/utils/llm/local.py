@@ -0,0 +1,73 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Local LLM provider: any OpenAI-compatible chat completions endpoint, spoken
+to with the standard library only.
+
+Point it at the stand-in server (stubs/llm_stub.py) to run the summarizer
+and the hooks without an API key, or at a local model server such as
+llama.cpp or Ollama. Selected with LLM_PROVIDER=local.
+
+Settings:
+    LLM_LOCAL_URL     chat completions URL (default http://127.0.0.1:8089/v1/chat/completions)
+    LLM_LOCAL_MODEL   model name sent in the request (default local)
+"""
+
+import http.client
+import json
+import os
+import sys
+import urllib.parse
+from pathlib import Path
+
+try:
+    from ..http_pool import request
+except ImportError:  # run directly as a script
+    sys.path.append(str(Path(__file__).resolve().parent.parent.parent))
+    from utils.http_pool import request
+
+DEFAULT_URL = "http://127.0.0.1:8089/v1/chat/completions"
+
+def prompt_llm(prompt_text, max_tokens=100):
+    """
+    Prompt the local OpenAI-compatible endpoint.
+
+    Args:
+        prompt_text (str): The prompt to send to the model
+        max_tokens (int): Upper bound on the length of the response
+
+    Returns:
+        str: The model's response text, or None if error
+    """
+    url = urllib.parse.urlsplit(os.environ.get("LLM_LOCAL_URL", DEFAULT_URL))
+    timeout = float(os.environ.get("LLM_TIMEOUT", "10"))
+    body = json.dumps({
+        "model": os.environ.get("LLM_LOCAL_MODEL", "local"),
+        "messages": [{"role": "user", "content": prompt_text}],
+        "max_tokens": max_tokens,
+        "temperature": 0.7,
+    }).encode("utf-8")
+
+    try:
+        status, data = request(url, "POST", body, {"Content-Type": "application/json"}, timeout)
+        if status != 200:
+            return None
+        return json.loads(data)["choices"][0]["message"]["content"].strip()
+    except (OSError, http.client.HTTPException, ValueError, KeyError, IndexError):
+        return None
+
+
+def main():
+    """Command line interface for testing."""
+    if len(sys.argv) > 1:
+        response = prompt_llm(" ".join(sys.argv[1:]))
+        print(response if response else "Error calling the local LLM endpoint")
+    else:
+        print("Usage: ./local.py 'your prompt here'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# dependencies = [
+#     "anthropic",
+#     "openai",
+#     "python-dotenv",
+# ]
+# ///
+
+"""
+Shared LLM clients and provider selection.
+
+Clients are created once per process and API key and kept in a registry.
+Each SDK client owns a keep-alive HTTP connection pool, so repeated prompts
+in a long-lived process (hook daemon, summary worker) reuse the TLS
+connection instead of setting up a client per call. The SDKs are only
+imported when a client is first needed.
+
+The provider is chosen once: LLM_PROVIDER names one of PROVIDERS (openai,
+anthropic, local - see local.py - or one added with register_provider), or
+is auto (the default) for OpenAI when OPENAI_API_KEY is set, else Anthropic
+when ANTHROPIC_API_KEY is set. A provider is any function
+prompt_llm(prompt_text, max_tokens) returning the response text or None.
+
+Settings:
+    LLM_TIMEOUT       seconds per request (default 10)
+    LLM_MAX_RETRIES   SDK retries per request (default 1)
+"""
+
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+
+# Clients of this process, keyed by (provider, api_key)
+_clients = {}
+_lock = threading.Lock()
+
+_env_loaded = False
+_provider = None
+
+# Built-in providers: name -> module of this package defining prompt_llm
+PROVIDERS = {
+    "openai": "oai",
+    "anthropic": "anth",
+    "local": "local",
+}
+
+# SDK package each built-in provider imports
+SDK_MODULES = {
+    "openai": "openai",
+    "anthropic": "anthropic",
+}
+
+# Providers added at runtime: name -> prompt_llm function
+_registered = {}
+
+# SDK package -> whether it can be imported, checked once per process
+_sdk_installed = {}
+
+
+def load_env_once():
+    """Load .env into the environment the first time an LLM setting is needed."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+
+def llm_timeout():
+    return float(os.environ.get("LLM_TIMEOUT", "10"))
+
+
+def _create_client(provider, api_key):
+    max_retries = int(os.environ.get("LLM_MAX_RETRIES", "1"))
+    if provider == "openai":
+        from openai import OpenAI
+        return OpenAI(api_key=api_key, timeout=llm_timeout(), max_retries=max_retries)
+    if provider == "anthropic":
+        import anthropic
+        return anthropic.Anthropic(api_key=api_key, timeout=llm_timeout(), max_retries=max_retries)
+    raise ValueError(f"Unknown LLM provider {provider!r}")
+
+
+def get_client(provider):
+    """
+    Return the shared SDK client of a provider.
+
+    Args:
+        provider: 'openai' or 'anthropic'
+
+    Returns:
+        The SDK client, or None if the provider's API key is not set
+    """
+    load_env_once()
+    api_key = os.getenv("OPENAI_API_KEY" if provider == "openai" else "ANTHROPIC_API_KEY")
+    if not api_key:
+        return None
+
+    key = (provider, api_key)
+    client = _clients.get(key)
+    if client is None:
+        with _lock:
+            client = _clients.get(key)
+            if client is None:
+                client = _clients[key] = _create_client(provider, api_key)
+    return client
+
+
+def register_provider(name, prompt_func):
+    """Make prompt_func(prompt_text, max_tokens) available as LLM_PROVIDER=name."""
+    _registered[name] = prompt_func
+
+
+def select_provider():
+    """Pick the provider once per process; returns its name, or None if none is configured."""
+    global _provider
+    if _provider is None:
+        load_env_once()
+        choice = os.environ.get("LLM_PROVIDER", "auto").lower()
+        if choice in PROVIDERS or choice in _registered:
+            _provider = choice
+        elif os.getenv("OPENAI_API_KEY"):
+            _provider = "openai"
+        elif os.getenv("ANTHROPIC_API_KEY"):
+            _provider = "anthropic"
+        else:
+            return None  # check again once a key may have been loaded
+    return _provider
+
+
+def sdk_available():
+    """
+    Check that the selected provider's SDK package can be imported.
+
+    A script environment that does not declare the SDK fails every request
+    the same way. That is a setup problem rather than a provider outage, so
+    it is reported once to stderr instead of being left to prompt_llm(),
+    which returns None for it like for any failed request.
+
+    Returns:
+        bool: False if the SDK is missing; True otherwise, including when no
+        provider is configured
+    """
+    module = SDK_MODULES.get(select_provider())
+    if module is None:
+        return True
+    if module not in _sdk_installed:
+        _sdk_installed[module] = importlib.util.find_spec(module) is not None
+        if not _sdk_installed[module]:
+            print(f"LLM provider {_provider!r} needs the {module!r} package, which is not installed",
+                  file=sys.stderr)
+    return _sdk_installed[module]
+
+
+def prompt_llm(prompt_text, max_tokens=100):
+    """
+    Prompt the selected provider's fastest model.
+
+    Args:
+        prompt_text (str): The prompt to send to the model
+        max_tokens (int): Upper bound on the length of the response
+
+    Returns:
+        str: The model's response text, or None if no provider is configured or on error
+    """
+    provider = select_provider()
+    if provider is None:
+        return None
+    provider_prompt = _registered.get(provider)
+    if provider_prompt is None:
+        module = importlib.import_module(f".{PROVIDERS[provider]}", __package__)
+        provider_prompt = module.prompt_llm
+    return provider_prompt(prompt_text, max_tokens=max_tokens)
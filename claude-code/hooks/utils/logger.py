@@ -7,82 +7,21 @@
 # ]
 # ///
 
-import urllib.request
-import urllib.error
+import atexit
+import hashlib
 import json
-import sys
 import os
+import sys
 import sqlite3
+import threading
 import time
 import random
-import gzip
-import base64
-from supabase import create_client, Client
-
-
-def _compress_large_json(data, compression_threshold=100000):
-    """Compress JSON data if it exceeds the threshold size.
-    
-    Args:
-        data: The data to potentially compress (string, list, or dict)
-        compression_threshold: Size in bytes above which to compress (default 100KB)
-        
-    Returns:
-        tuple: (compressed_data_string, is_compressed_boolean)
-    """
-    if data is None:
-        return None, False
-    
-    # Convert to JSON string if not already
-    if isinstance(data, (list, dict)):
-        json_str = json.dumps(data)
-    elif isinstance(data, str):
-        json_str = data
-    else:
-        json_str = str(data)
-    
-    # Check if compression is needed
-    if len(json_str.encode('utf-8')) > compression_threshold:
-        try:
-            # Compress and encode as base64
-            compressed = gzip.compress(json_str.encode('utf-8'))
-            compressed_b64 = base64.b64encode(compressed).decode('utf-8')
-            # Add a prefix to indicate this is compressed
-            return f"GZIP_B64:{compressed_b64}", True
-        except Exception as e:
-            print(f"Warning: Failed to compress large JSON data: {e}", file=sys.stderr)
-            # Fall back to original data
-            return json_str, False
-    
-    return json_str, False
-
-
-def _decompress_json(data):
-    """Decompress JSON data if it was compressed.
-    
-    Args:
-        data: The data string that might be compressed
-        
-    Returns:
-        The decompressed data (as string) or original data if not compressed
-    """
-    if data is None or not isinstance(data, str):
-        return data
-    
-    # Check if data is compressed
-    if data.startswith("GZIP_B64:"):
-        try:
-            # Remove prefix and decode
-            compressed_b64 = data[9:]  # Remove "GZIP_B64:" prefix
-            compressed = base64.b64decode(compressed_b64.encode('utf-8'))
-            decompressed = gzip.decompress(compressed).decode('utf-8')
-            return decompressed
-        except Exception as e:
-            print(f"Warning: Failed to decompress data: {e}", file=sys.stderr)
-            # Return original data if decompression fails
-            return data
-    
-    return data
+from . import codec
+from .circuit_breaker import CircuitBreaker
+from .constants import setting
+from .db import get_connection, close_connection
+from .jsonl_store import append_jsonl
+from .transcript_store import as_message_list, store_transcript
 
 
 def _prepare_event_record(event_data):
@@ -103,36 +42,29 @@ def _prepare_event_record(event_data):
 
 
 def send_event_to_server(event_data, server_url='http://localhost:4000/events'):
-    """Send event data to the observability server."""
-    try:
-        # Prepare the request
-        req = urllib.request.Request(
-            server_url,
-            data=json.dumps(event_data).encode('utf-8'),
-            headers={
-                'Content-Type': 'application/json',
-                'User-Agent': 'Claude-Code-Hook/1.0'
-            }
-        )
-        
-        # Send the request
-        with urllib.request.urlopen(req, timeout=5) as response:
-            if response.status == 200:
-                return True
-            else:
-                print(f"Server returned status: {response.status}", file=sys.stderr)
-                return False
-                
-    except urllib.error.URLError as e:
-        print(f"Failed to send event: {e}", file=sys.stderr)
-        return False
-    except Exception as e:
-        print(f"Unexpected error: {e}", file=sys.stderr)
-        return False
-    
+    """
+    Send event data to the observability server.
+
+    The event goes through the server's on-disk outbox and is delivered in a
+    batched, gzip-compressed request over a pooled connection (see
+    utils/http_sink.py); if the server is down it stays queued for later.
+
+    Returns:
+        bool: True if the event was delivered or queued
+    """
+    from .http_sink import send_event
+    return send_event(event_data, server_url)
+
 
 def send_event_to_file(event_data, file_path):
-    """Append the event_data to the end of a log json file."""
+    """Append the event_data to the end of a log json file.
+
+    A `.jsonl` path is written in append-only mode (one line per event, see
+    utils/jsonl_store.py); any other path keeps the legacy JSON array format.
+    """
+    if file_path.suffix == ".jsonl":
+        return send_event_to_jsonl(event_data, file_path)
+
     try:        
         # Check if file exists and has content
         if file_path.exists() and file_path.stat().st_size > 0:
@@ -157,89 +89,127 @@ def send_event_to_file(event_data, file_path):
     except Exception as e:
         print(f"Unexpected error: {e}", file=sys.stderr)
         return False
+
+
+def send_event_to_jsonl(event_data, file_path):
+    """Append the event_data as one line to a JSONL log with an O_APPEND write."""
+    try:
+        append_jsonl(file_path, event_data)
+        return True
+    except Exception as e:
+        print(f"Unexpected error: {e}", file=sys.stderr)
+        return False
     
     
-def send_event_to_sqllite_database(event_data, path_to_db, max_retries=5):
-    """Send event data to the observability database with retry logic for concurrent access."""
-    
-    # Check if the database file exists and create the directory if needed
-    db_dir = os.path.dirname(path_to_db)
-    if db_dir and not os.path.exists(db_dir):
-        os.makedirs(db_dir)
+# Single-statement insert; sqlite3 caches the prepared statement per connection.
+# A replayed event hits the idx_features_event_key unique index and is
+# ignored, so the row already stored (and its summary) is kept.
+INSERT_EVENT_SQL = '''
+    INSERT OR IGNORE INTO features 
+    (type, source_app, feature_name, feature_number, user, session_id, hook_event_type, 
+    timestamp, chat, summary, payload, chat_start, chat_end, event_key) 
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+
+def event_key(event_data):
+    """Return the identity of an event: a hash of its session, type, timestamp and payload.
+
+    Two hooks can fire in the same millisecond, so (session_id,
+    hook_event_type, timestamp) alone is not unique; the payload (tool_use_id,
+    tool input, prompt) tells them apart. The timestamp is stamped once when
+    the hook fires (--timestamp, see daemon_client.with_timestamp()), so a
+    replay of the same event (spool, daemon fallback) hashes to the same key.
+    """
+    identity = json.dumps(
+        [event_data.get('session_id', ''), event_data.get('hook_event_type', ''),
+         event_data.get('timestamp', 0), event_data.get('payload', {})],
+        sort_keys=True, separators=(',', ':'), default=str,
+    )
+    return hashlib.blake2b(identity.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _event_row(event_data, chat_range=None, dictionary=None):
+    """Build the parameter tuple for INSERT_EVENT_SQL from event data.
+
+    chat_range is the (start, end) transcript range returned by
+    store_transcript(); when given, the chat itself is not stored in the row.
+    payload and chat are stored as codec BLOBs (see utils/codec.py), using
+    the preset dictionary when one is given.
+    """
+    # Prepare the record using the common helper
+    record = _prepare_event_record(event_data)
     
+    # Transcripts live in the normalized transcript tables
+    chat_start, chat_end = chat_range if chat_range else (None, None)
+    if chat_range:
+        record['chat'] = None
+
+    record['payload'] = codec.encode(record['payload'], dictionary=dictionary)
+    record['chat'] = codec.encode(record['chat'], dictionary=dictionary)
+
+    return (
+        record['type'],
+        record['source_app'],
+        record['feature_name'],
+        record['feature_number'],
+        record['user'],
+        record['session_id'],
+        record['hook_event_type'],
+        record['timestamp'],
+        record['chat'],
+        record['summary'],
+        record['payload'],
+        chat_start,
+        chat_end,
+        event_key(event_data)
+    )
+
+
+def insert_events(conn, events):
+    """Insert a batch of events with one executemany; the caller commits.
+
+    Chat transcripts are stored message by message in the normalized
+    transcript tables, so each event only references the messages it added.
+    """
+    dictionary = codec.active_dictionary(conn)
+    rows = []
+    for event in events:
+        chat_range = None
+        messages = as_message_list(event.get('chat'))
+        if messages is not None:
+            payload = event.get('payload')
+            chat_range = store_transcript(
+                conn, event.get('session_id', ''), messages, event.get('chat_start', 0), dictionary,
+                transcript_path=payload.get('transcript_path') if isinstance(payload, dict) else None,
+            )
+        rows.append(_event_row(event, chat_range, dictionary))
+    conn.executemany(INSERT_EVENT_SQL, rows)
+
+
+def send_event_to_sqllite_database(event_data, path_to_db, max_retries=5):
+    """Send event data to the observability database with retry logic for concurrent access.
+
+    The connection, pragmas and schema are handled once per process by
+    utils/db.py, so each event is a single INSERT and COMMIT.
+    """
     for attempt in range(max_retries):
         conn = None
         try:
-            # Connect with timeout and enable WAL mode for better concurrency
-            conn = sqlite3.connect(path_to_db, timeout=10.0)
-            cursor = conn.cursor()
-            
-            # Enable WAL mode for better concurrent write support
-            cursor.execute("PRAGMA journal_mode=WAL;")
-            
-            # Create the table if it doesn't exist
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS features (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    type TEXT,
-                    source_app TEXT,
-                    feature_name TEXT,
-                    feature_number TEXT,
-                    user TEXT,
-                    session_id TEXT,
-                    hook_event_type TEXT,
-                    timestamp INTEGER,
-                    chat TEXT,
-                    summary TEXT,
-                    payload JSON
-                )
-            ''')
-
-            # Prepare the record using the common helper
-            record = _prepare_event_record(event_data)
-            
-            # Convert payload to JSON string for SQLite storage
-            record['payload'] = json.dumps(record['payload'])
-            
-            # Handle chat field with compression for large data
-            if record['chat'] is not None:
-                compressed_chat, was_compressed = _compress_large_json(record['chat'])
-                record['chat'] = compressed_chat
-                if was_compressed:
-                    print(f"Compressed large chat data to save space", file=sys.stderr)
-
-            # Use UPSERT (INSERT OR REPLACE) to handle duplicate entries
-            # We'll consider a record duplicate if it has the same session_id, hook_event_type, and timestamp
-            cursor.execute('''
-                INSERT OR REPLACE INTO features 
-                (type, source_app, feature_name, feature_number, user, session_id, hook_event_type, 
-                timestamp, chat, summary, payload) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                record['type'],
-                record['source_app'],
-                record['feature_name'],
-                record['feature_number'],
-                record['user'],
-                record['session_id'],
-                record['hook_event_type'],
-                record['timestamp'],
-                record['chat'],
-                record['summary'],
-                record['payload']
-            ))
-            
+            conn = get_connection(path_to_db)
+
+            # A record is a duplicate if it has the same event_key (see event_key());
+            # INSERT OR IGNORE leaves the stored row untouched
+            insert_events(conn, [event_data])
             conn.commit()
-            conn.close()
             return True
             
         except sqlite3.OperationalError as e:
             if conn:
                 try:
                     conn.rollback()
-                    conn.close()
-                except:
-                    pass
+                except sqlite3.Error:
+                    close_connection(path_to_db)
             
             # Handle database busy/locked errors with retry
             if "database is locked" in str(e).lower() or "database is busy" in str(e).lower():
@@ -253,52 +223,152 @@ def send_event_to_sqllite_database(event_data, path_to_db, max_retries=5):
                     print(f"Database busy after {max_retries} attempts: {e}", file=sys.stderr)
                     return False
             else:
+                close_connection(path_to_db)
                 print(f"SQLite operational error: {e}", file=sys.stderr)
                 return False
-                
-        except json.JSONEncodeError as e:
+
+        except (TypeError, ValueError) as e:
             if conn:
-                try:
-                    conn.rollback()
-                    conn.close()
-                except:
-                    pass
+                conn.rollback()
             print(f"JSON serialization error: {e}", file=sys.stderr)
             print(f"Failed to serialize chat or payload data", file=sys.stderr)
             return False
         except Exception as e:
-            if conn:
-                try:
-                    conn.rollback()
-                    conn.close()
-                except:
-                    pass
+            close_connection(path_to_db)
             print(f"Unexpected database error: {e}", file=sys.stderr)
             return False
     
     return False
 
 
+# Supabase clients of this process, keyed by (url, key)
+_supabase_clients = {}
+
+# Rows waiting for a bulk insert, keyed by (url, key, table)
+_supabase_buffers = {}
+_supabase_lock = threading.Lock()
+_supabase_timer = None
+
+
+def get_supabase_client(supabase_url, supabase_key):
+    """Return this process's Supabase client for a project, creating it on first use."""
+    key = (supabase_url, supabase_key)
+    client = _supabase_clients.get(key)
+    if client is None:
+        # Imported on first use: the SDK pulls in httpx, pydantic and more,
+        # which a hook that only writes SQLite and JSONL never needs
+        from supabase import create_client
+        client = _supabase_clients[key] = create_client(supabase_url, supabase_key)
+    return client
+
+
+def insert_events_to_supabase(client, records, table_name='features'):
+    """
+    Insert prepared event records with one bulk insert per SUPABASE_BATCH_SIZE rows.
+
+    Returns:
+        int: Number of rows inserted before the first failure
+    """
+    batch_size = setting("SUPABASE_BATCH_SIZE", 100)
+    inserted = 0
+    for i in range(0, len(records), batch_size):
+        chunk = records[i:i + batch_size]
+        try:
+            # Errors raise; skip echoing the rows back
+            client.table(table_name).insert(chunk, returning="minimal").execute()
+        except Exception as e:
+            print(f"Failed to insert {len(chunk)} records into Supabase: {e}", file=sys.stderr)
+            break
+        inserted += len(chunk)
+    return inserted
+
+
+def _supabase_breaker(supabase_url):
+    """Breaker that spares hooks a flush attempt while a Supabase project is unreachable."""
+    name = hashlib.sha256(supabase_url.encode("utf-8")).hexdigest()[:16]
+    return CircuitBreaker(f"supabase-{name}", failure_threshold=1,
+                          cooldown_s=setting("SUPABASE_RETRY_AFTER_S", 30.0))
+
+
+def _rebuffer(buffer_key, rows):
+    """Put rows back in front of a buffer, keeping at most SUPABASE_MAX_BUFFER (the newest)."""
+    with _supabase_lock:
+        pending = rows + _supabase_buffers.get(buffer_key, [])
+        _supabase_buffers[buffer_key] = pending[-setting("SUPABASE_MAX_BUFFER", 5000):]
+
+
+def flush_supabase_buffer(force=False):
+    """
+    Bulk insert every buffered Supabase row.
+
+    Rows that fail stay buffered for the next flush, up to
+    SUPABASE_MAX_BUFFER rows per table (the oldest are dropped beyond that).
+    After a failed flush, the project is skipped for SUPABASE_RETRY_AFTER_S
+    (a circuit breaker shared by all hook processes, see
+    utils/circuit_breaker.py) and its rows stay buffered.
+
+    Args:
+        force: Try projects in their backoff window too
+
+    Returns:
+        int: Number of rows inserted
+    """
+    global _supabase_timer
+    with _supabase_lock:
+        buffers = {key: rows for key, rows in _supabase_buffers.items() if rows}
+        _supabase_buffers.clear()
+        _supabase_timer = None
+
+    inserted = 0
+    for (supabase_url, supabase_key, table_name), rows in buffers.items():
+        breaker = _supabase_breaker(supabase_url)
+        if not force and not breaker.allow():
+            _rebuffer((supabase_url, supabase_key, table_name), rows)
+            continue
+        try:
+            client = get_supabase_client(supabase_url, supabase_key)
+        except Exception as e:
+            print(f"Failed to create Supabase client: {e}", file=sys.stderr)
+            client = None
+        done = insert_events_to_supabase(client, rows, table_name) if client else 0
+        breaker.record(done == len(rows))
+        inserted += done
+        if done < len(rows):
+            _rebuffer((supabase_url, supabase_key, table_name), rows[done:])
+    return inserted
+
+
 def send_event_to_supabase_database(event_data, supabase_url, supabase_key, table_name='features'):
-    """Send event data to the Supabase database."""
-    try:
-        # Create Supabase client
-        supabase: Client = create_client(supabase_url, supabase_key)
-        
-        # Prepare the record using the common helper
-        record = _prepare_event_record(event_data)
-        
-        # Insert the record into the database
-        result = supabase.table(table_name).insert(record).execute()
-        
-        # Check if the insert was successful
-        if result.data:
-            return True
-        else:
-            print(f"Failed to insert record: {result}", file=sys.stderr)
-            return False
-            
-    except Exception as e:
-        print(f"Unexpected error: {e}", file=sys.stderr)
-        return False
-    
\ No newline at end of file
+    """
+    Queue event data for the Supabase database.
+
+    Rows are buffered per process and sent with bulk inserts through a cached
+    client: as soon as SUPABASE_BATCH_SIZE rows are waiting, otherwise
+    SUPABASE_FLUSH_INTERVAL_S seconds after the first one, and at the latest
+    when the process exits (so a one-shot hook still sends its event).
+
+    Returns:
+        bool: True if the event was inserted or buffered for a flush; False
+        if the flush it triggered failed, or the project is in its backoff
+        window after a failed flush (the row stays buffered either way)
+    """
+    global _supabase_timer
+    record = _prepare_event_record(event_data)
+    buffer_key = (supabase_url, supabase_key, table_name)
+    with _supabase_lock:
+        rows = _supabase_buffers.setdefault(buffer_key, [])
+        rows.append(record)
+        full = len(rows) >= setting("SUPABASE_BATCH_SIZE", 100)
+        if not full and _supabase_timer is None:
+            _supabase_timer = threading.Timer(setting("SUPABASE_FLUSH_INTERVAL_S", 1.0),
+                                              flush_supabase_buffer)
+            _supabase_timer.daemon = True
+            _supabase_timer.start()
+    if full:
+        flush_supabase_buffer()
+        with _supabase_lock:
+            return not any(row is record for row in _supabase_buffers.get(buffer_key, []))
+    return not _supabase_breaker(supabase_url).is_open()
+
+
+atexit.register(flush_supabase_buffer)
@@ -0,0 +1,133 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Shared append-only writer for the per-session hook logs.
+
+Every hook appends its input to `logs/<session_id>/<hook>.jsonl` as a single
+line, holding an exclusive flock for the duration of the write so concurrent
+subagents never interleave or lose events. Once the active file grows past
+SESSION_LOG_MAX_BYTES it is renamed to `<hook>.<n>.jsonl` and a new file is
+started.
+
+The old `<hook>.json` array can be rebuilt from all segments on demand:
+
+USAGE:
+    python -m utils.session_log compact <session_id> [hook_name ...]
+"""
+
+import fcntl
+import json
+import os
+import re
+import sys
+
+from .constants import SESSION_LOG_MAX_BYTES, ensure_session_log_dir, get_session_log_dir
+from .jsonl_store import iter_jsonl, write_all, write_json_array
+
+
+def _open_locked(path):
+    """Open path for appending and lock it, retrying if it was rotated meanwhile."""
+    while True:
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        try:
+            if os.stat(path).st_ino == os.fstat(fd).st_ino:
+                return fd
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+
+def _segment_paths(log_dir, hook_name):
+    """Return the rotated segments of a hook log, oldest first."""
+    pattern = re.compile(rf"^{re.escape(hook_name)}\.(\d+)\.jsonl$")
+    segments = [
+        (int(m.group(1)), log_dir / name)
+        for name in os.listdir(log_dir)
+        if (m := pattern.match(name))
+    ]
+    return [path for _, path in sorted(segments)]
+
+
+def _rotate(path, log_dir, hook_name):
+    """Move the active log aside as the next numbered segment."""
+    segments = _segment_paths(log_dir, hook_name)
+    next_number = int(segments[-1].name.split(".")[-2]) + 1 if segments else 1
+    os.rename(path, log_dir / f"{hook_name}.{next_number}.jsonl")
+
+
+def append_session_event(session_id, hook_name, input_data, max_bytes=SESSION_LOG_MAX_BYTES):
+    """
+    Append a hook's input to the session log.
+
+    Args:
+        session_id: The Claude session ID
+        hook_name: Log name, e.g. 'pre_tool_use'
+        input_data: The JSON payload the hook received
+        max_bytes: Rotate the active file once it would grow past this size
+    """
+    log_dir = ensure_session_log_dir(session_id)
+    path = log_dir / f"{hook_name}.jsonl"
+    line = (json.dumps(input_data, separators=(",", ":")) + "\n").encode("utf-8")
+
+    fd = _open_locked(path)
+    try:
+        size = os.fstat(fd).st_size
+        if max_bytes and size > 0 and size + len(line) > max_bytes:
+            # Rotate while holding the lock; waiting writers notice the
+            # inode change in _open_locked and reopen the new file
+            _rotate(path, log_dir, hook_name)
+            os.close(fd)
+            fd = _open_locked(path)
+        write_all(fd, line)
+    finally:
+        os.close(fd)
+
+
+def read_session_events(session_id, hook_name):
+    """Yield every logged event of a hook in order, across rotated segments."""
+    log_dir = get_session_log_dir(session_id)
+    if not log_dir.exists():
+        return
+    for segment in _segment_paths(log_dir, hook_name):
+        yield from iter_jsonl(segment)
+    yield from iter_jsonl(log_dir / f"{hook_name}.jsonl")
+
+
+def compact_session_log(session_id, hook_name):
+    """
+    Write all events of a hook into the legacy `<hook>.json` array.
+
+    Args:
+        session_id: The Claude session ID
+        hook_name: Log name, e.g. 'pre_tool_use'
+
+    Returns:
+        Path: The written file
+    """
+    log_dir = get_session_log_dir(session_id)
+    return write_json_array(read_session_events(session_id, hook_name), log_dir / f"{hook_name}.json")
+
+
+def main():
+    """Command line interface for compacting session logs."""
+    if len(sys.argv) < 3 or sys.argv[1] != "compact":
+        print(__doc__.split("USAGE:")[1].rstrip())
+        sys.exit(1)
+
+    session_id = sys.argv[2]
+    hook_names = sys.argv[3:]
+    if not hook_names:
+        log_dir = get_session_log_dir(session_id)
+        hook_names = sorted({
+            name.split(".")[0] for name in os.listdir(log_dir) if name.endswith(".jsonl")
+        })
+    for hook_name in hook_names:
+        print(compact_session_log(session_id, hook_name))
+
+
+if __name__ == "__main__":
+    main()
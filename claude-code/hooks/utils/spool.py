@@ -0,0 +1,383 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Write-ahead spool for the dashboard database.
+
+Hooks no longer commit their own SQLite transaction. Each event is written to
+`planning/dashboard/spool/` as its own fsync'ed file (write to a temp name,
+then rename), and a single writer, serialized by an flock on the spool
+directory, drains the files into SQLite in batched transactions with one
+executemany and one commit per batch. A spool file is only deleted after the
+transaction holding its event has committed, so a crash at any point loses
+nothing; at worst an event is replayed and collapses onto its existing row.
+An event whose insert keeps failing is moved to `spool/failed/` after
+SQLITE_SPOOL_MAX_ATTEMPTS drains, so it cannot block the queue.
+
+Hooks drain opportunistically after spooling: whoever gets the writer lock
+commits everything queued so far, so concurrent agents share one commit.
+A dedicated writer can be run instead:
+
+USAGE:
+    python -m utils.spool --db planning/dashboard/log.sqlite --watch [--batch-size N] [--max-wait-ms T]
+    python -m utils.spool --db planning/dashboard/log.sqlite --drain
+    python -m utils.spool --db planning/dashboard/log.sqlite --stats
+"""
+
+import argparse
+import fcntl
+import itertools
+import json
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from .db import get_connection, close_connection
+from .jsonl_store import append_jsonl, iter_jsonl
+from .logger import insert_events
+
+# Events per transaction
+DEFAULT_BATCH_SIZE = int(os.environ.get("SQLITE_SPOOL_BATCH_SIZE", "500"))
+
+# In --watch mode, commit at the latest this long after the oldest queued event
+DEFAULT_MAX_WAIT_MS = int(os.environ.get("SQLITE_SPOOL_MAX_WAIT_MS", "200"))
+
+# Drains an event may fail in before it is moved to failed/
+MAX_ATTEMPTS = int(os.environ.get("SQLITE_SPOOL_MAX_ATTEMPTS", "3"))
+
+# In --watch mode, a failing drain is retried after a delay doubled up to this
+MAX_RETRY_DELAY_S = 5.0
+
+# metrics.jsonl is rotated to metrics.1.jsonl (replacing it) past this size
+METRICS_MAX_BYTES = int(os.environ.get("SQLITE_SPOOL_METRICS_MAX_BYTES", str(1024 * 1024)))
+
+_sequence = itertools.count()
+
+
+def spool_dir_for(path_to_db):
+    """Return the spool directory that belongs to a database file."""
+    return Path(path_to_db).parent / "spool"
+
+
+def spool_event(event_data, spool_dir):
+    """
+    Durably queue one event for the writer.
+
+    Args:
+        event_data: The event dictionary
+        spool_dir: Spool directory (created if missing)
+
+    Returns:
+        Path: The spool file
+    """
+    spool_dir = Path(spool_dir)
+    spool_dir.mkdir(parents=True, exist_ok=True)
+
+    # Names sort in arrival order, and are unique across processes
+    name = f"{time.time_ns():020d}-{os.getpid()}-{next(_sequence)}"
+    tmp = spool_dir / f".{name}.tmp"
+    final = spool_dir / f"{name}.json"
+
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644)
+    try:
+        os.write(fd, json.dumps(event_data).encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    os.rename(tmp, final)
+
+    # The rename is only durable once the directory entry is on disk
+    dir_fd = os.open(spool_dir, os.O_RDONLY)
+    try:
+        os.fsync(dir_fd)
+    finally:
+        os.close(dir_fd)
+    return final
+
+
+def pending_files(spool_dir):
+    """Return the queued spool files in arrival order."""
+    try:
+        return sorted(Path(spool_dir).glob("[0-9]*.json"))
+    except OSError:
+        return []
+
+
+def acquire_writer_lock(spool_dir, blocking):
+    """Take the single-writer lock; returns the lock fd or None if busy."""
+    Path(spool_dir).mkdir(parents=True, exist_ok=True)
+    fd = os.open(Path(spool_dir) / ".writer.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+
+def quarantine(path, reason="unreadable"):
+    """Move a spool file aside so it does not block the queue."""
+    failed_dir = path.parent / "failed"
+    failed_dir.mkdir(exist_ok=True)
+    os.replace(path, failed_dir / path.name)
+    print(f"Moved {reason} spool file to {failed_dir / path.name}", file=sys.stderr)
+
+
+def _unlink(paths):
+    for path in paths:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _load_attempts(spool_dir):
+    try:
+        return json.loads((Path(spool_dir) / ".attempts.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_attempts(spool_dir, attempts):
+    """Persist the failure counts of events still queued (the writer lock is held)."""
+    path = Path(spool_dir) / ".attempts.json"
+    attempts = {name: count for name, count in attempts.items() if (Path(spool_dir) / name).exists()}
+    if not attempts:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(".attempts.json.tmp")
+    tmp.write_text(json.dumps(attempts), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _commit_one_by_one(conn, files, events, max_attempts):
+    """
+    Commit the events of a batch that failed as a whole one at a time.
+
+    The events that still fail stay queued with their failure count; once an
+    event has failed max_attempts times it is moved to failed/, so one bad
+    event cannot block the queue.
+    """
+    spool_dir = files[0].parent
+    attempts = _load_attempts(spool_dir)
+    committed = 0
+    try:
+        for path, event in zip(files, events):
+            try:
+                insert_events(conn, [event])
+                conn.commit()
+            except sqlite3.OperationalError:
+                conn.rollback()
+                raise  # locked, busy, I/O: not the event's fault
+            except Exception as e:
+                conn.rollback()
+                attempts[path.name] = attempts.get(path.name, 0) + 1
+                print(f"Failed to insert spooled event {path.name}: {e}", file=sys.stderr)
+                if attempts[path.name] >= max_attempts:
+                    quarantine(path, reason=f"failing ({attempts.pop(path.name)} attempts)")
+                continue
+            _unlink([path])
+            attempts.pop(path.name, None)
+            committed += 1
+    finally:
+        _save_attempts(spool_dir, attempts)
+    return committed
+
+
+def _commit_batch(conn, files, max_attempts=MAX_ATTEMPTS):
+    """Insert the events of one batch in a single transaction, then delete their files."""
+    events = []
+    committed = []
+    for path in files:
+        try:
+            events.append(json.loads(path.read_bytes()))
+            committed.append(path)
+        except FileNotFoundError:
+            pass  # removed by hand while queued
+        except (OSError, ValueError):
+            quarantine(path)
+
+    if events:
+        try:
+            insert_events(conn, events)
+            conn.commit()
+        except sqlite3.OperationalError:
+            conn.rollback()
+            raise  # the whole batch is retried by the next drain
+        except Exception:
+            conn.rollback()
+            return _commit_one_by_one(conn, committed, events, max_attempts)
+
+    _unlink(committed)
+    return len(events)
+
+
+def _record_metrics(spool_dir, events, batches, started, oldest_ns):
+    duration = time.perf_counter() - started
+    metrics_path = Path(spool_dir) / "metrics.jsonl"
+    try:
+        if metrics_path.stat().st_size >= METRICS_MAX_BYTES:
+            os.replace(metrics_path, metrics_path.with_name("metrics.1.jsonl"))
+    except FileNotFoundError:
+        pass
+    append_jsonl(metrics_path, {
+        "timestamp": int(time.time() * 1000),
+        "events": events,
+        "batches": batches,
+        "duration_ms": round(duration * 1000, 3),
+        "events_per_sec": round(events / duration, 1) if duration > 0 else None,
+        "max_queue_age_ms": round((time.time_ns() - oldest_ns) / 1e6, 3) if oldest_ns else None,
+    }, index=False)
+
+
+def _drain_locked(path_to_db, spool_dir, batch_size, max_rounds=3):
+    files = pending_files(spool_dir)
+    if not files:
+        return 0
+
+    started = time.perf_counter()
+    oldest_ns = int(files[0].name.split("-", 1)[0])
+    conn = get_connection(path_to_db)
+    drained = 0
+    batches = 0
+    # Re-list a few times so events spooled by hooks that found the lock
+    # taken while we were committing are not left waiting for the next event
+    # Events that failed stay queued, but are only retried by the next drain
+    attempted = set()
+    for _ in range(max_rounds):
+        for i in range(0, len(files), batch_size):
+            drained += _commit_batch(conn, files[i:i + batch_size])
+            batches += 1
+        attempted.update(files)
+        files = [path for path in pending_files(spool_dir) if path not in attempted]
+        if not files:
+            break
+
+    _record_metrics(spool_dir, drained, batches, started, oldest_ns)
+    return drained
+
+
+def drain_spool(path_to_db, spool_dir=None, batch_size=DEFAULT_BATCH_SIZE, blocking=False):
+    """
+    Commit all queued events to the database.
+
+    Args:
+        path_to_db: Path of the SQLite database
+        spool_dir: Spool directory; defaults to spool_dir_for(path_to_db)
+        batch_size: Maximum events per transaction
+        blocking: Wait for the writer lock instead of leaving the work to
+            whoever currently holds it
+
+    Returns:
+        int or None: Number of events committed, or None if another writer
+        holds the lock (it will pick up our files)
+    """
+    spool_dir = spool_dir or spool_dir_for(path_to_db)
+    lock_fd = acquire_writer_lock(spool_dir, blocking)
+    if lock_fd is None:
+        return None
+    try:
+        return _drain_locked(path_to_db, spool_dir, batch_size)
+    except sqlite3.Error as e:
+        close_connection(path_to_db)
+        print(f"Failed to drain spool into {path_to_db}: {e}", file=sys.stderr)
+        return 0
+    finally:
+        os.close(lock_fd)
+
+
+def send_event_to_spool(event_data, path_to_db, drain=True):
+    """Spool an event for the database and, unless disabled, drain the spool."""
+    try:
+        spool_event(event_data, spool_dir_for(path_to_db))
+    except Exception as e:
+        print(f"Failed to spool event: {e}", file=sys.stderr)
+        return False
+    if drain:
+        try:
+            drain_spool(path_to_db)
+        except Exception as e:
+            # The event is safely queued; the next drain commits it
+            print(f"Failed to drain spool: {e}", file=sys.stderr)
+    return True
+
+
+def run_writer(path_to_db, spool_dir=None, batch_size=DEFAULT_BATCH_SIZE, max_wait_ms=DEFAULT_MAX_WAIT_MS):
+    """
+    Act as the dedicated spool writer until interrupted.
+
+    A batch is committed as soon as batch_size events are queued or the
+    oldest queued event has waited max_wait_ms, whichever comes first.
+    """
+    spool_dir = spool_dir or spool_dir_for(path_to_db)
+    lock_fd = acquire_writer_lock(spool_dir, blocking=True)
+    poll_interval = min(max_wait_ms, 50) / 1000
+    first_retry_delay = retry_delay = max(poll_interval, 0.05)
+    print(f"Spool writer draining {spool_dir} into {path_to_db}", file=sys.stderr)
+    try:
+        while True:
+            files = pending_files(spool_dir)
+            if files:
+                oldest_ns = int(files[0].name.split("-", 1)[0])
+                age_ms = (time.time_ns() - oldest_ns) / 1e6
+                if len(files) >= batch_size or age_ms >= max_wait_ms:
+                    try:
+                        _drain_locked(path_to_db, spool_dir, batch_size)
+                    except sqlite3.Error as e:
+                        close_connection(path_to_db)
+                        print(f"Drain failed, retrying in {retry_delay:.2f}s: {e}", file=sys.stderr)
+                        time.sleep(retry_delay)
+                        retry_delay = min(retry_delay * 2, MAX_RETRY_DELAY_S)
+                    else:
+                        first_retry_delay = retry_delay = max(poll_interval, 0.05)
+                    continue
+            time.sleep(poll_interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        os.close(lock_fd)
+
+
+def spool_stats(spool_dir):
+    """Summarize queue depth and the drain metrics recorded so far."""
+    metrics = [*iter_jsonl(Path(spool_dir) / "metrics.1.jsonl"), *iter_jsonl(Path(spool_dir) / "metrics.jsonl")]
+    events = sum(m["events"] for m in metrics)
+    duration_ms = sum(m["duration_ms"] for m in metrics)
+    return {
+        "pending": len(pending_files(spool_dir)),
+        "failed": len(list((Path(spool_dir) / "failed").glob("*.json"))),
+        "drains": len(metrics),
+        "events": events,
+        "batches": sum(m["batches"] for m in metrics),
+        "events_per_drain": round(events / len(metrics), 1) if metrics else 0,
+        "events_per_sec": round(events / (duration_ms / 1000), 1) if duration_ms else None,
+        "max_queue_age_ms": max((m["max_queue_age_ms"] or 0 for m in metrics), default=0),
+    }
+
+
+def main():
+    """Command line interface for the spool writer."""
+    parser = argparse.ArgumentParser(description='Drain the dashboard write-ahead spool into SQLite')
+    parser.add_argument('--db', default='./planning/dashboard/log.sqlite', help='SQLite database')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Events per transaction')
+    parser.add_argument('--max-wait-ms', type=int, default=DEFAULT_MAX_WAIT_MS, help='Maximum queueing delay')
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument('--watch', action='store_true', help='Run as the dedicated writer')
+    group.add_argument('--drain', action='store_true', help='Drain once and exit')
+    group.add_argument('--stats', action='store_true', help='Print throughput metrics')
+    args = parser.parse_args()
+
+    if args.watch:
+        run_writer(args.db, batch_size=args.batch_size, max_wait_ms=args.max_wait_ms)
+    elif args.drain:
+        print(f"Committed {drain_spool(args.db, batch_size=args.batch_size, blocking=True)} events")
+    else:
+        print(json.dumps(spool_stats(spool_dir_for(args.db)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
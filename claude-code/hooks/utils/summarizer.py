@@ -2,67 +2,399 @@
 # /// script
 # requires-python = ">=3.8"
 # dependencies = [
+#     "anthropic",
 #     "openai",
 #     "python-dotenv",
 # ]
 # ///
 
+import atexit
 import json
-from typing import Optional, Dict, Any
-from .llm.oai import prompt_llm
+import os
+import sqlite3
+import sys
+import time
+from typing import Optional, Dict, Any, List
+from .llm.provider import prompt_llm, sdk_available
+from . import summary_cache
+from .circuit_breaker import CircuitBreaker, call_with_deadline
+
+# Events packed into one request by generate_event_summaries
+SUMMARY_BATCH_SIZE = int(os.environ.get("SUMMARY_BATCH_SIZE", "20"))
+
+# Output budget per summary in a batch (a summary is under 15 words)
+BATCH_TOKENS_PER_EVENT = 40
+
+SUMMARY_REQUIREMENTS = """Requirements:
+- ONE sentence only (no period at the end)
+- Focus on the key action or information in the payload
+- Be specific and technical
+- Keep under 15 words
+- Use present tense
+- No quotes or formatting
+
+Examples:
+- Reads configuration file from project root
+- Executes npm install to update dependencies
+- Searches web for React documentation
+- Edits database schema to add user table
+- Agent responds with implementation plan"""
+
+
+def summary_deadline_s() -> float:
+    """Hard limit on the wait for one LLM request, in seconds (SUMMARY_DEADLINE_S, default 4)."""
+    return float(os.environ.get("SUMMARY_DEADLINE_S", "4"))
+
+
+def _payload_excerpt(event_data: Dict[str, Any]) -> str:
+    """Return the payload as indented JSON, truncated to 1000 characters."""
+    payload_str = json.dumps(event_data.get("payload", {}), indent=2)
+    if len(payload_str) > 1000:
+        payload_str = payload_str[:1000] + "..."
+    return payload_str
+
+
+def _clean_summary(summary: Optional[str]) -> Optional[str]:
+    """Normalize a summary returned by the model."""
+    if not summary:
+        return None
+    summary = summary.strip().strip('"').strip("'").strip(".")
+    # Take only the first line if multiple
+    summary = summary.split("\n")[0].strip()
+    # Ensure it's not too long
+    if len(summary) > 100:
+        summary = summary[:97] + "..."
+    return summary or None
+
+
+def _relative(path: str, cwd: Optional[str]) -> str:
+    """Show paths inside the working directory relative to it."""
+    if cwd and path.startswith(cwd.rstrip("/") + "/"):
+        return path[len(cwd.rstrip("/")) + 1:]
+    return path
+
+
+def _shorten(text: str, limit: int = 60) -> str:
+    text = text.strip().split("\n")[0]
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+
+def _summarize_read(tool_input, cwd):
+    summary = f"Reads {_relative(tool_input['file_path'], cwd)}"
+    if tool_input.get("offset") or tool_input.get("limit"):
+        start = int(tool_input.get("offset") or 1)
+        summary += f" from line {start}"
+    return summary
+
+
+def _summarize_write(tool_input, cwd):
+    lines = str(tool_input.get("content", "")).count("\n") + 1
+    return f"Writes {lines} lines to {_relative(tool_input['file_path'], cwd)}"
+
+
+def _summarize_edit(tool_input, cwd):
+    path = _relative(tool_input["file_path"], cwd)
+    if tool_input.get("replace_all"):
+        return f"Replaces all occurrences of a snippet in {path}"
+    return f"Edits {path}"
+
+
+def _summarize_multi_edit(tool_input, cwd):
+    return f"Applies {len(tool_input['edits'])} edits to {_relative(tool_input['file_path'], cwd)}"
+
+
+def _summarize_bash(tool_input, cwd):
+    return f"Runs {_shorten(tool_input['command'])}"
+
+
+def _summarize_grep(tool_input, cwd):
+    summary = f"Searches {_relative(tool_input.get('path') or 'project', cwd)} for {_shorten(tool_input['pattern'], 40)}"
+    if tool_input.get("glob"):
+        summary += f" in {tool_input['glob']} files"
+    return summary
+
+
+def _summarize_glob(tool_input, cwd):
+    summary = f"Finds files matching {_shorten(tool_input['pattern'], 40)}"
+    if tool_input.get("path"):
+        summary += f" in {_relative(tool_input['path'], cwd)}"
+    return summary
+
+
+def _summarize_ls(tool_input, cwd):
+    return f"Lists {_relative(tool_input['path'], cwd)}"
+
+
+# Deterministic summaries of the common tools, keyed by tool_name
+LOCAL_SUMMARIZERS = {
+    "Read": _summarize_read,
+    "Write": _summarize_write,
+    "Edit": _summarize_edit,
+    "MultiEdit": _summarize_multi_edit,
+    "Bash": _summarize_bash,
+    "Grep": _summarize_grep,
+    "Glob": _summarize_glob,
+    "LS": _summarize_ls,
+}
+
+
+def summarize_locally(event_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Summarize a tool event from its tool_name and tool_input, without the LLM.
+
+    Returns:
+        str or None: The summary, or None if the event is not a known tool
+        call or its input does not have the expected shape
+    """
+    if event_data.get("hook_event_type") not in ("PreToolUse", "PostToolUse"):
+        return None
+    payload = event_data.get("payload")
+    if not isinstance(payload, dict):
+        return None
+    summarize = LOCAL_SUMMARIZERS.get(payload.get("tool_name"))
+    tool_input = payload.get("tool_input")
+    if summarize is None or not isinstance(tool_input, dict):
+        return None
+    try:
+        return _clean_summary(summarize(tool_input, payload.get("cwd")))
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None  # unusual input, let the LLM handle it
+
+
+# Counters not yet written to the summary cache, see flush_stats()
+_pending_stats: Dict[str, int] = {}
+
+
+def _record_stats(counts: Dict[str, int]):
+    """Add to the named counters in memory; flush_stats() writes them out."""
+    for name, count in counts.items():
+        _pending_stats[name] = _pending_stats.get(name, 0) + count
+
+
+def flush_stats():
+    """
+    Add the counters recorded so far to the summary cache (see utils/summary_cache.py).
+
+    Opening the cache costs a rule-based summary more than the summary
+    itself, so counters are written once per process at exit, or after each
+    event by the long-running daemon and worker.
+    """
+    if not _pending_stats:
+        return
+    counts = dict(_pending_stats)
+    _pending_stats.clear()
+    try:
+        conn = summary_cache.get_connection()
+        for name, count in counts.items():
+            summary_cache.increment(name, count, conn=conn)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Failed to record summary stats: {e}", file=sys.stderr)
+
+
+atexit.register(flush_stats)
+
+
+def local_event_summary(event_data: Dict[str, Any]) -> Optional[str]:
+    """summarize_locally(), counting the hit per tool in the summary stats."""
+    summary = summarize_locally(event_data)
+    if summary:
+        _record_stats({f"local_summary.{event_data['payload']['tool_name']}": 1})
+    return summary
+
+
+def _cache_lookup(event_data: Dict[str, Any]):
+    """Return (cache_key, cached_summary); the key is None if the cache is unavailable."""
+    try:
+        cache_key = summary_cache.fingerprint(event_data)
+        return cache_key, summary_cache.get_summary(cache_key)
+    except (sqlite3.Error, OSError) as e:
+        print(f"Summary cache unavailable: {e}", file=sys.stderr)
+        return None, None
+
+
+def _cache_store(cache_key, summary):
+    if summary and cache_key:
+        try:
+            summary_cache.put_summary(cache_key, summary)
+        except (sqlite3.Error, OSError) as e:
+            print(f"Failed to cache summary: {e}", file=sys.stderr)
+
+
+def llm_breaker() -> CircuitBreaker:
+    """Return the circuit breaker shared by all summary requests."""
+    return CircuitBreaker("llm")
+
+
+def _prompt(prompt: str, max_tokens: int = 100, deadline_s: Optional[float] = None) -> Optional[str]:
+    """
+    prompt_llm() behind the shared 'llm' circuit breaker and a deadline.
+
+    Failed, timed out and slow requests (more than half the deadline; batch
+    requests get twice SUMMARY_DEADLINE_S) count against the breaker; while it
+    is open, no request is made and None is returned, so the event is left
+    without a summary for the summary worker or --backfill to fill in later.
+    A provider SDK that is not installed does not count against the breaker.
+    """
+    if not sdk_available():
+        return None
+    breaker = llm_breaker()
+    if not breaker.allow():
+        _record_stats({"llm_skipped": 1})
+        return None
+
+    deadline_s = deadline_s or summary_deadline_s()
+    _record_stats({"llm_requests": 1})
+    start = time.monotonic()
+    finished, response = call_with_deadline(prompt_llm, deadline_s, prompt, max_tokens=max_tokens)
+    if not finished:
+        _record_stats({"llm_timeouts": 1})
+    breaker.record(response is not None and time.monotonic() - start < deadline_s / 2)
+    return response
+
+
+def _summarize_one(event_data: Dict[str, Any]) -> Optional[str]:
+    """Ask the model for the summary of a single event."""
+    event_type = event_data.get("hook_event_type", "Unknown")
+
+    prompt = f"""Generate a one-sentence summary of this Claude Code hook event payload for an engineer monitoring the system.
+
+Event Type: {event_type}
+Payload:
+{_payload_excerpt(event_data)}
+
+{SUMMARY_REQUIREMENTS}
+- Return ONLY the summary text
+
+Generate the summary based on the payload:"""
+
+    return _clean_summary(_prompt(prompt))
+
+
+def _summarize_batch(events: List[Dict[str, Any]]) -> Optional[List[Optional[str]]]:
+    """
+    Ask the model for the summaries of several events in one request.
+
+    Returns:
+        list or None: One summary per event, or None if there was no
+        response (failed or timed out request, open circuit breaker)
+
+    Raises:
+        ValueError: If the response could not be parsed into exactly one
+            summary per event
+    """
+    sections = "\n\n".join(
+        f"Event {i} ({event.get('hook_event_type', 'Unknown')}):\n{_payload_excerpt(event)}"
+        for i, event in enumerate(events, 1)
+    )
+    prompt = f"""Generate a one-sentence summary of each of these {len(events)} Claude Code hook event payloads for an engineer monitoring the system.
+
+{sections}
+
+{SUMMARY_REQUIREMENTS}
+
+Return ONLY a JSON array of exactly {len(events)} strings: the summary of event 1 first, then event 2, and so on."""
+
+    response = _prompt(prompt, max_tokens=BATCH_TOKENS_PER_EVENT * len(events) + 50,
+                       deadline_s=2 * summary_deadline_s())
+    if not response:
+        return None
+
+    # Tolerate prose or a code fence around the array
+    start, end = response.find("["), response.rfind("]")
+    if start == -1 or end <= start:
+        raise ValueError("no JSON array in the batch response")
+    summaries = json.loads(response[start:end + 1])  # JSONDecodeError is a ValueError
+    if not isinstance(summaries, list) or len(summaries) != len(events):
+        raise ValueError(f"expected {len(events)} summaries in the batch response")
+    return [_clean_summary(s) if isinstance(s, str) else None for s in summaries]
 
 
 def generate_event_summary(event_data: Dict[str, Any]) -> Optional[str]:
     """
     Generate a concise one-sentence summary of a hook event for engineers.
 
+    Common tool calls are summarized locally (summarize_locally), and
+    summaries of identical events are served from utils/summary_cache.py;
+    only the rest are sent to the LLM.
+
     Args:
         event_data: The hook event data containing event_type, payload, etc.
 
     Returns:
         str: A one-sentence summary, or None if generation fails
     """
-    event_type = event_data.get("hook_event_type", "Unknown")
-    payload = event_data.get("payload", {})
+    local = local_event_summary(event_data)
+    if local:
+        return local
 
-    # Convert payload to string representation
-    payload_str = json.dumps(payload, indent=2)
-    if len(payload_str) > 1000:
-        payload_str = payload_str[:1000] + "..."
+    cache_key, cached = _cache_lookup(event_data)
+    if cached:
+        return cached
 
-    prompt = f"""Generate a one-sentence summary of this Claude Code hook event payload for an engineer monitoring the system.
+    summary = _summarize_one(event_data)
+    _cache_store(cache_key, summary)
+    return summary
 
-Event Type: {event_type}
-Payload:
-{payload_str}
 
-Requirements:
-- ONE sentence only (no period at the end)
-- Focus on the key action or information in the payload
-- Be specific and technical
-- Keep under 15 words
-- Use present tense
-- No quotes or formatting
-- Return ONLY the summary text
+def generate_event_summaries(events: List[Dict[str, Any]], batch_size: int = SUMMARY_BATCH_SIZE) -> List[Optional[str]]:
+    """
+    Summarize many events with as few LLM requests as possible.
 
-Examples:
-- Reads configuration file from project root
-- Executes npm install to update dependencies
-- Searches web for React documentation
-- Edits database schema to add user table
-- Agent responds with implementation plan
+    Common tool calls are summarized locally, cached events are answered
+    from the cache, identical events are summarized once, and the rest are
+    packed batch_size at a time into a single prompt that asks for a JSON
+    array of summaries. If a batch response cannot be parsed, its events are
+    summarized one by one; if the request fails, times out or the circuit
+    breaker is open, the batch is left without summaries for a later retry.
 
-Generate the summary based on the payload:"""
+    Args:
+        events: Hook events, as for generate_event_summary
+        batch_size: Maximum events per request
 
-    summary = prompt_llm(prompt)
+    Returns:
+        list: One summary (or None) per event, in the same order
+    """
+    results: List[Optional[str]] = [None] * len(events)
 
-    # Clean up the response
-    if summary:
-        summary = summary.strip().strip('"').strip("'").strip(".")
-        # Take only the first line if multiple
-        summary = summary.split("\n")[0].strip()
-        # Ensure it's not too long
-        if len(summary) > 100:
-            summary = summary[:97] + "..."
-
-    return summary
\ No newline at end of file
+    # Unique cache misses, with the positions of the events that share them
+    pending: Dict[Any, List[int]] = {}
+    keys: Dict[Any, Any] = {}
+    local_counts: Dict[str, int] = {}
+    for i, event in enumerate(events):
+        local = summarize_locally(event)
+        if local:
+            results[i] = local
+            name = f"local_summary.{event['payload']['tool_name']}"
+            local_counts[name] = local_counts.get(name, 0) + 1
+            continue
+        cache_key, cached = _cache_lookup(event)
+        if cached:
+            results[i] = cached
+            continue
+        group = cache_key if cache_key is not None else ("uncached", i)
+        pending.setdefault(group, []).append(i)
+        keys[group] = cache_key
+    _record_stats(local_counts)
+
+    groups = list(pending)
+    for start in range(0, len(groups), batch_size):
+        chunk = groups[start:start + batch_size]
+        chunk_events = [events[pending[group][0]] for group in chunk]
+
+        if len(chunk_events) == 1:
+            summaries = [_summarize_one(chunk_events[0])]
+        else:
+            try:
+                summaries = _summarize_batch(chunk_events)
+            except ValueError as e:
+                print(f"Unparseable batch summary response, summarizing one by one: {e}", file=sys.stderr)
+                summaries = [_summarize_one(event) for event in chunk_events]
+            if summaries is None:
+                summaries = [None] * len(chunk_events)
+
+        for group, summary in zip(chunk, summaries):
+            _cache_store(keys[group], summary)
+            for i in pending[group]:
+                results[i] = summary
+
+    return results
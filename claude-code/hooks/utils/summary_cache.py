@@ -0,0 +1,215 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Persistent cache of event summaries.
+
+Many hook events are near-identical (the same Read of the same file, the
+same `npm test`), and their summaries are too. Summaries are cached in a
+small SQLite database in the hooks cache directory, keyed by a fingerprint
+of the event: its type, the tool name and the canonical tool_input, with
+volatile fields such as session_id, transcript_path and timestamps left out.
+
+Entries expire SUMMARY_CACHE_TTL_DAYS after they were last used, and the
+least recently used entries are evicted beyond SUMMARY_CACHE_MAX_ENTRIES.
+The same database holds a generic `stats` table of named counters (hits,
+misses, ...), shared with the other summarization stages.
+
+USAGE:
+    python -m utils.summary_cache stats
+    python -m utils.summary_cache prune
+    python -m utils.summary_cache clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import time
+
+from .constants import HOOKS_CACHE_DIR
+
+CACHE_PATH = HOOKS_CACHE_DIR / "summaries.sqlite"
+
+# Payload fields that differ between otherwise identical events
+VOLATILE_KEYS = frozenset({
+    "session_id", "transcript_path", "cwd", "timestamp", "hook_event_name",
+    "tool_response", "tool_use_id", "stop_hook_active",
+})
+
+SCHEMA = (
+    '''CREATE TABLE IF NOT EXISTS summaries (
+        fingerprint TEXT PRIMARY KEY,
+        summary TEXT NOT NULL,
+        created_at INTEGER NOT NULL,
+        last_used INTEGER NOT NULL,
+        hits INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+    "CREATE INDEX IF NOT EXISTS idx_summaries_last_used ON summaries (last_used)",
+    '''CREATE TABLE IF NOT EXISTS stats (
+        name TEXT PRIMARY KEY,
+        value INTEGER NOT NULL DEFAULT 0
+    ) WITHOUT ROWID''',
+)
+
+# Open connections of this process, keyed by database path
+_connections = {}
+
+
+def _ttl_ms():
+    return int(float(os.environ.get("SUMMARY_CACHE_TTL_DAYS", "30")) * 86400 * 1000)
+
+
+def _max_entries():
+    return int(os.environ.get("SUMMARY_CACHE_MAX_ENTRIES", "10000"))
+
+
+def get_connection(path=None):
+    """Return this process's connection to the cache database, creating it if needed."""
+    key = str(path or CACHE_PATH)
+    conn = _connections.get(key)
+    if conn is None:
+        os.makedirs(os.path.dirname(key), exist_ok=True)
+        conn = sqlite3.connect(key, timeout=5.0)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+        _connections[key] = conn
+    return conn
+
+
+def close_connection(path=None):
+    """Close and forget the cached connection, if any."""
+    conn = _connections.pop(str(path or CACHE_PATH), None)
+    if conn is not None:
+        conn.close()
+
+
+def _strip_volatile(value):
+    if isinstance(value, dict):
+        return {k: _strip_volatile(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_strip_volatile(v) for v in value]
+    return value
+
+
+def fingerprint(event_data):
+    """
+    Return the cache key of an event.
+
+    Tool events are keyed by tool name and tool_input only; other events by
+    their payload without the volatile fields.
+    """
+    payload = event_data.get("payload") or {}
+    if isinstance(payload, dict) and "tool_name" in payload:
+        content = {"tool_name": payload["tool_name"], "tool_input": payload.get("tool_input")}
+    else:
+        content = _strip_volatile(payload)
+    canonical = json.dumps(
+        [event_data.get("hook_event_type", ""), content],
+        sort_keys=True, separators=(",", ":"), default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def increment(name, amount=1, conn=None):
+    """Add amount to the named counter."""
+    conn = conn or get_connection()
+    conn.execute(
+        "INSERT INTO stats (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, amount),
+    )
+    conn.commit()
+
+
+def get_summary(key, conn=None):
+    """
+    Look up a cached summary and record the hit or miss.
+
+    Returns:
+        str or None: The summary, or None if missing or expired
+    """
+    conn = conn or get_connection()
+    now = int(time.time() * 1000)
+    row = conn.execute(
+        "SELECT summary FROM summaries WHERE fingerprint = ? AND last_used >= ?",
+        (key, now - _ttl_ms()),
+    ).fetchone()
+    if row is None:
+        increment("summary_cache.miss", conn=conn)
+        return None
+    conn.execute("UPDATE summaries SET last_used = ?, hits = hits + 1 WHERE fingerprint = ?", (now, key))
+    increment("summary_cache.hit", conn=conn)
+    return row[0]
+
+
+def put_summary(key, summary, conn=None):
+    """Store a summary and evict expired and least recently used entries."""
+    conn = conn or get_connection()
+    now = int(time.time() * 1000)
+    conn.execute(
+        "INSERT OR REPLACE INTO summaries (fingerprint, summary, created_at, last_used, hits) "
+        "VALUES (?, ?, ?, ?, 0)",
+        (key, summary, now, now),
+    )
+    prune(conn, now)
+    conn.commit()
+
+
+def prune(conn=None, now=None):
+    """Delete expired entries and the least recently used ones over the size limit; the caller commits."""
+    conn = conn or get_connection()
+    now = now or int(time.time() * 1000)
+    removed = conn.execute("DELETE FROM summaries WHERE last_used < ?", (now - _ttl_ms(),)).rowcount
+    excess = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0] - _max_entries()
+    if excess > 0:
+        removed += conn.execute(
+            "DELETE FROM summaries WHERE fingerprint IN "
+            "(SELECT fingerprint FROM summaries ORDER BY last_used LIMIT ?)",
+            (excess,),
+        ).rowcount
+    return removed
+
+
+def stats(conn=None):
+    """Return all counters plus the cache size and hit rate."""
+    conn = conn or get_connection()
+    counters = dict(conn.execute("SELECT name, value FROM stats ORDER BY name"))
+    hits = counters.get("summary_cache.hit", 0)
+    lookups = hits + counters.get("summary_cache.miss", 0)
+    return {
+        "entries": conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0],
+        "hit_rate": round(hits / lookups, 3) if lookups else None,
+        "counters": counters,
+    }
+
+
+def main():
+    """Command line interface for inspecting and maintaining the cache."""
+    parser = argparse.ArgumentParser(description='Summary cache maintenance')
+    parser.add_argument('command', choices=['stats', 'prune', 'clear'])
+    args = parser.parse_args()
+
+    conn = get_connection()
+    if args.command == 'stats':
+        print(json.dumps(stats(conn), indent=2))
+    elif args.command == 'prune':
+        removed = prune(conn)
+        conn.commit()
+        print(f"Removed {removed} entries")
+    else:
+        conn.execute("DELETE FROM summaries")
+        conn.execute("DELETE FROM stats")
+        conn.commit()
+        print(f"Cleared {CACHE_PATH}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
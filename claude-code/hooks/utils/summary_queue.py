@@ -0,0 +1,106 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Queue of events waiting for an LLM summary.
+
+With SUMMARY_MODE=async (the default), `log_feature.py --summarize` writes
+the event with `summary = NULL`, queues a summary job next to the write-ahead
+spool (`planning/dashboard/summary_queue/`, same durable one-file-per-job
+format, see utils/spool.py) and makes sure a summary_worker.py process is
+running. The worker calls the LLM and fills the summary in with an UPDATE
+keyed by the event's event_key (see logger.event_key()), so the hook never
+waits on the network. SUMMARY_MODE=sync keeps the old in-hook call.
+"""
+
+import fcntl
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from .logger import event_key
+from .spool import pending_files, spool_event
+
+UPDATE_SUMMARY_SQL = '''
+    UPDATE features SET summary = ?
+    WHERE event_key = ? AND summary IS NULL
+'''
+
+
+def summary_queue_dir_for(path_to_db):
+    """Return the summary queue directory that belongs to a database file."""
+    return Path(path_to_db).parent / "summary_queue"
+
+
+def enqueue_summary(event_data, path_to_db):
+    """
+    Queue an event whose summary should be generated in the background.
+
+    Args:
+        event_data: The event, as written to the database
+        path_to_db: Path of the SQLite database holding the event
+
+    Returns:
+        bool: True if the job was queued
+    """
+    job = {
+        'event_key': event_key(event_data),
+        'session_id': event_data.get('session_id', ''),
+        'hook_event_type': event_data.get('hook_event_type', ''),
+        'timestamp': event_data.get('timestamp', 0),
+        'payload': event_data.get('payload', {}),
+    }
+    try:
+        spool_event(job, summary_queue_dir_for(path_to_db))
+        return True
+    except Exception as e:
+        print(f"Failed to queue summary: {e}", file=sys.stderr)
+        return False
+
+
+def pending_jobs(path_to_db):
+    """Return the queued summary job files in arrival order."""
+    return pending_files(summary_queue_dir_for(path_to_db))
+
+
+def acquire_worker_lock(queue_dir):
+    """Take the single-worker lock without waiting; returns the lock fd or None if a worker runs."""
+    Path(queue_dir).mkdir(parents=True, exist_ok=True)
+    fd = os.open(Path(queue_dir) / ".worker.lock", os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+
+def worker_running(queue_dir):
+    """Check whether a summary worker holds the queue's lock."""
+    fd = acquire_worker_lock(queue_dir)
+    if fd is None:
+        return True
+    os.close(fd)
+    return False
+
+
+def start_summary_worker(path_to_db):
+    """Spawn summary_worker.py in the background unless one is already draining the queue."""
+    if worker_running(summary_queue_dir_for(path_to_db)):
+        return
+    worker_script = Path(__file__).resolve().parent.parent / "summary_worker.py"
+    if not worker_script.exists():
+        return
+    try:
+        subprocess.Popen(
+            ["uv", "run", str(worker_script), "--db", os.path.abspath(path_to_db)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        print(f"Failed to start summary worker: {e}", file=sys.stderr)
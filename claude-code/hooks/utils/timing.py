@@ -0,0 +1,178 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Per-stage timings of the hook pipeline.
+
+log_feature.py (and dispatch.py in front of it) time each step of an event
+with a StageTimer: stdin parsing, the event's own hook, git/feature context
+resolution, chat transcript reading, summarization, the SQLite write, the
+feature log file and the server sink. One line per event is appended to
+planning/dashboard/hook_timings.jsonl, next to the dashboard database,
+with the event's session_id, hook_event_type, timestamp and the event_key
+that identifies its row in the features table (see logger.event_key()).
+HOOK_TIMINGS=false turns the sidecar off.
+
+With HOOK_PROFILE_MS set, the whole event runs under cProfile and the
+profile of every event slower than that many milliseconds is dumped to
+HOOKS_CACHE_DIR/profiles/ (open it with `python -m pstats FILE`).
+
+USAGE:
+    python -m utils.timing report [--session ID] [--top 10] [--path FILE]
+"""
+
+import argparse
+import os
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .constants import HOOKS_CACHE_DIR
+from .jsonl_store import append_jsonl, iter_jsonl
+
+TIMINGS_PATH = "./planning/dashboard/hook_timings.jsonl"
+PROFILE_DIR = HOOKS_CACHE_DIR / "profiles"
+
+
+def timings_enabled():
+    return os.environ.get("HOOK_TIMINGS", "true").lower() != "false"
+
+
+def profile_threshold_ms():
+    """Events slower than this many ms get their profile dumped; None disables profiling."""
+    value = os.environ.get("HOOK_PROFILE_MS", "").strip()
+    return float(value) if value else None
+
+
+class StageTimer:
+    """
+    Wall-clock timer for the stages of one hook event.
+
+    Usage:
+        timer = StageTimer()
+        with timer.stage("sqlite"):
+            ...
+        timer.finish(event_data)
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.stages = {}
+        self.profiler = None
+        if profile_threshold_ms() is not None:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            try:
+                self.profiler.enable()
+            except ValueError:
+                self.profiler = None  # another profiler is already active
+
+    @contextmanager
+    def stage(self, name):
+        """Time the block as stage `name`; repeated stages add up."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+    def cancel(self):
+        """Stop profiling an event that is not recorded; no-op after finish()."""
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.profiler = None
+
+    def total_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def finish(self, event_data, path=TIMINGS_PATH, profile_dir=PROFILE_DIR):
+        """
+        Record the timings of an event and dump its profile if it was slow.
+
+        Args:
+            event_data: The event as stored; supplies the key of the record
+            path: Sidecar JSONL file of the timings
+            profile_dir: Where profiles of slow events are written
+
+        Returns:
+            dict: The timings record
+        """
+        # Imported here: the timer starts before the pipeline's modules are loaded
+        from .logger import event_key
+
+        total = self.total_ms()
+        record = {
+            'event_key': event_key(event_data),
+            'session_id': event_data.get('session_id'),
+            'hook_event_type': event_data.get('hook_event_type'),
+            'timestamp': event_data.get('timestamp'),
+            'total_ms': round(total, 3),
+            'stages': {name: round(ms, 3) for name, ms in self.stages.items()},
+        }
+
+        profiler = self.profiler
+        self.cancel()
+        if profiler is not None:
+            threshold = profile_threshold_ms()
+            if threshold is not None and total > threshold:
+                profile_dir = Path(profile_dir)
+                profile_dir.mkdir(parents=True, exist_ok=True)
+                profile_path = profile_dir / f"{record['timestamp']}-{record['hook_event_type']}-{record['event_key']}.prof"
+                profiler.dump_stats(str(profile_path))
+                record['profile'] = str(profile_path)
+
+        if timings_enabled():
+            try:
+                append_jsonl(path, record, index=False)
+            except OSError as e:
+                print(f"Failed to record hook timings: {e}", file=sys.stderr)
+        return record
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(pct / 100 * (len(values) - 1))))]
+
+
+def report(path=TIMINGS_PATH, session_id=None, top=10):
+    """Print per-stage statistics and the slowest events of the timings file."""
+    records = [r for r in iter_jsonl(path) if session_id is None or r.get('session_id') == session_id]
+    if not records:
+        print(f"No timings in {path}" + (f" for session {session_id}" if session_id else ""))
+        return
+
+    by_stage = {}
+    for record in records:
+        for name, ms in record['stages'].items():
+            by_stage.setdefault(name, []).append(ms)
+    overall = sum(r['total_ms'] for r in records)
+
+    print(f"{len(records)} events, {overall / 1000:.2f}s in total\n")
+    print(f"  {'stage':<12} {'events':>7} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'share':>7}")
+    for name, values in sorted(by_stage.items(), key=lambda item: -sum(item[1])):
+        print(f"  {name:<12} {len(values):>7} {percentile(values, 50):>9.2f} {percentile(values, 95):>9.2f} "
+              f"{max(values):>9.2f} {sum(values) / overall:>7.1%}")
+
+    print("\nSlowest events:")
+    for record in sorted(records, key=lambda r: -r['total_ms'])[:top]:
+        slowest = max(record['stages'].items(), key=lambda item: item[1], default=('-', 0.0))
+        print(f"  {record['total_ms']:>9.2f} ms  {record['hook_event_type']:<17} {record['session_id']}  "
+              f"slowest stage {slowest[0]} ({slowest[1]:.2f} ms)"
+              + (f"  profile {record['profile']}" if record.get('profile') else ""))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report the recorded per-stage hook timings')
+    parser.add_argument('command', choices=['report'])
+    parser.add_argument('--path', default=TIMINGS_PATH, help='Timings file (default: %(default)s)')
+    parser.add_argument('--session', help='Only this session')
+    parser.add_argument('--top', type=int, default=10, help='Slowest events to list')
+    args = parser.parse_args()
+    report(args.path, args.session, args.top)
+
+
+if __name__ == "__main__":
+    main()
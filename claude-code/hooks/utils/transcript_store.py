@@ -0,0 +1,263 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Normalized chat transcript storage for the dashboard database.
+
+Instead of copying the whole transcript into `features.chat` on every Stop
+event, each message is stored once in `transcript_messages`, keyed by its
+uuid (or a SHA-256 of its JSON when it has none). `transcript_index` gives
+the messages their position in a session, and every event records in
+`features.chat_start`/`chat_end` only the range of positions it added.
+
+The full chat as of any event is the session's messages before `chat_end`.
+If the transcript is rewritten, the session's positions are re-stored from
+the first point where it differs, so older events then show the new messages.
+
+USAGE:
+    python -m utils.transcript_store --db planning/dashboard/log.sqlite migrate
+    python -m utils.transcript_store --db planning/dashboard/log.sqlite show <event_id> [--delta]
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+
+from . import codec
+
+
+def message_key(message):
+    """Return the content address of a transcript message."""
+    if isinstance(message, dict) and message.get("uuid"):
+        return str(message["uuid"])
+    canonical = json.dumps(message, sort_keys=True, separators=(",", ":"))
+    return "sha256:" + hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def read_transcript(transcript_path):
+    """Parse a whole transcript file; returns the messages, or None if it cannot be read."""
+    try:
+        with open(transcript_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    messages = []
+    for line in data[:data.rfind(b"\n") + 1].splitlines():
+        try:
+            messages.append(json.loads(line))
+        except json.JSONDecodeError:
+            pass  # Skip blank and invalid lines, as TranscriptTail does
+    return messages
+
+
+def _diverged(conn, session_id, messages, start_seq, known):
+    """Check whether the stored messages of a session differ from `messages` where they overlap."""
+    overlap_end = min(known, start_seq + len(messages))
+    if start_seq >= overlap_end:
+        return False
+    # The first and last overlapping positions: a replaced transcript differs
+    # at the first, a truncated and regrown one at the last
+    positions = sorted({start_seq, overlap_end - 1})
+    stored = dict(conn.execute(
+        f"SELECT seq, msg_key FROM transcript_index WHERE session_id = ? AND seq IN ({', '.join('?' * len(positions))})",
+        (session_id, *positions),
+    ).fetchall())
+    return any(stored.get(seq) != message_key(messages[seq - start_seq]) for seq in positions)
+
+
+def _first_difference(conn, session_id, messages, start_seq, known):
+    """Return the first position from start_seq on where the stored messages differ from `messages`."""
+    stored = conn.execute(
+        "SELECT seq, msg_key FROM transcript_index WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+        (session_id, start_seq, min(known, start_seq + len(messages))),
+    )
+    expected = start_seq
+    for seq, key in stored:
+        if seq != expected or key != message_key(messages[seq - start_seq]):
+            return expected
+        expected += 1
+    return expected
+
+
+def store_transcript(conn, session_id, messages, start_seq=0, dictionary=None, transcript_path=None):
+    """
+    Store the transcript messages of a session that are not stored yet.
+
+    The stored messages are checked against `messages` where they overlap;
+    when they differ (the transcript was rewritten, or a TranscriptTail
+    checkpoint drifted from the database), the session is re-stored from
+    the first position where they differ. A delta that starts past the stored messages is replaced by
+    the whole transcript read from transcript_path, when given.
+
+    Args:
+        conn: Open database connection (the caller commits)
+        session_id: Session the transcript belongs to
+        messages: Transcript messages, in order
+        start_seq: Position of messages[0] in the full transcript; 0 when
+            messages is the whole transcript, higher when it is a delta
+        dictionary: Codec dictionary to encode the messages with
+            (see utils/codec.py)
+        transcript_path: Transcript file to re-read the whole transcript
+            from when the delta does not fit the stored messages
+
+    Returns:
+        tuple: (chat_start, chat_end) - the range of positions this call added
+    """
+    known = conn.execute(
+        "SELECT COALESCE(MAX(seq) + 1, 0) FROM transcript_index WHERE session_id = ?",
+        (session_id,),
+    ).fetchone()[0]
+
+    if start_seq > known or _diverged(conn, session_id, messages, start_seq, known):
+        if start_seq > 0 and transcript_path:
+            full = read_transcript(transcript_path)
+            if full is not None:
+                messages, start_seq = full, 0
+        if _diverged(conn, session_id, messages, start_seq, known):
+            known = _first_difference(conn, session_id, messages, start_seq, known)
+            conn.execute(
+                "DELETE FROM transcript_index WHERE session_id = ? AND seq >= ?",
+                (session_id, known),
+            )
+        elif start_seq > known:
+            print(f"Transcript of session {session_id} has a gap at positions {known}-{start_seq - 1}",
+                  file=sys.stderr)
+
+    end = start_seq + len(messages)
+    first_new = max(known, start_seq)
+    if first_new >= end:
+        return end, end
+
+    new_messages = messages[first_new - start_seq:]
+    keys = [message_key(message) for message in new_messages]
+    conn.executemany(
+        "INSERT OR IGNORE INTO transcript_messages (msg_key, body) VALUES (?, ?)",
+        [(key, codec.encode(message, dictionary=dictionary)) for key, message in zip(keys, new_messages)],
+    )
+    conn.executemany(
+        "INSERT OR IGNORE INTO transcript_index (session_id, seq, msg_key) VALUES (?, ?, ?)",
+        [(session_id, first_new + i, key) for i, key in enumerate(keys)],
+    )
+    return first_new, end
+
+
+def load_session_messages(conn, session_id, start=0, end=None):
+    """Return the decoded messages of a session with start <= position < end."""
+    sql = '''
+        SELECT m.body FROM transcript_index i
+        JOIN transcript_messages m ON m.msg_key = i.msg_key
+        WHERE i.session_id = ? AND i.seq >= ?
+    '''
+    params = [session_id, start]
+    if end is not None:
+        sql += " AND i.seq < ?"
+        params.append(end)
+    sql += " ORDER BY i.seq"
+    return [codec.decode_json(body, conn) for (body,) in conn.execute(sql, params)]
+
+
+def load_event_chat(conn, event_id, delta=False):
+    """
+    Reconstruct the chat attached to an event.
+
+    Args:
+        conn: Open database connection
+        event_id: features.id of the event
+        delta: Return only the messages this event added
+
+    Returns:
+        list or None: The messages, or None if the event has no chat
+    """
+    row = conn.execute(
+        "SELECT session_id, chat, chat_start, chat_end FROM features WHERE id = ?",
+        (event_id,),
+    ).fetchone()
+    if row is None:
+        return None
+    session_id, chat, chat_start, chat_end = row
+
+    if chat_end is not None:
+        return load_session_messages(conn, session_id, chat_start if delta else 0, chat_end)
+    if chat is None:
+        return None
+
+    # Rows written before transcripts were normalized
+    return codec.decode_json(chat, conn)
+
+
+def as_message_list(chat):
+    """Return chat as a list of messages, or None if it is not a transcript."""
+    if isinstance(chat, str):
+        try:
+            chat = json.loads(chat)
+        except json.JSONDecodeError:
+            return None
+    return chat if isinstance(chat, list) else None
+
+
+def migrate_legacy_chats(conn, batch_size=100):
+    """
+    Move transcripts stored in features.chat into the normalized tables.
+
+    Rows are processed per session in timestamp order so that each event
+    ends up referencing only the messages it added.
+
+    Returns:
+        int: Number of rows converted
+    """
+    dictionary = codec.active_dictionary(conn)
+    event_ids = [event_id for (event_id,) in conn.execute('''
+        SELECT id FROM features
+        WHERE chat IS NOT NULL AND chat_end IS NULL
+        ORDER BY session_id, timestamp, id
+    ''')]
+
+    converted = 0
+    for i in range(0, len(event_ids), batch_size):
+        for event_id in event_ids[i:i + batch_size]:
+            session_id, chat = conn.execute(
+                "SELECT session_id, chat FROM features WHERE id = ?", (event_id,)
+            ).fetchone()
+            messages = as_message_list(codec.decode(chat, conn))
+            if messages is None:
+                continue  # not a transcript; leave the row as it is
+            chat_start, chat_end = store_transcript(conn, session_id, messages, dictionary=dictionary)
+            conn.execute(
+                "UPDATE features SET chat = NULL, chat_start = ?, chat_end = ? WHERE id = ?",
+                (chat_start, chat_end, event_id),
+            )
+            converted += 1
+        conn.commit()
+    return converted
+
+
+def main():
+    """Command line interface for migrating and inspecting transcripts."""
+    from .db import get_connection
+
+    parser = argparse.ArgumentParser(description='Normalized chat transcript storage')
+    parser.add_argument('--db', default='./planning/dashboard/log.sqlite', help='SQLite database')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('migrate', help='Move features.chat transcripts into the normalized tables')
+    show = sub.add_parser('show', help='Print the chat of an event')
+    show.add_argument('event_id', type=int)
+    show.add_argument('--delta', action='store_true', help='Only the messages the event added')
+    args = parser.parse_args()
+
+    conn = get_connection(args.db)
+    if args.command == 'migrate':
+        converted = migrate_legacy_chats(conn)
+        print(f"Converted {converted} events; run VACUUM to reclaim the space")
+    else:
+        chat = load_event_chat(conn, args.event_id, delta=args.delta)
+        if chat is None:
+            print(f"Event {args.event_id} has no chat", file=sys.stderr)
+            sys.exit(1)
+        print(json.dumps(chat, indent=2))
+
+
+if __name__ == "__main__":
+    main()
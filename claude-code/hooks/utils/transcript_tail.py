@@ -0,0 +1,112 @@
+#!/usr/bin/env -S uv run --script
+# /// script
+# requires-python = ">=3.8"
+# ///
+
+"""
+Incremental reader for Claude Code transcript files.
+
+Transcripts are append-only JSONL files that grow with the session. Instead
+of parsing the whole file on every Stop/SubagentStop event, each consumer
+keeps a checkpoint (inode, byte offset, message count and a hash of the last
+line it consumed) and only parses lines appended since. If the file was
+replaced (new inode), truncated, or rewritten so the checkpointed last line
+no longer matches, the reader starts over from the beginning.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from .constants import HOOKS_CACHE_DIR
+
+CHECKPOINT_DIR = HOOKS_CACHE_DIR / "transcripts"
+
+
+def _hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class TranscriptTail:
+    """
+    Reads the messages appended to a transcript since the last commit().
+
+    Usage:
+        tail = TranscriptTail(transcript_path, consumer="log_feature")
+        messages, start_seq = tail.read_new()
+        ... store messages as positions start_seq, start_seq + 1, ...
+        tail.commit()   # only once the messages are safely stored
+    """
+
+    def __init__(self, transcript_path, consumer, checkpoint_dir=CHECKPOINT_DIR):
+        self.path = Path(transcript_path)
+        key = _hash(f"{consumer}:{os.path.realpath(transcript_path)}".encode("utf-8"))[:32]
+        self.checkpoint_path = Path(checkpoint_dir) / f"{key}.json"
+        self._pending = None
+
+    def _load_checkpoint(self):
+        try:
+            return json.loads(self.checkpoint_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def _checkpoint_valid(self, checkpoint, f, stat):
+        """Check that the file is still the one the checkpoint describes."""
+        if checkpoint["inode"] != stat.st_ino or stat.st_size < checkpoint["offset"]:
+            return False
+        if checkpoint["offset"] == 0:
+            return True
+        f.seek(checkpoint["offset"] - checkpoint["last_line_len"])
+        return _hash(f.read(checkpoint["last_line_len"])) == checkpoint["last_line_hash"]
+
+    def read_new(self):
+        """
+        Parse the lines appended since the last commit.
+
+        Returns:
+            tuple: (messages, start_seq) - the new messages and the position
+            of the first one in the full transcript. start_seq is 0 when the
+            transcript is read from the beginning.
+        """
+        checkpoint = self._load_checkpoint()
+        with open(self.path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            if not checkpoint or not self._checkpoint_valid(checkpoint, f, stat):
+                checkpoint = {"inode": stat.st_ino, "offset": 0, "seq": 0,
+                              "last_line_len": 0, "last_line_hash": None}
+            f.seek(checkpoint["offset"])
+            data = f.read()
+
+        # Only consume complete lines; a partially written line is picked up next time
+        end = data.rfind(b"\n") + 1
+        messages = []
+        last_line = None
+        for line in data[:end].splitlines(keepends=True):
+            last_line = line
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                messages.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass  # Skip invalid lines
+
+        self._pending = {
+            "inode": checkpoint["inode"],
+            "offset": checkpoint["offset"] + end,
+            "seq": checkpoint["seq"] + len(messages),
+            "last_line_len": len(last_line) if last_line else checkpoint["last_line_len"],
+            "last_line_hash": _hash(last_line) if last_line else checkpoint["last_line_hash"],
+        }
+        return messages, checkpoint["seq"]
+
+    def commit(self):
+        """Persist the position reached by the last read_new()."""
+        if self._pending is None:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_name(f"{self.checkpoint_path.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(self._pending), encoding="utf-8")
+        os.replace(tmp, self.checkpoint_path)
+        self._pending = None
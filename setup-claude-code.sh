@@ -53,7 +53,7 @@ echo ""
 echo "📥 Downloading Claude Code hooks to ~/.claude/hooks/"
 
 # Main hook files
-for hook in pre_tool_use.py post_tool_use.py  user_prompt_submit.py notification.py subagent_stop.py log_feature.py .env-example; do
+for hook in pre_tool_use.py post_tool_use.py  user_prompt_submit.py notification.py subagent_stop.py log_feature.py dispatch.py hook_daemon.py summary_worker.py .env-example; do
     curl -s -o "$HOME/.claude/hooks/${hook}" "${BASE_URL}/claude-code/hooks/${hook}"
     chmod +x "$HOME/.claude/hooks/${hook}"
     echo "  ✓ ~/.claude/hooks/${hook}"
@@ -67,15 +67,32 @@ echo "  ✓ ~/.claude/settings.local.json"
 
 
 # Utils files
+curl -s -o "$HOME/.claude/hooks/utils/circuit_breaker.py" "${BASE_URL}/claude-code/hooks/utils/circuit_breaker.py"
+curl -s -o "$HOME/.claude/hooks/utils/codec.py" "${BASE_URL}/claude-code/hooks/utils/codec.py"
+curl -s -o "$HOME/.claude/hooks/utils/command_scanner.py" "${BASE_URL}/claude-code/hooks/utils/command_scanner.py"
 curl -s -o "$HOME/.claude/hooks/utils/constants.py" "${BASE_URL}/claude-code/hooks/utils/constants.py"
+curl -s -o "$HOME/.claude/hooks/utils/db.py" "${BASE_URL}/claude-code/hooks/utils/db.py"
+curl -s -o "$HOME/.claude/hooks/utils/daemon_client.py" "${BASE_URL}/claude-code/hooks/utils/daemon_client.py"
 curl -s -o "$HOME/.claude/hooks/utils/data_manager.py" "${BASE_URL}/claude-code/hooks/utils/data_manager.py"
+curl -s -o "$HOME/.claude/hooks/utils/http_pool.py" "${BASE_URL}/claude-code/hooks/utils/http_pool.py"
+curl -s -o "$HOME/.claude/hooks/utils/http_sink.py" "${BASE_URL}/claude-code/hooks/utils/http_sink.py"
+curl -s -o "$HOME/.claude/hooks/utils/jsonl_store.py" "${BASE_URL}/claude-code/hooks/utils/jsonl_store.py"
 curl -s -o "$HOME/.claude/hooks/utils/logger.py" "${BASE_URL}/claude-code/hooks/utils/logger.py"
+curl -s -o "$HOME/.claude/hooks/utils/session_log.py" "${BASE_URL}/claude-code/hooks/utils/session_log.py"
+curl -s -o "$HOME/.claude/hooks/utils/spool.py" "${BASE_URL}/claude-code/hooks/utils/spool.py"
 curl -s -o "$HOME/.claude/hooks/utils/summarizer.py" "${BASE_URL}/claude-code/hooks/utils/summarizer.py"
+curl -s -o "$HOME/.claude/hooks/utils/summary_cache.py" "${BASE_URL}/claude-code/hooks/utils/summary_cache.py"
+curl -s -o "$HOME/.claude/hooks/utils/summary_queue.py" "${BASE_URL}/claude-code/hooks/utils/summary_queue.py"
+curl -s -o "$HOME/.claude/hooks/utils/timing.py" "${BASE_URL}/claude-code/hooks/utils/timing.py"
+curl -s -o "$HOME/.claude/hooks/utils/transcript_store.py" "${BASE_URL}/claude-code/hooks/utils/transcript_store.py"
+curl -s -o "$HOME/.claude/hooks/utils/transcript_tail.py" "${BASE_URL}/claude-code/hooks/utils/transcript_tail.py"
 echo "  ✓ ~/.claude/hooks/utils/* files"
 
 # LLM utils
 curl -s -o "$HOME/.claude/hooks/utils/llm/anth.py" "${BASE_URL}/claude-code/hooks/utils/llm/anth.py"
 curl -s -o "$HOME/.claude/hooks/utils/llm/oai.py" "${BASE_URL}/claude-code/hooks/utils/llm/oai.py"
+curl -s -o "$HOME/.claude/hooks/utils/llm/provider.py" "${BASE_URL}/claude-code/hooks/utils/llm/provider.py"
+curl -s -o "$HOME/.claude/hooks/utils/llm/local.py" "${BASE_URL}/claude-code/hooks/utils/llm/local.py"
 echo "  ✓ ~/.claude/hooks/utils/llm/* files"
 
 # Download Claude Code user CLAUDE.md